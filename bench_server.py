@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HTTP服务器压测
+
+多线程并发请求本地服务器，统计吞吐量和延迟分位数。--compare 模式在子进程中
+分别启动旧的单线程服务器（TCPServer + HTTP/1.0）和当前的 server.py，
+用相同的请求序列对比两者。
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import threading
+import subprocess
+import http.client
+import socketserver
+from urllib.parse import quote
+
+DEFAULT_CONCURRENCY = 16
+DEFAULT_REQUESTS = 2000
+
+def percentile(sorted_values, p):
+    """已排序数据的分位数（最近秩法）"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(p / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def sample_paths(count=200, seed=0):
+    """抽取压测用的URL：首页、表索引和随机的表结构页面"""
+    paths = ['/', '/table_list.json']
+    pages = sorted(name for name in os.listdir('resources') if name.endswith('.html')) if os.path.isdir('resources') else []
+    rng = random.Random(seed)
+    for name in rng.sample(pages, min(count, len(pages))):
+        paths.append('/resources/' + quote(name))
+    return paths
+
+def run_load(host, port, paths, concurrency=DEFAULT_CONCURRENCY, requests=DEFAULT_REQUESTS,
+             keep_alive=True, timeout=30, accept_encoding=None):
+    """并发发送 requests 个GET请求，返回统计信息
+
+    keep_alive 为 True 时每个线程复用一条连接（服务器关闭连接时自动重连），
+    否则每个请求新建连接。accept_encoding 非空时随请求发送 Accept-Encoding。
+    """
+    headers = {}
+    if not keep_alive:
+        headers['Connection'] = 'close'
+    if accept_encoding:
+        headers['Accept-Encoding'] = accept_encoding
+    latencies = []
+    errors = [0]
+    total_bytes = [0]
+    connections = [0]
+    counter = iter(range(requests))
+    lock = threading.Lock()
+
+    def worker():
+        conn = None
+        local_latencies = []
+        local_bytes = 0
+        local_errors = 0
+        local_connections = 0
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                break
+            path = paths[i % len(paths)]
+            start = time.perf_counter()
+            try:
+                if conn is None or conn.sock is None:
+                    conn = http.client.HTTPConnection(host, port, timeout=timeout)
+                    local_connections += 1
+                conn.request('GET', path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+                if response.status != 200:
+                    local_errors += 1
+                local_bytes += len(body)
+                if not keep_alive or response.will_close:
+                    conn.close()
+                    conn = None
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                if conn is not None:
+                    conn.close()
+                conn = None
+                continue
+            local_latencies.append(time.perf_counter() - start)
+        if conn is not None:
+            conn.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+            total_bytes[0] += local_bytes
+            connections[0] += local_connections
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'keep_alive': keep_alive,
+        'accept_encoding': accept_encoding,
+        'errors': errors[0],
+        'connections': connections[0],
+        'bytes': total_bytes[0],
+        'elapsed': round(elapsed, 3),
+        'requests_per_sec': round(len(latencies) / elapsed, 1) if elapsed else 0,
+        'mb_per_sec': round(total_bytes[0] / elapsed / 1024 / 1024, 1) if elapsed else 0,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50) * 1000, 2),
+            'p90': round(percentile(latencies, 90) * 1000, 2),
+            'p99': round(percentile(latencies, 99) * 1000, 2),
+            'max': round(latencies[-1] * 1000, 2) if latencies else 0
+        }
+    }
+
+def serve_legacy(port):
+    """旧版服务器：单线程 TCPServer + HTTP/1.0，逐个处理请求"""
+    from server import CustomHTTPRequestHandler
+
+    class LegacyHandler(CustomHTTPRequestHandler):
+        protocol_version = 'HTTP/1.0'
+        timeout = None
+
+        def log_message(self, format, *args):
+            pass
+
+    with socketserver.TCPServer(("", port), LegacyHandler) as httpd:
+        httpd.serve_forever()
+
+def free_port():
+    """取一个空闲端口"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_for_port(port, timeout=10):
+    """等待服务器开始监听"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+def start_server(kind, port, workers):
+    """在子进程中启动服务器（legacy 或 concurrent），返回进程对象"""
+    if kind == 'legacy':
+        cmd = [sys.executable, os.path.abspath(__file__), '--serve-legacy', '--port', str(port)]
+    else:
+        cmd = [sys.executable, 'server.py', '--port', str(port), '--workers', str(workers), '--quiet']
+    process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if not wait_for_port(port):
+        process.kill()
+        raise RuntimeError(f'{kind} 服务器启动失败')
+    return process
+
+def stop_server(process):
+    """停止子进程中的服务器"""
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+def print_result(name, result):
+    """打印单次压测结果"""
+    latency = result['latency_ms']
+    mode = 'keep-alive' if result['keep_alive'] else '短连接'
+    print(f"   {name:<10} {mode:<10} {result['requests_per_sec']:>8.1f} req/s  "
+          f"{result['mb_per_sec']:>6.1f} MB/s  p50 {latency['p50']:>7.2f} ms  "
+          f"p99 {latency['p99']:>8.2f} ms  连接 {result['connections']:>5}  错误 {result['errors']}")
+
+def compare(paths, concurrency, requests, workers):
+    """旧服务器与当前服务器在相同负载下对比"""
+    results = {}
+    for kind in ('legacy', 'concurrent'):
+        port = free_port()
+        process = start_server(kind, port, workers)
+        try:
+            # 预热：让页面进入系统文件缓存
+            run_load('127.0.0.1', port, paths, concurrency=1, requests=len(paths))
+            results[kind] = [
+                run_load('127.0.0.1', port, paths, concurrency, requests, keep_alive=keep_alive)
+                for keep_alive in (False, True)
+            ]
+        finally:
+            stop_server(process)
+        for result in results[kind]:
+            print_result(kind, result)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='HTTP服务器压测')
+    parser.add_argument('--host', default='127.0.0.1', help='服务器地址 (默认 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8080, help='服务器端口 (默认 8080)')
+    parser.add_argument('--concurrency', '-c', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'并发客户端数 (默认 {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--requests', '-n', type=int, default=DEFAULT_REQUESTS,
+                        help=f'请求总数 (默认 {DEFAULT_REQUESTS})')
+    parser.add_argument('--pages', type=int, default=200, help='随机抽取的页面数 (默认 200)')
+    parser.add_argument('--no-keep-alive', action='store_true', help='每个请求新建连接')
+    parser.add_argument('--accept-encoding', help='请求携带的 Accept-Encoding，如 gzip')
+    parser.add_argument('--compare', action='store_true', help='启动旧服务器和当前服务器进行对比')
+    parser.add_argument('--workers', type=int, default=32, help='--compare 时当前服务器的工作线程数 (默认 32)')
+    parser.add_argument('--json', metavar='FILE', help='将结果写入JSON文件')
+    parser.add_argument('--serve-legacy', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_legacy:
+        serve_legacy(args.port)
+        return
+
+    paths = sample_paths(args.pages)
+    print(f"🚀 压测: {args.requests} 个请求, {args.concurrency} 个并发, {len(paths)} 个URL")
+    if args.compare:
+        results = compare(paths, args.concurrency, args.requests, args.workers)
+    else:
+        results = run_load(args.host, args.port, paths, args.concurrency, args.requests,
+                           keep_alive=not args.no_keep_alive, accept_encoding=args.accept_encoding)
+        print_result(f'{args.host}:{args.port}', results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"📄 结果已写入 {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+性能基准测试
+
+在真实的 resources/ 语料和按比例放大的合成语料（默认 1万、5万、10万 个页面）上测量：
+- 页面提取吞吐量（extract_schema.py，页面/秒、MB/秒）
+- table_list.json、搜索索引的生成耗时和峰值内存（各步骤在子进程中运行，按子进程统计）
+- 表目录搜索延迟分位数（catalog.py，与 /api/tables 相同的代码路径）
+- server.py 的吞吐量和延迟分位数（复用 bench_server.py 的并发压测，静态页面和搜索接口各一组）
+
+合成语料由真实页面硬链接而成（不占额外磁盘），文件名带序号和新的文件ID，
+页面内容与真实语料相同。全部步骤关闭解析缓存，结果写入JSON（默认按当前提交命名），
+--baseline 指定上次的结果文件时打印各项指标的变化。
+
+    python3 benchmark.py                               # 真实语料 + 1万/5万/10万合成语料 + 服务器
+    python3 benchmark.py --scales 10000 --requests 1000
+    python3 benchmark.py --baseline .cache/bench/results-abc1234.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+from urllib.parse import quote
+
+from table_parser import list_table_pages, parse_filename, CACHE_DIR
+from bench_server import percentile, sample_paths, run_load, free_port, start_server, stop_server
+
+BENCH_DIR = os.path.join(CACHE_DIR, 'bench')
+RESULT_VERSION = 1
+
+DEFAULT_SCALES = [10000, 50000, 100000]
+DEFAULT_QUERIES = 500
+DEFAULT_REQUESTS = 2000
+DEFAULT_CONCURRENCY = 16
+
+# --baseline 对比的指标（路径后缀 -> 数值越大越好）
+COMPARE_METRICS = {
+    'extract.pages_per_sec': True,
+    'extract.peak_rss_mb': False,
+    'table_list.seconds': False,
+    'table_list.peak_rss_mb': False,
+    'search_index.seconds': False,
+    'search_index.peak_rss_mb': False,
+    'search.p50_ms': False,
+    'search.p99_ms': False,
+    'requests_per_sec': True,
+    'latency_ms.p99': False
+}
+
+def git_commit():
+    """当前提交的短哈希，不在git仓库中时返回空串"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+def corpus_stats(resources_dir):
+    """语料的页面数和总字节数"""
+    pages = list_table_pages(resources_dir)
+    return len(pages), sum(os.path.getsize(page) for page in pages)
+
+def make_synthetic_corpus(resources_dir, count, output_root=BENCH_DIR):
+    """由真实页面硬链接出 count 个页面的合成语料（已存在且数量一致时直接复用），返回目录"""
+    output_dir = os.path.join(output_root, f'synthetic-{count}')
+    pages = list_table_pages(resources_dir)
+    if not pages:
+        raise RuntimeError(f'{resources_dir} 下没有页面')
+    if len(list_table_pages(output_dir)) == count:
+        return output_dir
+
+    if os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir)
+    for i in range(count):
+        copy, index = divmod(i, len(pages))
+        page = pages[index]
+        table_name, chinese_name, file_id = parse_filename(os.path.basename(page))
+        name = f'{table_name}_s{copy}({chinese_name})_{file_id or i}{copy:03d}.html'
+        target = os.path.join(output_dir, name)
+        try:
+            os.link(page, target)
+        except OSError:
+            shutil.copyfile(page, target)
+    return output_dir
+
+def run_step(cmd):
+    """在子进程中运行一个步骤，返回 {"seconds", "peak_rss_mb"}；失败时抛出 RuntimeError"""
+    with tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=stderr)
+        if hasattr(os, 'wait4'):
+            # wait4 返回该子进程（含其等待过的子进程）的资源使用，ru_maxrss 单位为KB
+            _, status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            peak_rss_mb = round(usage.ru_maxrss / 1024, 1)
+        else:
+            process.wait()
+            peak_rss_mb = None
+        elapsed = time.perf_counter() - start
+        if process.returncode != 0:
+            stderr.seek(0)
+            raise RuntimeError(f"{' '.join(cmd)} 失败:\n{stderr.read().decode('utf-8', 'replace')[-2000:]}")
+    return {'seconds': round(elapsed, 3), 'peak_rss_mb': peak_rss_mb}
+
+def search_queries(tables, count=DEFAULT_QUERIES, seed=0):
+    """从表目录中抽取搜索用例：英文前缀、中文二元组、多关键词、带筛选条件"""
+    rng = random.Random(seed)
+    queries = []
+    while len(queries) < count and tables:
+        table = rng.choice(tables)
+        kind = len(queries) % 4
+        name = table.get('table_name') or ''
+        chinese = table.get('chinese_name') or ''
+        if kind == 0 and name:
+            token = rng.choice(name.split('_') or [name])
+            queries.append((token[:rng.randint(2, max(2, len(token)))], {}))
+        elif kind == 1 and len(chinese) >= 2:
+            start = rng.randrange(len(chinese) - 1)
+            queries.append((chinese[start:start + 2], {}))
+        elif kind == 2 and name and chinese:
+            queries.append((f"{name.split('_')[0]} {chinese[:2]}", {}))
+        elif kind == 3 and table.get('module'):
+            queries.append((chinese[:1], {'module': table['module']}))
+    return queries
+
+def bench_search(table_list_file, queries=DEFAULT_QUERIES):
+    """表目录搜索延迟（毫秒分位数）"""
+    from catalog import TableCatalog
+
+    start = time.perf_counter()
+    catalog = TableCatalog.load(table_list_file)
+    load_seconds = time.perf_counter() - start
+    cases = search_queries(catalog.tables, queries)
+
+    latencies = []
+    results = 0
+    for query, filters in cases:
+        start = time.perf_counter()
+        result = catalog.search(query, filters)
+        latencies.append(time.perf_counter() - start)
+        results += result['total']
+    latencies.sort()
+    return {
+        'load_seconds': round(load_seconds, 3),
+        'queries': len(latencies),
+        'avg_results': round(results / len(latencies), 1) if latencies else 0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p90_ms': round(percentile(latencies, 90) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'max_ms': round(latencies[-1] * 1000, 3) if latencies else 0
+    }
+
+def bench_corpus(name, resources_dir, workers=None, queries=DEFAULT_QUERIES):
+    """单个语料：提取、生成 table_list.json 和搜索索引、搜索延迟"""
+    pages, size = corpus_stats(resources_dir)
+    print(f"\n📚 {name}: {pages} 个页面, {size / 1024 / 1024:.0f} MB")
+    result = {'resources': resources_dir, 'pages': pages, 'bytes': size}
+    worker_args = ['--workers', str(workers)] if workers else []
+
+    with tempfile.TemporaryDirectory(prefix='bench-') as tmp_dir:
+        table_list = os.path.join(tmp_dir, 'table_list.json')
+
+        step = run_step([sys.executable, 'extract_schema.py', '--resources', resources_dir,
+                         '--output', os.path.join(tmp_dir, 'schema'), '--no-cache'] + worker_args)
+        step['pages_per_sec'] = round(pages / step['seconds'], 1)
+        step['mb_per_sec'] = round(size / 1024 / 1024 / step['seconds'], 1)
+        result['extract'] = step
+        print(f"   提取:       {step['seconds']:>8.2f} 秒  {step['pages_per_sec']:>8.0f} 页/秒  "
+              f"{step['mb_per_sec']:>6.1f} MB/秒  峰值内存 {step['peak_rss_mb']} MB")
+
+        step = run_step([sys.executable, 'build_table_list.py', '--resources', resources_dir,
+                         '--output', table_list, '--no-cache'] + worker_args)
+        result['table_list'] = step
+        print(f"   table_list: {step['seconds']:>8.2f} 秒  峰值内存 {step['peak_rss_mb']} MB")
+
+        step = run_step([sys.executable, 'build_search_index.py', '--table-list', table_list,
+                         '--output', os.path.join(tmp_dir, 'search')])
+        result['search_index'] = step
+        print(f"   搜索索引:   {step['seconds']:>8.2f} 秒  峰值内存 {step['peak_rss_mb']} MB")
+
+        search = bench_search(table_list, queries)
+        result['search'] = search
+        print(f"   搜索:       {search['queries']} 次  p50 {search['p50_ms']:.2f} ms  "
+              f"p99 {search['p99_ms']:.2f} ms  max {search['max_ms']:.2f} ms")
+    return result
+
+def bench_server(requests=DEFAULT_REQUESTS, concurrency=DEFAULT_CONCURRENCY, workers=32, pages=200):
+    """启动 server.py，分别压测静态页面和搜索接口"""
+    from catalog import TableCatalog
+
+    api_paths = []
+    if os.path.exists('table_list.json'):
+        tables = TableCatalog.load('table_list.json').tables
+        for query, filters in search_queries(tables, 200, seed=1):
+            params = f'q={quote(query)}' + ''.join(f'&{k}={quote(v)}' for k, v in filters.items())
+            api_paths.append(f'/api/tables?{params}&limit=50')
+
+    port = free_port()
+    process = start_server('concurrent', port, workers)
+    result = {}
+    try:
+        loads = [('static', sample_paths(pages), None), ('static_gzip', sample_paths(pages), 'gzip')]
+        if api_paths:
+            loads.append(('api_search', api_paths, 'gzip'))
+        print(f"\n🌐 server.py: {requests} 个请求, {concurrency} 个并发")
+        for name, paths, accept_encoding in loads:
+            # 预热：页面进入系统文件缓存，压缩结果进入内存缓存
+            run_load('127.0.0.1', port, paths, concurrency=1, requests=len(paths), accept_encoding=accept_encoding)
+            load = run_load('127.0.0.1', port, paths, concurrency, requests, accept_encoding=accept_encoding)
+            result[name] = load
+            latency = load['latency_ms']
+            print(f"   {name:<12} {load['requests_per_sec']:>8.1f} req/s  p50 {latency['p50']:>7.2f} ms  "
+                  f"p99 {latency['p99']:>8.2f} ms  错误 {load['errors']}")
+    finally:
+        stop_server(process)
+    return result
+
+def flatten(data, prefix=''):
+    """嵌套字典展开为 {"a.b.c": 数值}"""
+    items = {}
+    for key, value in data.items():
+        path = f'{prefix}{key}'
+        if isinstance(value, dict):
+            items.update(flatten(value, path + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            items[path] = value
+    return items
+
+def compare_results(baseline, current):
+    """打印与上次结果相比的关键指标变化，返回变差超过10%的指标数"""
+    old = flatten(baseline.get('results', {}))
+    new = flatten(current.get('results', {}))
+    print(f"\n📊 与 {baseline.get('meta', {}).get('commit') or '基准'} 对比:")
+    regressions = 0
+    for path in sorted(new):
+        higher_better = next((better for suffix, better in COMPARE_METRICS.items() if path.endswith(suffix)), None)
+        if higher_better is None or not old.get(path):
+            continue
+        change = (new[path] - old[path]) / old[path] * 100
+        worse = change < -10 if higher_better else change > 10
+        regressions += worse
+        mark = '❌' if worse else '  '
+        print(f"   {mark} {path:<45} {old[path]:>10} -> {new[path]:>10}  ({change:+.1f}%)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='解析、索引生成、搜索和服务器的性能基准测试')
+    parser.add_argument('--resources', default='resources', help='真实语料目录 (默认 resources)')
+    parser.add_argument('--scales', type=int, nargs='*', default=DEFAULT_SCALES,
+                        help=f'合成语料的页面数 (默认 {" ".join(map(str, DEFAULT_SCALES))}，不带参数时只测真实语料)')
+    parser.add_argument('--workers', type=int, default=None, help='解析进程数 (默认CPU核数)')
+    parser.add_argument('--queries', type=int, default=DEFAULT_QUERIES, help=f'搜索用例数 (默认 {DEFAULT_QUERIES})')
+    parser.add_argument('--requests', '-n', type=int, default=DEFAULT_REQUESTS,
+                        help=f'服务器压测请求数 (默认 {DEFAULT_REQUESTS})')
+    parser.add_argument('--concurrency', '-c', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'服务器压测并发数 (默认 {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--skip-server', action='store_true', help='不压测服务器')
+    parser.add_argument('--output', '-o', metavar='FILE',
+                        help=f'结果JSON文件 (默认 {BENCH_DIR}/results-<提交>.json)')
+    parser.add_argument('--baseline', metavar='FILE', help='与该结果文件对比')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.resources):
+        print(f"错误: 目录不存在 {args.resources}")
+        sys.exit(1)
+
+    commit = git_commit()
+    report = {
+        'version': RESULT_VERSION,
+        'meta': {
+            'commit': commit,
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'workers': args.workers
+        },
+        'results': {}
+    }
+    results = report['results']
+
+    print(f"🚀 基准测试 (提交 {commit or '未知'}, {os.cpu_count()} 个CPU)")
+    results['real'] = bench_corpus('真实语料', args.resources, args.workers, args.queries)
+    for scale in args.scales:
+        print(f"\n🔧 准备 {scale} 个页面的合成语料...")
+        corpus_dir = make_synthetic_corpus(args.resources, scale)
+        results[f'synthetic_{scale}'] = bench_corpus(f'合成语料 {scale}', corpus_dir, args.workers, args.queries)
+    if not args.skip_server:
+        results['server'] = bench_server(args.requests, args.concurrency)
+
+    output = args.output or os.path.join(BENCH_DIR, f"results-{commit or time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 结果已写入 {output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_results(json.load(f), report)
+        if regressions:
+            print(f"⚠️  {regressions} 项指标变差超过10%")
+
+if __name__ == "__main__":
+    main()
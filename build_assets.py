@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+生成内容哈希命名的静态资源
+
+把表结构页面、CSS/JS、table_list.json 和搜索索引复制为文件名带内容哈希的版本，
+内容变化时文件名随之变化，部署时可以设置一年的强缓存（immutable）：
+
+    data/assets/resources/<表名>(<中文名>)_<文件ID>.<哈希>.html   页面中的 ./css、./js 引用改为哈希文件名
+    data/assets/resources/css/<名称>.<哈希>.css
+    data/assets/table_list.<哈希>.json                           filepath 字段改为哈希页面
+    data/assets/data/search/<名称>.<哈希>.json                   manifest 的 files 字段记录各分片的哈希文件名
+    data/assets/data/catalog/<名称>.<哈希>.json                  同上，分片的 page_hashes 记录各行页面的哈希
+    data/assets/index.html                                       引用哈希的 table_list、表目录和搜索索引清单，保持 no-cache
+
+data/assets_manifest.json 记录 {原key: 哈希key}，deploy.py --hashed-assets 据此部署。
+页面按源文件签名缓存哈希结果，未变化的页面不重新读取。
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+
+from table_parser import list_table_pages, file_signature, CACHE_DIR
+from sync_plan import walk_sorted
+from build_catalog import decode_shard, CATALOG_DIR
+
+ASSETS_DIR = os.path.join('data', 'assets')
+ASSETS_MANIFEST = os.path.join('data', 'assets_manifest.json')
+ASSETS_CACHE_FILE = os.path.join(CACHE_DIR, 'assets_cache.json')
+SEARCH_DIR = os.path.join('data', 'search')
+PAGES_DIR = os.path.join('data', 'pages')
+
+MANIFEST_VERSION = 1
+HASH_LENGTH = 10
+
+# 哈希文件名：<名称>.<10位十六进制>.<扩展名>（page_pack.py 的归档文件同样以内容哈希命名）
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{10}\.(?:html|json|css|js|pack)$')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# 页面中对共享样式和脚本的相对引用
+ASSET_REF_RE = re.compile(rb'''((?:href|src)=["']\./)((?:css|js)/[^"']+)(["'])''')
+
+# index.html 中需要改为哈希文件名的请求
+INDEX_FETCHES = ['table_list.json', 'data/catalog/manifest.json', 'data/search/manifest.json']
+
+def content_hash(data):
+    """内容哈希（MD5前10位）"""
+    return hashlib.md5(data).hexdigest()[:HASH_LENGTH]
+
+def hashed_key(key, data):
+    """在扩展名前插入内容哈希：resources/a.html -> resources/a.<哈希>.html"""
+    root, ext = os.path.splitext(key)
+    return f'{root}.{content_hash(data)}{ext}'
+
+def is_hashed_key(key):
+    """key 是否为内容哈希命名的文件"""
+    return HASHED_NAME_RE.search(key) is not None
+
+def write_asset(output_dir, key, data):
+    """写入哈希文件（文件名由内容决定，已存在时不重复写入），返回哈希key"""
+    target_key = hashed_key(key, data)
+    target = os.path.join(output_dir, *target_key.split('/'))
+    if not os.path.exists(target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_path = target + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, target)
+    return target_key
+
+def rewrite_page(content, asset_refs):
+    """页面中的 ./css/x.css 等引用改为哈希文件名，asset_refs 为 {相对路径: 哈希相对路径}"""
+    def replace(match):
+        ref = match.group(2).decode('utf-8')
+        return match.group(1) + asset_refs.get(ref, ref).encode('utf-8') + match.group(3)
+    return ASSET_REF_RE.sub(replace, content)
+
+def rewrite_index(content, files):
+    """index.html 中对 table_list.json、表目录和搜索索引清单的请求改为哈希文件名"""
+    for key in INDEX_FETCHES:
+        if key not in files:
+            continue
+        pattern = re.compile(r"""fetch\((['"])%s\1\)""" % re.escape(key))
+        content, count = pattern.subn(lambda m: f"fetch({m.group(1)}{files[key]}{m.group(1)})", content)
+        if not count:
+            raise ValueError(f'index.html 中没有找到 fetch({key!r})')
+    return content
+
+def add_page_hashes(data, dicts, files):
+    """表目录分片加上 page_hashes 列（各行页面的内容哈希），浏览器据此打开哈希命名的页面"""
+    shard = json.loads(data.decode('utf-8'))
+    page_hashes = []
+    for _, table in decode_shard(shard, dicts):
+        page_key = files.get(table['filepath'])
+        page_hashes.append(page_key.rsplit('.', 2)[1] if page_key else '')
+    shard['page_hashes'] = page_hashes
+    return json.dumps(shard, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def load_cache(cache_file):
+    """读取页面哈希缓存 {文件名: [签名, 引用摘要, 哈希key]}"""
+    if not cache_file or not os.path.exists(cache_file):
+        return {}
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_json(file_path, data):
+    """写入JSON文件（先写临时文件再替换）"""
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+    tmp_path = file_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, file_path)
+
+def read_file(file_path):
+    with open(file_path, 'rb') as f:
+        return f.read()
+
+def build_assets(resources_dir='resources', output_dir=ASSETS_DIR, manifest_file=ASSETS_MANIFEST,
+                 table_list_file='table_list.json', search_dir=SEARCH_DIR, index_file='index.html',
+                 pages_dir=None, cache_file=ASSETS_CACHE_FILE, catalog_dir=CATALOG_DIR):
+    """生成全部哈希文件并删除输出目录中不再引用的旧文件，返回统计信息
+
+    pages_dir 指定时（render_pages.py 的精简页面目录）页面和样式优先取自该目录。
+    """
+    files = {}
+    written = 0
+
+    # 1. 共享样式和脚本（精简页面目录中的同名文件优先）
+    asset_sources = {}
+    for source_dir in [resources_dir] + ([pages_dir] if pages_dir else []):
+        for sub in ('css', 'js'):
+            for rel in walk_sorted(os.path.join(source_dir, sub), sub + '/'):
+                asset_sources[rel] = os.path.join(source_dir, *rel.split('/'))
+    asset_refs = {}
+    for rel, path in sorted(asset_sources.items()):
+        key = f'resources/{rel}'
+        files[key] = write_asset(output_dir, key, read_file(path))
+        asset_refs[rel] = files[key][len('resources/'):]
+    refs_digest = content_hash(json.dumps(asset_refs, sort_keys=True).encode('utf-8'))
+
+    # 2. 表结构页面：源文件和样式引用都未变化时沿用缓存的哈希key
+    cache = load_cache(cache_file)
+    new_cache = {}
+    for page in list_table_pages(resources_dir):
+        name = os.path.basename(page)
+        source = page
+        if pages_dir and os.path.isfile(os.path.join(pages_dir, name)):
+            source = os.path.join(pages_dir, name)
+        signature = [source] + file_signature(source)
+        key = f'resources/{name}'
+        cached = cache.get(name)
+        if cached and cached[0] == signature and cached[1] == refs_digest \
+                and os.path.exists(os.path.join(output_dir, *cached[2].split('/'))):
+            files[key] = cached[2]
+        else:
+            files[key] = write_asset(output_dir, key, rewrite_page(read_file(source), asset_refs))
+            written += 1
+        new_cache[name] = [signature, refs_digest, files[key]]
+
+    # 3. table_list.json：filepath 改为哈希页面
+    if os.path.exists(table_list_file):
+        with open(table_list_file, 'r', encoding='utf-8') as f:
+            tables = json.load(f)
+        for table in tables:
+            table['filepath'] = files.get(table['filepath'], table['filepath'])
+        data = json.dumps(tables, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        files['table_list.json'] = write_asset(output_dir, 'table_list.json', data)
+
+    # 4. 搜索索引和表目录：各文件哈希命名，清单的 files 字段记录 {原文件名: 哈希文件名}
+    for index_dir, prefix in ((search_dir, 'data/search'), (catalog_dir, 'data/catalog')):
+        manifest_path = os.path.join(index_dir, 'manifest.json')
+        if not os.path.exists(manifest_path):
+            continue
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            index_manifest = json.load(f)
+        names = {}
+        for name in sorted(os.listdir(index_dir)):
+            if name.endswith('.json') and name != 'manifest.json':
+                key = f'{prefix}/{name}'
+                data = read_file(os.path.join(index_dir, name))
+                if prefix == 'data/catalog':
+                    data = add_page_hashes(data, index_manifest['dicts'], files)
+                files[key] = write_asset(output_dir, key, data)
+                names[name] = os.path.basename(files[key])
+        index_manifest['files'] = names
+        data = json.dumps(index_manifest, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        files[f'{prefix}/manifest.json'] = write_asset(output_dir, f'{prefix}/manifest.json', data)
+
+    # 5. index.html：文件名不变，引用哈希的 table_list 和搜索索引清单
+    if os.path.exists(index_file):
+        with open(index_file, 'r', encoding='utf-8') as f:
+            content = rewrite_index(f.read(), files)
+        target = os.path.join(output_dir, 'index.html')
+        if not os.path.exists(target) or read_file(target) != content.encode('utf-8'):
+            with open(target, 'w', encoding='utf-8') as f:
+                f.write(content)
+
+    # 6. 删除不再引用的旧哈希文件
+    keep = set(files.values()) | {'index.html'}
+    removed = 0
+    for key in list(walk_sorted(output_dir)):
+        if key not in keep:
+            os.remove(os.path.join(output_dir, *key.split('/')))
+            removed += 1
+
+    save_json(manifest_file, {'version': MANIFEST_VERSION, 'pages_dir': pages_dir, 'files': files})
+    if cache_file:
+        save_json(cache_file, new_cache)
+    return {'files': len(files), 'written': written, 'removed': removed}
+
+def load_manifest(manifest_file=ASSETS_MANIFEST):
+    """读取哈希文件清单 {原key: 哈希key}，不存在时返回 None"""
+    if not os.path.exists(manifest_file):
+        return None
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        return json.load(f)['files']
+
+def main():
+    parser = argparse.ArgumentParser(description='生成内容哈希命名的页面、样式、表索引和搜索索引')
+    parser.add_argument('--resources', default='resources', help='页面目录 (默认 resources)')
+    parser.add_argument('--output', default=ASSETS_DIR, help=f'输出目录 (默认 {ASSETS_DIR})')
+    parser.add_argument('--compact-pages', action='store_true',
+                        help=f'页面取自 render_pages.py 生成的 {PAGES_DIR}（与 deploy.py --compact-pages 对应）')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.resources):
+        print(f"错误: 目录不存在 {args.resources}")
+        sys.exit(1)
+    if args.compact_pages and not os.path.isdir(PAGES_DIR):
+        print(f"错误: 目录不存在 {PAGES_DIR}，请先运行 python render_pages.py")
+        sys.exit(1)
+
+    start = time.time()
+    print(f"🔧 生成哈希文件到 {args.output}...")
+    stats = build_assets(args.resources, args.output, pages_dir=PAGES_DIR if args.compact_pages else None)
+    print(f"✅ {stats['files']} 个文件, 本次写入 {stats['written']} 个页面, 删除旧文件 {stats['removed']} 个")
+    print(f"   - 清单: {ASSETS_MANIFEST}")
+    print(f"   - 耗时: {time.time() - start:.1f} 秒")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+生成按模块分片的表目录
+
+table_list.json 一万多条记录重复存放模块、数据库、微服务名称和完整的 filepath，
+index.html 必须下载并解析整个文件后才能显示第一屏。本脚本把它转换为：
+- manifest.json: 文档数、各字段的取值字典、模块/数据库/微服务的分面统计、分片列表，首屏只需要它
+- shard-<序号>.json: 按所属模块分片的列式数据，模块、数据库、微服务存为字典下标，
+  filepath、filename 按 resources/<表名>(<中文名>)_<文件ID>.html 推导，不一致时才单独存放
+
+文档号即 table_list.json 中的下标（与 build_search_index.py 一致），浏览器在后台按需加载其余分片。
+表数较少的模块合并到同一个分片，避免产生大量很小的文件。
+没有生成目录时 index.html 仍读取 table_list.json。
+
+输出（默认 data/catalog/）
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+
+CATALOG_VERSION = 1
+CATALOG_DIR = os.path.join('data', 'catalog')
+TABLE_LIST_FILE = 'table_list.json'
+
+# 存为字典下标的字段
+DICT_FIELDS = ['module', 'database', 'microservice']
+# 按原值存放的字段
+TEXT_FIELDS = ['table_name', 'chinese_name', 'file_id']
+
+# 表数少于该值的模块合并到同一个分片，合并后的分片达到该值时另起一个
+MIN_SHARD_TABLES = 100
+
+PATH_PREFIX = 'resources/'
+
+def default_filename(table):
+    """按表名、中文名、文件ID推导的页面文件名"""
+    return f"{table.get('table_name', '')}({table.get('chinese_name', '')})_{table.get('file_id', '')}.html"
+
+def build_dicts(tables):
+    """各字典字段的取值（排序）及分面统计 [[取值, 表数]]"""
+    dicts = {}
+    facets = {}
+    for field in DICT_FIELDS:
+        counts = {}
+        for table in tables:
+            value = table.get(field) or ''
+            counts[value] = counts.get(value, 0) + 1
+        dicts[field] = sorted(counts)
+        facets[field] = [[value, counts[value]] for value in dicts[field]]
+    return dicts, facets
+
+def group_modules(module_counts, min_tables=MIN_SHARD_TABLES):
+    """把模块分组为分片：表数不少于 min_tables 的模块单独成片，其余按顺序合并，返回 [[模块, ...]]"""
+    groups = []
+    small = []
+    small_count = 0
+    for module, count in sorted(module_counts.items(), key=lambda item: (-item[1], item[0])):
+        if count >= min_tables:
+            groups.append([module])
+            continue
+        small.append(module)
+        small_count += count
+        if small_count >= min_tables:
+            groups.append(small)
+            small = []
+            small_count = 0
+    if small:
+        groups.append(small)
+    return groups
+
+def encode_shard(tables, doc_ids, indexes):
+    """编码一个分片：{docs, 字典字段下标列, 文本字段列, filenames/paths: {行号: 不能推导的值}}"""
+    shard = {'docs': doc_ids}
+    for field in DICT_FIELDS:
+        shard[field] = [indexes[field][tables[doc_id].get(field) or ''] for doc_id in doc_ids]
+    for field in TEXT_FIELDS:
+        shard[field] = [tables[doc_id].get(field) or '' for doc_id in doc_ids]
+
+    # filename、filepath 与推导结果不一致的行单独存放
+    filenames = {}
+    paths = {}
+    for row, doc_id in enumerate(doc_ids):
+        table = tables[doc_id]
+        filename = table.get('filename', '')
+        if filename != default_filename(table):
+            filenames[str(row)] = filename
+        if table.get('filepath', '') != PATH_PREFIX + filename:
+            paths[str(row)] = table.get('filepath', '')
+    if filenames:
+        shard['filenames'] = filenames
+    if paths:
+        shard['paths'] = paths
+    return shard
+
+def decode_shard(shard, dicts):
+    """解码分片，返回 [(文档号, 表记录)]，表记录与 table_list.json 中的相同"""
+    filenames = shard.get('filenames', {})
+    paths = shard.get('paths', {})
+    page_hashes = shard.get('page_hashes')
+    rows = []
+    for row, doc_id in enumerate(shard['docs']):
+        table = {field: shard[field][row] for field in ('table_name', 'chinese_name')}
+        table['filename'] = filenames.get(str(row)) or default_filename({
+            'table_name': table['table_name'], 'chinese_name': table['chinese_name'],
+            'file_id': shard['file_id'][row]})
+        for field in DICT_FIELDS:
+            table[field] = dicts[field][shard[field][row]]
+        table['file_id'] = shard['file_id'][row]
+        table['filepath'] = paths.get(str(row)) or PATH_PREFIX + table['filename']
+        # build_assets.py 写入的页面内容哈希：打开哈希命名的页面
+        if page_hashes and page_hashes[row]:
+            root, ext = os.path.splitext(table['filepath'])
+            table['filepath'] = f'{root}.{page_hashes[row]}{ext}'
+        rows.append((doc_id, table))
+    return rows
+
+def build_catalog(tables, min_tables=MIN_SHARD_TABLES):
+    """构建目录，返回 (manifest（不含来源信息）, 分片列表)"""
+    dicts, facets = build_dicts(tables)
+    indexes = {field: {value: i for i, value in enumerate(values)} for field, values in dicts.items()}
+
+    docs_by_module = {}
+    for doc_id, table in enumerate(tables):
+        docs_by_module.setdefault(table.get('module') or '', []).append(doc_id)
+
+    shards = []
+    shard_list = []
+    module_counts = {module: len(doc_ids) for module, doc_ids in docs_by_module.items()}
+    for i, modules in enumerate(group_modules(module_counts, min_tables)):
+        doc_ids = sorted(doc_id for module in modules for doc_id in docs_by_module[module])
+        shards.append(encode_shard(tables, doc_ids, indexes))
+        shard_list.append({'file': f'shard-{i}.json', 'modules': modules, 'count': len(doc_ids)})
+
+    manifest = {
+        'version': CATALOG_VERSION,
+        'doc_count': len(tables),
+        'path_prefix': PATH_PREFIX,
+        'dicts': dicts,
+        'facets': facets,
+        'shards': shard_list
+    }
+    return manifest, shards
+
+def write_json(file_path, data):
+    """紧凑格式写入JSON"""
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+
+def write_catalog(tables, output_dir=CATALOG_DIR, source=TABLE_LIST_FILE, source_digest='',
+                  min_tables=MIN_SHARD_TABLES):
+    """构建并写入目录文件，返回 manifest"""
+    manifest, shards = build_catalog(tables, min_tables)
+
+    os.makedirs(output_dir, exist_ok=True)
+    # 清理上次生成的分片
+    for name in os.listdir(output_dir):
+        if name.startswith('shard-') and name.endswith('.json'):
+            os.remove(os.path.join(output_dir, name))
+
+    for entry, shard in zip(manifest['shards'], shards):
+        write_json(os.path.join(output_dir, entry['file']), shard)
+
+    manifest['source'] = source
+    manifest['source_md5'] = source_digest
+    # manifest 最后写入，浏览器读到它时分片已全部就绪
+    write_json(os.path.join(output_dir, 'manifest.json'), manifest)
+    return manifest
+
+def load_catalog(catalog_dir=CATALOG_DIR):
+    """读取目录并还原为 table_list.json 的表记录列表"""
+    with open(os.path.join(catalog_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    tables = [None] * manifest['doc_count']
+    for entry in manifest['shards']:
+        with open(os.path.join(catalog_dir, entry['file']), 'r', encoding='utf-8') as f:
+            shard = json.load(f)
+        for doc_id, table in decode_shard(shard, manifest['dicts']):
+            tables[doc_id] = table
+    return tables
+
+def main():
+    parser = argparse.ArgumentParser(description='生成按模块分片的表目录')
+    parser.add_argument('--table-list', default=TABLE_LIST_FILE, help=f'表索引文件 (默认 {TABLE_LIST_FILE})')
+    parser.add_argument('--output', default=CATALOG_DIR, help=f'输出目录 (默认 {CATALOG_DIR})')
+    parser.add_argument('--min-tables', type=int, default=MIN_SHARD_TABLES,
+                        help=f'表数少于该值的模块合并为一个分片 (默认 {MIN_SHARD_TABLES})')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.table_list):
+        print(f"错误: {args.table_list} 不存在，请先运行 python3 build_table_list.py")
+        sys.exit(1)
+
+    start = time.time()
+    with open(args.table_list, 'rb') as f:
+        raw = f.read()
+    tables = json.loads(raw.decode('utf-8'))
+
+    manifest = write_catalog(tables, args.output, os.path.basename(args.table_list),
+                             hashlib.md5(raw).hexdigest(), args.min_tables)
+
+    manifest_size = os.path.getsize(os.path.join(args.output, 'manifest.json'))
+    total_size = sum(
+        os.path.getsize(os.path.join(args.output, name)) for name in os.listdir(args.output)
+    )
+    print(f"✅ 已生成表目录 {args.output}: {manifest['doc_count']} 张表")
+    print(f"   - 分片: {len(manifest['shards'])} 个, 模块: {len(manifest['dicts']['module'])} 个")
+    print(f"   - 清单: {manifest_size / 1024:.1f} KB, 总大小: {total_size / 1024 / 1024:.1f} MB "
+          f"(table_list.json {len(raw) / 1024 / 1024:.1f} MB)")
+    print(f"   - 耗时: {time.time() - start:.1f} 秒")
+
+if __name__ == "__main__":
+    main()
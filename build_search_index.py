@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+生成搜索倒排索引
+
+基于 table_list.json 预先构建倒排索引，index.html 搜索时只加载查询涉及的分片：
+- 英文/数字：表名、中文名中的字母数字串按 "_" 等分隔符切分为词，索引每个词的全部前缀
+- 中文：中文名按连续非ASCII字符切分，索引单字和相邻二元组（bigram）
+- 文件ID：整体作为一个词
+- 拼音：中文名从每个汉字开始的全拼串和首字母串（考勤项目 -> kaoqinxiangmu、qinxiangmu...、kqxm、qxm...），
+  排序存放，查询时按前缀二分查找，输入 kqxm、kaoqin 即可找到 kq_item（需要安装 pypinyin）
+
+倒排表中的文档号即 table_list.json 中的下标，按表名排序顺序存放；
+orders.json 保存每种排序方式下的文档顺序，浏览器据此排序而无需 localeCompare。
+
+输出（默认 data/search/）：
+- manifest.json: 文档数、分片列表等元信息
+- shard-<分片>.json: {词: [文档号, ...]}，按词首字符分片
+- orders.json: {排序方式: [文档号, ...]}
+- pinyin-<首字母>.json: {"keys": [排序的拼音串], "docs": [[文档号, ...], ...]}
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import bisect
+import hashlib
+import functools
+import argparse
+
+# 可选的拼音支持，未安装时不生成拼音索引
+try:
+    from pypinyin import lazy_pinyin
+    HAS_PINYIN = True
+except ImportError:
+    HAS_PINYIN = False
+
+INDEX_VERSION = 1
+SEARCH_DIR = os.path.join('data', 'search')
+TABLE_LIST_FILE = 'table_list.json'
+
+# index.html 中的排序方式 -> table_list.json 字段
+SORT_FIELDS = {
+    'name': 'table_name',
+    'chinese': 'chinese_name',
+    'id': 'file_id',
+    'module': 'module',
+    'database': 'database',
+    'microservice': 'microservice'
+}
+
+# 非ASCII字符按码点取模分到的分片数（与 index.html 中的 shardOf 保持一致）
+UNICODE_SHARDS = 32
+
+ASCII_TOKEN_RE = re.compile(r'[0-9a-z]+')
+NON_ASCII_RUN_RE = re.compile(r'[^\x00-\x7f]+')
+
+def shard_of(key):
+    """词所在的分片：字母数字开头按首字符，其他按首字符码点取模"""
+    first = key[0]
+    if first.isascii() and first.isalnum():
+        return first
+    return f'u{ord(first) % UNICODE_SHARDS}'
+
+def text_keys(text):
+    """文本的索引词：字母数字串的全部前缀 + 非ASCII串的单字和二元组"""
+    text = (text or '').lower()
+    keys = set()
+    for token in ASCII_TOKEN_RE.findall(text):
+        for i in range(1, len(token) + 1):
+            keys.add(token[:i])
+    for run in NON_ASCII_RUN_RE.findall(text):
+        keys.update(run)
+        for i in range(len(run) - 1):
+            keys.add(run[i:i + 2])
+    return keys
+
+def query_keys(term):
+    """查询词对应的索引词：字母数字串按前缀查找，中文按二元组（单字时按单字）查找
+
+    与 index.html 中的 queryKeys 保持一致。
+    """
+    term = term.lower()
+    keys = ASCII_TOKEN_RE.findall(term)
+    for run in NON_ASCII_RUN_RE.findall(term):
+        if len(run) == 1:
+            keys.append(run)
+        for i in range(len(run) - 1):
+            keys.append(run[i:i + 2])
+    return keys
+
+def table_keys(table):
+    """单张表的全部索引词"""
+    keys = text_keys(table.get('table_name'))
+    keys |= text_keys(table.get('chinese_name'))
+    if table.get('file_id'):
+        keys.add(table['file_id'].lower())
+    return keys
+
+def pinyin_keys(syllables):
+    """拼音搜索键：从每个音节开始的全拼串和首字母串，按前缀查找即可匹配从任意汉字开始的拼音
+
+    ['kao', 'qin', 'xiang', 'mu'] -> kaoqinxiangmu, qinxiangmu, xiangmu, mu, kqxm, qxm, xm, m
+    """
+    keys = set()
+    for i in range(len(syllables)):
+        keys.add(''.join(syllables[i:]))
+        keys.add(''.join(syllable[0] for syllable in syllables[i:]))
+    return keys
+
+# 字段中文名大量重复（主键、租户、创建人...），缓存转换结果
+@functools.lru_cache(maxsize=65536)
+def text_pinyin_keys(text):
+    """文本中各段汉字的拼音搜索键（frozenset），未安装 pypinyin 时为空"""
+    keys = set()
+    if not HAS_PINYIN or not text:
+        return frozenset(keys)
+    for run in NON_ASCII_RUN_RE.findall(text):
+        syllables = [s for s in lazy_pinyin(run, errors='ignore') if s.isascii() and s.isalpha()]
+        keys |= pinyin_keys([s.lower() for s in syllables])
+    return frozenset(keys)
+
+def table_pinyin_keys(table):
+    """单张表的拼音搜索键（中文名）"""
+    return text_pinyin_keys(table.get('chinese_name'))
+
+def prefix_range(sorted_keys, prefix):
+    """排序的拼音串中以 prefix 开头的下标范围 (起, 止)，与 index.html 中的 pinyinDocs 一致"""
+    start = bisect.bisect_left(sorted_keys, prefix)
+    # 拼音串只含小写字母，'\x7f' 大于其中任何字符
+    return start, bisect.bisect_left(sorted_keys, prefix + '\x7f', start)
+
+def sort_key(field, table):
+    """排序键：文件ID按数值，其他按小写文本（空值排在最前）"""
+    value = table.get(field) or ''
+    if field == 'file_id':
+        return (int(value) if value.isdigit() else 0, value)
+    return (value.lower(), value)
+
+def build_orders(tables):
+    """每种排序方式下的文档顺序"""
+    orders = {}
+    for name, field in SORT_FIELDS.items():
+        orders[name] = sorted(range(len(tables)), key=lambda i: (sort_key(field, tables[i]), i))
+    return orders
+
+def build_postings(tables, doc_order, keys_func=table_keys):
+    """倒排表 {词: 文档号列表}，文档号按 doc_order 的顺序排列"""
+    postings = {}
+    for doc_id in doc_order:
+        for key in keys_func(tables[doc_id]):
+            postings.setdefault(key, []).append(doc_id)
+    return postings
+
+def build_search_index(tables):
+    """构建倒排索引，返回 (分片 {分片: {词: 文档号列表}}, 排序顺序)"""
+    orders = build_orders(tables)
+
+    # 按表名顺序遍历文档，倒排表天然按表名排序
+    postings = build_postings(tables, orders['name'])
+
+    shards = {}
+    for key in sorted(postings):
+        shards.setdefault(shard_of(key), {})[key] = postings[key]
+    return shards, orders
+
+def build_pinyin_index(tables, doc_order):
+    """拼音索引 {首字母: {"keys": 排序的拼音串, "docs": 对应的文档号列表}}，文档号按 doc_order 的顺序排列"""
+    postings = build_postings(tables, doc_order, table_pinyin_keys)
+    shards = {}
+    for key in sorted(postings):
+        shard = shards.setdefault(key[0], {'keys': [], 'docs': []})
+        shard['keys'].append(key)
+        shard['docs'].append(postings[key])
+    return shards
+
+def write_json(file_path, data):
+    """紧凑格式写入JSON"""
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+
+def write_search_index(tables, output_dir=SEARCH_DIR, source=TABLE_LIST_FILE, source_digest=''):
+    """构建并写入索引文件，返回 manifest"""
+    shards, orders = build_search_index(tables)
+
+    os.makedirs(output_dir, exist_ok=True)
+    # 清理上次生成的分片
+    for name in os.listdir(output_dir):
+        if name.startswith(('shard-', 'pinyin-')) and name.endswith('.json'):
+            os.remove(os.path.join(output_dir, name))
+
+    for shard, postings in shards.items():
+        write_json(os.path.join(output_dir, f'shard-{shard}.json'), postings)
+    write_json(os.path.join(output_dir, 'orders.json'), orders)
+    pinyin_shards = build_pinyin_index(tables, orders['name'])
+    for letter, shard in pinyin_shards.items():
+        write_json(os.path.join(output_dir, f'pinyin-{letter}.json'), shard)
+
+    manifest = {
+        'version': INDEX_VERSION,
+        'doc_count': len(tables),
+        'source': source,
+        'source_md5': source_digest,
+        'unicode_shards': UNICODE_SHARDS,
+        'shards': sorted(shards),
+        'key_count': sum(len(postings) for postings in shards.values()),
+        'sort_keys': list(SORT_FIELDS),
+        'pinyin_shards': sorted(pinyin_shards),
+        'pinyin_key_count': sum(len(shard['keys']) for shard in pinyin_shards.values())
+    }
+    # manifest 最后写入，浏览器读到它时分片已全部就绪
+    write_json(os.path.join(output_dir, 'manifest.json'), manifest)
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description='生成搜索倒排索引')
+    parser.add_argument('--table-list', default=TABLE_LIST_FILE, help=f'表索引文件 (默认 {TABLE_LIST_FILE})')
+    parser.add_argument('--output', default=SEARCH_DIR, help=f'输出目录 (默认 {SEARCH_DIR})')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.table_list):
+        print(f"错误: {args.table_list} 不存在，请先运行 python3 build_table_list.py")
+        sys.exit(1)
+
+    start = time.time()
+    with open(args.table_list, 'rb') as f:
+        raw = f.read()
+    tables = json.loads(raw.decode('utf-8'))
+
+    manifest = write_search_index(tables, args.output, os.path.basename(args.table_list),
+                                  hashlib.md5(raw).hexdigest())
+
+    total_size = sum(
+        os.path.getsize(os.path.join(args.output, name)) for name in os.listdir(args.output)
+    )
+    print(f"✅ 已生成搜索索引 {args.output}: {manifest['doc_count']} 张表")
+    print(f"   - 索引词: {manifest['key_count']} 个, 分片: {len(manifest['shards'])} 个")
+    if HAS_PINYIN:
+        print(f"   - 拼音串: {manifest['pinyin_key_count']} 个, 分片: {len(manifest['pinyin_shards'])} 个")
+    else:
+        print("   ⚠️  未安装 pypinyin，不生成拼音索引（pip install pypinyin）")
+    print(f"   - 总大小: {total_size / 1024 / 1024:.1f} MB")
+    print(f"   - 耗时: {time.time() - start:.1f} 秒")
+
+if __name__ == "__main__":
+    main()
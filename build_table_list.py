@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+生成 table_list.json
+
+多进程解析 resources/ 下的表结构页面，提取基本信息（数据库表名、中文名词、
+所属模块、微服务、所属数据库）和文件ID，生成 index.html 使用的表索引。
+解析结果按 路径+修改时间+大小 缓存，重新生成时只解析变化的页面。
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+from table_parser import list_table_pages, parse_pages_cached, parse_table_entry, CACHE_DIR
+
+TABLE_LIST_FILE = 'table_list.json'
+CACHE_FILE = os.path.join(CACHE_DIR, 'table_list_cache.json')
+
+def web_path(file_path, resources_dir):
+    """页面相对站点根目录的访问路径，如 resources/xxx.html"""
+    site_root = os.path.dirname(os.path.abspath(resources_dir))
+    return os.path.relpath(os.path.abspath(file_path), site_root).replace(os.sep, '/')
+
+def build_table_list(resources_dir='resources', workers=None, cache_file=CACHE_FILE):
+    """解析全部页面，返回 (表记录列表, 本次实际解析的页面数)"""
+    pages = list_table_pages(resources_dir)
+    results, parsed = parse_pages_cached(pages, parse_table_entry, cache_file, workers)
+
+    tables = []
+    for file_path in pages:
+        entry = dict(results[file_path])
+        entry['filepath'] = web_path(file_path, resources_dir)
+        tables.append(entry)
+    return tables, len(parsed)
+
+def write_table_list(tables, output=TABLE_LIST_FILE):
+    """写入 table_list.json"""
+    tmp_path = output + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(tables, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, output)
+
+def main():
+    parser = argparse.ArgumentParser(description='生成 table_list.json 表索引')
+    parser.add_argument('--resources', default='resources', help='表结构页面目录 (默认 resources)')
+    parser.add_argument('--output', default=TABLE_LIST_FILE, help=f'输出文件 (默认 {TABLE_LIST_FILE})')
+    parser.add_argument('--workers', type=int, default=None, help='并行进程数 (默认CPU核数)')
+    parser.add_argument('--no-cache', action='store_true', help='忽略缓存，重新解析全部页面')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.resources):
+        print(f"错误: 目录不存在 {args.resources}")
+        sys.exit(1)
+
+    start = time.time()
+    print(f"🔍 解析 {args.resources} 下的表结构页面...")
+    tables, parsed = build_table_list(
+        args.resources, args.workers, None if args.no_cache else CACHE_FILE
+    )
+    write_table_list(tables, args.output)
+
+    print(f"✅ 已生成 {args.output}: {len(tables)} 张表")
+    print(f"   - 本次解析: {parsed} 个页面，其余 {len(tables) - parsed} 个命中缓存")
+    print(f"   - 耗时: {time.time() - start:.1f} 秒")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+表目录内存索引
+
+server.py 启动时把 table_list.json 加载到内存，为 /api/tables、/api/search 提供
+文本搜索、下拉框筛选、排序、分页和分面统计，页面只需请求一页结果，不必下载整个目录。
+文本搜索与 index.html 使用同一套倒排索引规则（build_search_index.py），包括中文名的拼音前缀查找。
+server.py --watch 在页面变化后用 updated() 增量生成新目录并整体替换，不修改正在使用的目录。
+"""
+
+import json
+
+from build_search_index import (
+    SORT_FIELDS, ASCII_TOKEN_RE, build_orders, build_postings, query_keys, sort_key, table_keys,
+    table_pinyin_keys, prefix_range
+)
+
+# 精确匹配的筛选字段（对应 index.html 的下拉框）
+FILTER_FIELDS = ['module', 'database', 'microservice', 'table_name', 'chinese_name']
+
+# 默认返回的分面；表名、中文名的取值与表数量相当，需要时显式请求
+DEFAULT_FACETS = ['module', 'database', 'microservice']
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+
+def doc_key(table):
+    """表记录的唯一标识：页面路径（没有时取文件名）"""
+    return table.get('filepath') or table['filename']
+
+def search_text(table):
+    """文本校验用的小写字段"""
+    return (table['table_name'].lower(), (table.get('chinese_name') or '').lower(), table['filename'].lower())
+
+def order_ranks(order, size):
+    """文档号 -> 在 order 中的名次"""
+    ranks = [0] * size
+    for rank, doc_id in enumerate(order):
+        ranks[doc_id] = rank
+    return ranks
+
+def insert_sorted(order, doc_id, key):
+    """按 key(文档号) 把文档号插入有序列表（二分查找）"""
+    target = key(doc_id)
+    lo, hi = 0, len(order)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if key(order[mid]) < target:
+            lo = mid + 1
+        else:
+            hi = mid
+    order.insert(lo, doc_id)
+
+def patch_postings(postings, dropped, old_keys, new_docs, ranks):
+    """复制倒排表并只重建涉及的词：去掉 dropped 中的文档号，加入 new_docs {词: [文档号]}，按 ranks 排序"""
+    patched = dict(postings)
+    for key in old_keys | set(new_docs):
+        docs = [doc_id for doc_id in postings.get(key, ()) if doc_id not in dropped]
+        docs.extend(new_docs.get(key, ()))
+        if docs:
+            docs.sort(key=ranks.__getitem__)
+            patched[key] = docs
+        else:
+            patched.pop(key, None)
+    return patched
+
+class TableCatalog:
+    """内存中的表目录：倒排索引 + 各排序方式的名次
+
+    updated() 生成的新目录中，删除的表留下空位（tables 中为 None），空位超过一半时重新编号。
+    """
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.orders = build_orders(tables)
+        self.ranks = {name: order_ranks(order, len(tables)) for name, order in self.orders.items()}
+        self.postings = build_postings(tables, self.orders['name'])
+        # 拼音串 -> 文档号，另存排序的拼音串用于前缀查找
+        self.pinyin_postings = build_postings(tables, self.orders['name'], table_pinyin_keys)
+        self.pinyin_keys = sorted(self.pinyin_postings)
+        self.search_texts = [search_text(table) for table in tables]
+        self.doc_ids = {doc_key(table): doc_id for doc_id, table in enumerate(tables)}
+
+    @classmethod
+    def load(cls, file_path):
+        """从 table_list.json 加载"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self.doc_ids)
+
+    def live_tables(self):
+        """全部表记录（跳过删除留下的空位），按文档号顺序"""
+        return [table for table in self.tables if table is not None]
+
+    def updated(self, changed=(), removed=()):
+        """增量更新，返回新目录：changed 为新增或修改的表记录，removed 为删除的表的 doc_key
+
+        未变化的表沿用原来的文档号，只重建涉及的倒排表，排序顺序中删除/插入变化的文档；
+        原目录不被修改，进行中的搜索可以继续使用。
+        """
+        tables = list(self.tables)
+        doc_ids = dict(self.doc_ids)
+        # 从倒排表、排序中移除的文档号，和需要插入的文档号
+        dropped = set()
+        inserted = []
+        for key in removed:
+            doc_id = doc_ids.pop(key, None)
+            if doc_id is not None:
+                dropped.add(doc_id)
+                tables[doc_id] = None
+        for table in changed:
+            doc_id = doc_ids.get(doc_key(table))
+            if doc_id is None:
+                doc_id = len(tables)
+                tables.append(table)
+                doc_ids[doc_key(table)] = doc_id
+            elif tables[doc_id] == table:
+                continue
+            else:
+                dropped.add(doc_id)
+                tables[doc_id] = table
+            inserted.append(doc_id)
+        if not dropped and not inserted:
+            return self
+
+        if len(tables) > 2 * len(doc_ids):
+            return TableCatalog([table for table in tables if table is not None])
+
+        catalog = TableCatalog.__new__(TableCatalog)
+        catalog.tables = tables
+        catalog.doc_ids = doc_ids
+        catalog.search_texts = list(self.search_texts)
+        catalog.search_texts.extend([None] * (len(tables) - len(self.search_texts)))
+        for doc_id in dropped:
+            catalog.search_texts[doc_id] = None
+        for doc_id in inserted:
+            catalog.search_texts[doc_id] = search_text(tables[doc_id])
+
+        catalog.orders = {}
+        catalog.ranks = {}
+        for name, field in SORT_FIELDS.items():
+            order = [doc_id for doc_id in self.orders[name] if doc_id not in dropped]
+            for doc_id in inserted:
+                insert_sorted(order, doc_id, lambda i: (sort_key(field, tables[i]), i))
+            catalog.orders[name] = order
+            catalog.ranks[name] = order_ranks(order, len(tables))
+
+        # 只重建旧记录或新记录包含的词的倒排表，按表名名次排序
+        for attr, keys_func in (('postings', table_keys), ('pinyin_postings', table_pinyin_keys)):
+            old_keys = set()
+            for doc_id in dropped:
+                old_keys |= keys_func(self.tables[doc_id])
+            new_docs = {}
+            for doc_id in inserted:
+                for key in keys_func(tables[doc_id]):
+                    new_docs.setdefault(key, []).append(doc_id)
+            setattr(catalog, attr, patch_postings(getattr(self, attr), dropped, old_keys, new_docs,
+                                                  catalog.ranks['name']))
+        # 拼音串有增减时重新排序
+        if catalog.pinyin_postings.keys() == self.pinyin_postings.keys():
+            catalog.pinyin_keys = self.pinyin_keys
+        else:
+            catalog.pinyin_keys = sorted(catalog.pinyin_postings)
+        return catalog
+
+    def key_docs(self, key):
+        """索引词对应的文档号：倒排表 + 以该词开头的拼音串，返回 (文档号列表, 是否合并了拼音结果)"""
+        doc_ids = self.postings.get(key, [])
+        start, end = prefix_range(self.pinyin_keys, key)
+        if start == end:
+            return doc_ids, False
+        merged = set(doc_ids)
+        for pinyin in self.pinyin_keys[start:end]:
+            merged.update(self.pinyin_postings[pinyin])
+        return list(merged), True
+
+    def match_text(self, terms):
+        """文本搜索：每个查询词都要出现在表名、中文名或文件名中，返回按表名排序的文档号"""
+        if not terms:
+            return self.orders['name']
+
+        keys = set()
+        for term in terms:
+            keys.update(query_keys(term))
+        if not keys:
+            # 查询词中没有可索引的字符（如只有标点），逐条匹配
+            return self.verify_text(self.orders['name'], terms)
+
+        postings = []
+        merged = False
+        for key in keys:
+            doc_ids, key_merged = self.key_docs(key)
+            postings.append(doc_ids)
+            merged = merged or key_merged
+        postings.sort(key=len)
+        doc_ids = postings[0]
+        for other in postings[1:]:
+            if not doc_ids:
+                break
+            other = set(other)
+            doc_ids = [doc_id for doc_id in doc_ids if doc_id in other]
+        # 合并了拼音结果的倒排表不再是表名顺序
+        if merged:
+            doc_ids = sorted(doc_ids, key=self.ranks['name'].__getitem__)
+
+        # 单个字母数字串的查询词已由索引（名称中词的前缀、拼音前缀）精确匹配，其余查询词按子串校验
+        return self.verify_text(doc_ids, [term for term in terms if not ASCII_TOKEN_RE.fullmatch(term)])
+
+    def verify_text(self, doc_ids, terms):
+        """保留每个查询词都出现在表名、中文名或文件名中的文档"""
+        if not terms:
+            return doc_ids
+        texts = self.search_texts
+        return [
+            doc_id for doc_id in doc_ids
+            if all(term in texts[doc_id][0] or term in texts[doc_id][1] or term in texts[doc_id][2]
+                   for term in terms)
+        ]
+
+    def search(self, query='', filters=None, sort='name', offset=0, limit=DEFAULT_LIMIT,
+               facets=None, facet_max=None):
+        """搜索表目录
+
+        query: 空格分隔的关键词；filters: {FILTER_FIELDS中的字段: 取值}，精确匹配；
+        sort: SORT_FIELDS 中的排序方式；facets: 需要统计的字段。
+        每个分面按"除该字段外的其他筛选条件"统计取值数量，与页面下拉框的联动一致；
+        取值种类超过 facet_max 的分面返回 None。
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f'不支持的排序方式: {sort}')
+        filters = {field: value for field, value in (filters or {}).items() if value}
+        for field in filters:
+            if field not in FILTER_FIELDS:
+                raise ValueError(f'不支持的筛选字段: {field}')
+        facets = DEFAULT_FACETS if facets is None else facets
+        for field in facets:
+            if field not in FILTER_FIELDS:
+                raise ValueError(f'不支持的分面字段: {field}')
+        offset = max(0, offset)
+        limit = max(0, min(limit, MAX_LIMIT))
+
+        tables = self.tables
+        doc_ids = self.match_text(query.lower().split())
+
+        # 记录每个文档未满足的筛选条件：全部满足的进入结果，
+        # 只差一个的计入该字段的分面（其他条件都满足）
+        results = []
+        facet_counts = {field: {} for field in facets}
+        for doc_id in doc_ids:
+            table = tables[doc_id]
+            missed = None
+            miss_count = 0
+            for field, value in filters.items():
+                if table.get(field) != value:
+                    miss_count += 1
+                    if miss_count > 1:
+                        break
+                    missed = field
+            if miss_count > 1:
+                continue
+            if miss_count == 0:
+                results.append(doc_id)
+            for field in facets:
+                if missed is None or missed == field:
+                    value = table.get(field)
+                    if value:
+                        counts = facet_counts[field]
+                        counts[value] = counts.get(value, 0) + 1
+
+        if sort != 'name':
+            ranks = self.ranks[sort]
+            results.sort(key=ranks.__getitem__)
+
+        facet_result = {}
+        for field, counts in facet_counts.items():
+            if facet_max is not None and len(counts) > facet_max:
+                facet_result[field] = None
+            else:
+                facet_result[field] = sorted(counts.items())
+
+        return {
+            'catalog_size': len(self),
+            'total': len(results),
+            'offset': offset,
+            'limit': limit,
+            'sort': sort,
+            'items': [tables[doc_id] for doc_id in results[offset:offset + limit]],
+            'facets': facet_result
+        }
@@ -4,9 +4,23 @@
 import os
 import sys
 import json
+import time
 import fnmatch
+import heapq
+import hashlib
+import argparse
+import itertools
 from pathlib import Path
 
+from sync_engine import OssBucket, LocalBucket, execute_plan, DEFAULT_WORKERS, DEFAULT_RETRIES
+from sync_plan import SyncAction, walk_sorted, plan_sync, save_plan_json, print_plan
+from sync_git import git_head, has_commit, changed_files, dirty_files
+from build_assets import ASSETS_DIR, ASSETS_MANIFEST, IMMUTABLE_CACHE_CONTROL, is_hashed_key, load_manifest
+from page_pack import PACK_DIR, find_pack, is_packed_key
+from precompress import is_compressible, precompress_files, print_stats as print_compress_stats
+from sync_report import PhaseTimer, build_report, write_report, print_report
+from sync_journal import DeployJournal, MultipartEtags, plan_id, JOURNAL_FILE
+
 # 只在需要时导入oss2
 try:
     import oss2
@@ -14,47 +28,235 @@ try:
 except ImportError:
     OSS2_AVAILABLE = False
 
+# 根目录需要部署的文件
+ROOT_FILES = [
+    'index.html',
+    'table_list.json',
+    'server.py',
+    'test_encoding.html',
+    'README.md',
+    'DEPLOYMENT.md',
+    'requirements.txt',
+    'test_deploy.py',
+    'deploy.py'
+]
+
+# 需要递归部署的目录
+DEPLOY_DIRS = [
+    'data/catalog',
+    'data/search',
+    'resources'
+]
+
+# render_pages.py 生成的精简页面目录，--compact-pages 时代替 resources/ 下的同名文件上传
+PAGES_DIR = 'data/pages'
+
+# 部署前由构建步骤生成、不在git中的文件和目录：按提交范围增量部署时，只列举这些前缀与本地比对
+GENERATED_PATHS = ['table_list.json', 'data/catalog', 'data/search']
+
+# 影响上传内容的脚本（含部署脚本本身），有修改时退回完整比对
+RECONCILE_TRIGGERS = ['precompress.py', 'render_pages.py', 'table_parser.py', 'build_assets.py',
+                      'deploy.py', 'sync_engine.py']
+
+# 部署记录（上次部署的提交、完整比对时间、部署选项）和已部署的哈希文件清单，完整比对时不参与删除
+DEPLOY_STATE_PREFIX = '.deploy/'
+DEPLOY_STATE_KEY = '.deploy/state.json'
+DEPLOY_ASSETS_KEY = '.deploy/assets.json'
+DEFAULT_RECONCILE_DAYS = 7
+
+# 哈希文件不再被引用后保留的天数：已打开的页面仍可能按旧文件名请求
+DEFAULT_ASSET_RETENTION_DAYS = 7
+
+def unique_sorted(keys):
+    """去掉有序流中重复的key"""
+    last = None
+    for key in keys:
+        if key != last:
+            yield key
+        last = key
+
+def iter_local_files(compact_pages=False, hashed_assets=False, pack=False):
+    """按OSS key的字典序逐个产出本地需要部署的文件
+
+    compact_pages=True 时额外产出精简页面目录中 resources/ 没有的文件（如 css/schema.css）；
+    hashed_assets=True 时额外产出 build_assets.py 生成的哈希文件（index.html 由其中的版本代替）；
+    pack=True 时页面由 page_pack.py 生成的归档和偏移表（data/pack/）代替。
+    """
+    root_files = sorted(f for f in ROOT_FILES if os.path.exists(f))
+    dir_files = [walk_sorted(d, d + '/') for d in DEPLOY_DIRS]
+    if compact_pages:
+        dir_files.append(key for key in walk_sorted(PAGES_DIR, 'resources/') if not os.path.exists(key))
+    if hashed_assets:
+        dir_files.append(walk_sorted(ASSETS_DIR))
+    if pack:
+        dir_files = [(key for key in files if not is_packed_key(key)) for files in dir_files]
+        dir_files.append(walk_sorted(PACK_DIR, 'data/pack/'))
+    return unique_sorted(heapq.merge(root_files, *dir_files))
+
+def is_deploy_key(path):
+    """git中的路径是否属于需要部署的文件"""
+    if path not in ROOT_FILES and not any(path.startswith(d + '/') for d in DEPLOY_DIRS):
+        return False
+    return should_upload_file(path)
+
+def generated_paths(hashed_assets=False, pack=False):
+    """按前缀比对的生成文件；使用哈希文件时 index.html 也是生成的（引用的哈希文件名随内容变化）"""
+    return GENERATED_PATHS + (['index.html'] if hashed_assets else []) + (['data/pack'] if pack else [])
+
+def iter_generated_files(compact_pages=False, hashed_assets=False, pack=False):
+    """按key字典序产出本地的生成文件（GENERATED_PATHS，--compact-pages 时加上精简页面的样式文件）"""
+    streams = []
+    for path in generated_paths(hashed_assets, pack):
+        if os.path.isfile(path):
+            streams.append([path])
+        else:
+            streams.append(walk_sorted(path, path + '/'))
+    if compact_pages:
+        streams.append(key for key in walk_sorted(os.path.join(PAGES_DIR, 'css'), 'resources/css/')
+                       if not os.path.exists(key))
+    return heapq.merge(*streams)
+
+def list_generated_objects(bucket, compact_pages=False, hashed_assets=False, pack=False):
+    """按key字典序列举存储桶中生成文件对应的对象"""
+    streams = []
+    for path in generated_paths(hashed_assets, pack):
+        if '.' in os.path.basename(path):
+            streams.append(obj for obj in bucket.list_objects(path) if obj[0] == path)
+        else:
+            streams.append(bucket.list_objects(path + '/'))
+    if compact_pages:
+        # 只取精简页面目录中有、resources/ 中没有的样式文件
+        extra = set(iter_generated_files(True)) - set(generated_paths(True))
+        streams.append(obj for obj in bucket.list_objects('resources/css/') if obj[0] in extra)
+    return heapq.merge(*streams)
+
+def load_deploy_state(bucket, key=DEPLOY_STATE_KEY):
+    """读取存储桶中的部署记录，没有或无法解析时返回 None"""
+    data = bucket.get_object(key)
+    if not data:
+        return None
+    try:
+        return json.loads(data.decode('utf-8'))
+    except ValueError:
+        return None
+
+def save_deploy_state(bucket, commit, reconciled, options):
+    """写入部署记录"""
+    state = {
+        'commit': commit,
+        'deployed': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'reconciled': reconciled,
+        'options': options
+    }
+    data = json.dumps(state, ensure_ascii=False, indent=2).encode('utf-8')
+    bucket.put_object(DEPLOY_STATE_KEY, data, headers={'Content-Type': 'application/json; charset=utf-8',
+                                                       'Cache-Control': 'no-cache'})
+
+def save_assets_state(bucket, files, stale):
+    """写入已部署的哈希文件清单 {原key: 哈希key} 和不再引用的哈希文件 {key: 开始保留的时间}"""
+    data = json.dumps({'files': files, 'stale': stale}, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    bucket.put_object(DEPLOY_ASSETS_KEY, data, headers={'Content-Type': 'application/json; charset=utf-8',
+                                                        'Cache-Control': 'no-cache'})
+
+def git_range_changes(state, options, head, dirty, reconcile_days=DEFAULT_RECONCILE_DAYS):
+    """判断能否按提交范围增量部署，返回 (变更列表, 说明)；不能时变更列表为 None，说明为原因
+
+    变更列表为 [(状态, key)]，只包含需要部署的文件。
+    """
+    if not state:
+        return None, '存储桶中没有部署记录'
+    if state.get('options') != options:
+        return None, '部署选项与上次不同'
+    if not state.get('commit'):
+        return None, '上次部署时工作区有未提交的修改'
+    if time.time() - state.get('reconciled', 0) > reconcile_days * 86400:
+        return None, f'距上次完整比对超过 {reconcile_days} 天'
+    if not head:
+        return None, '不在git仓库中'
+    if dirty:
+        return None, f'工作区有未提交的修改 ({dirty[0]} 等 {len(dirty)} 个文件)'
+    if not has_commit(state['commit']):
+        return None, f"本地没有上次部署的提交 {state['commit'][:7]}（浅克隆？）"
+    changes = changed_files(state['commit'], head)
+    if changes is None:
+        return None, 'git diff 失败'
+    for _, path in changes:
+        if path in RECONCILE_TRIGGERS:
+            return None, f'{path} 有修改'
+    return [(status, path) for status, path in changes if is_deploy_key(path)], \
+        f"{state['commit'][:7]}..{head[:7]}"
+
+def plan_asset_changes(old_files, new_files, stale, resolve_path):
+    """按提交范围部署时，由上次部署和本次的哈希文件清单得到哈希文件的上传和删除（删除再经 retain_stale_assets 保留）"""
+    old_keys = set(old_files.values())
+    new_keys = set(new_files.values())
+    for key in sorted(new_keys - old_keys):
+        yield SyncAction('upload', key, resolve_path(key), 'new')
+    for key in sorted((old_keys | set(stale)) - new_keys):
+        yield SyncAction('delete', key, None, 'extra')
+
+def retain_stale_assets(actions, stale, kept, retention_days, now):
+    """不再引用的哈希文件保留 retention_days 天后再删除
+
+    stale 为上次记录的 {key: 开始保留的时间}，仍需保留的key及其时间写入 kept。
+    """
+    for action in actions:
+        if action.op == 'delete' and is_hashed_key(action.key):
+            since = stale.get(action.key, now)
+            if now - since < retention_days * 86400:
+                kept[action.key] = since
+                yield SyncAction('skip', action.key, None, 'retained')
+                continue
+        yield action
+
+def plan_changes(changes, resolve_path):
+    """提交范围内的变更转为同步动作：删除的文件删除对象，其他文件直接上传"""
+    for status, key in changes:
+        if status == 'D' or not os.path.isfile(key):
+            yield SyncAction('delete', key, None, 'deleted')
+        else:
+            yield SyncAction('upload', key, resolve_path(key), 'commit')
+
+def compact_page_path(key):
+    """key 对应的精简页面文件，精简页面目录中没有时返回 key 本身"""
+    if key.startswith('resources/'):
+        path = os.path.join(PAGES_DIR, key[len('resources/'):])
+        if os.path.isfile(path):
+            return path
+    return key
+
+def local_source(key, compact_pages=False, hashed_assets=False):
+    """key 实际上传的本地文件：哈希文件目录、精简页面目录中有时取自其中，否则为 key 本身"""
+    if hashed_assets:
+        path = os.path.join(ASSETS_DIR, *key.split('/'))
+        if os.path.isfile(path):
+            return path
+    return compact_page_path(key) if compact_pages else key
+
 def get_local_files():
     """获取本地需要部署的文件列表"""
-    files_to_deploy = []
-    
-    # 根目录文件
-    root_files = [
-        'index.html',
-        'table_list.json',
-        'server.py',
-        'test_encoding.html',
-        'README.md',
-        'DEPLOYMENT.md',
-        'requirements.txt',
-        'test_deploy.py',
-        'deploy.py'
-    ]
-    
-    for file_path in root_files:
-        if os.path.exists(file_path):
-            files_to_deploy.append(file_path)
+    return list(iter_local_files())
+
+def get_file_md5(file_path):
+    """计算本地文件的MD5（大写十六进制，与OSS普通上传的ETag格式一致）"""
+    md5 = hashlib.md5()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            md5.update(chunk)
+    return md5.hexdigest().upper()
+
+def is_file_changed(file_path, etag, multipart_etags=None):
+    """判断本地文件与OSS上的对象内容是否不同"""
+    if not etag:
+        return True
     
-    # 递归获取resources目录下的所有文件
-    resources_dir = 'resources'
-    if os.path.exists(resources_dir):
-        for root, dirs, files in os.walk(resources_dir):
-            for file in files:
-                file_path = os.path.join(root, file)
-                files_to_deploy.append(file_path)
+    etag = etag.strip('"').upper()
+    # 分片上传生成的ETag不是内容MD5（形如 XXX-3），按上传时记录的内容MD5比较，没有记录时按已变化处理
+    if '-' in etag:
+        md5 = multipart_etags.get(etag) if multipart_etags else None
+        return md5 is None or get_file_md5(file_path) != md5
     
-    return files_to_deploy
-
-def get_oss_files(bucket):
-    """获取OSS上现有的文件列表"""
-    oss_files = []
-    try:
-        for obj in oss2.ObjectIterator(bucket):
-            oss_files.append(obj.key)
-    except Exception as e:
-        print(f"⚠️  获取OSS文件列表时出错: {e}")
-        return []
-    return oss_files
+    return get_file_md5(file_path) != etag
 
 def should_upload_file(file_path):
     """判断文件是否应该上传"""
@@ -70,7 +272,10 @@ def should_upload_file(file_path):
         '.idea',
         'node_modules',
         '*.tmp',
-        '*.bak'
+        '*.bak',
+        # 本地服务器用的预压缩旁路文件，OSS上由 Content-Encoding 上传代替
+        '*.gz',
+        '*.br'
     ]
     
     for pattern in exclude_patterns:
@@ -79,8 +284,8 @@ def should_upload_file(file_path):
     
     return True
 
-def get_content_type_and_headers(file_path):
-    """获取文件的Content-Type和headers"""
+def get_content_type_and_headers(file_path, content_encoding=None):
+    """获取文件的Content-Type和headers，content_encoding 为上传内容的压缩编码"""
     headers = {}
     
     if file_path.endswith('.html'):
@@ -103,6 +308,11 @@ def get_content_type_and_headers(file_path):
             'Content-Type': 'application/javascript; charset=utf-8',
             'Cache-Control': 'public, max-age=3600'
         }
+    elif file_path.endswith('.pack'):
+        headers = {
+            'Content-Type': 'application/octet-stream',
+            'Cache-Control': 'public, max-age=3600'
+        }
     elif file_path.endswith('.png') or file_path.endswith('.jpg') or file_path.endswith('.jpeg') or file_path.endswith('.gif'):
         headers = {
             'Cache-Control': 'public, max-age=86400'
@@ -112,10 +322,17 @@ def get_content_type_and_headers(file_path):
             'Cache-Control': 'public, max-age=3600'
         }
     
+    # 内容哈希命名的文件内容不会变化，缓存一年
+    if is_hashed_key(file_path):
+        headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    
+    if content_encoding:
+        headers['Content-Encoding'] = content_encoding
+    
     return headers
 
-def sync_to_oss():
-    """同步文件到阿里云OSS，确保与GitHub版本完全一致"""
+def create_oss_bucket():
+    """根据环境变量创建OSS存储桶，返回 (bucket, endpoint, bucket_name)"""
     
     if not OSS2_AVAILABLE:
         print("错误: 缺少oss2模块")
@@ -138,84 +355,221 @@ def sync_to_oss():
         print("- OSS_BUCKET")
         sys.exit(1)
     
+    # 创建OSS客户端
+    auth = oss2.Auth(access_key_id, access_key_secret)
+    bucket = OssBucket(oss2.Bucket(auth, endpoint, bucket_name))
+    return bucket, endpoint, bucket_name
+
+def precompress_local_files(compact_pages=False, keys=None, hashed_assets=False, pack=False):
+    """预压缩需要部署的文本文件（keys 指定时只压缩这些文件），返回 {key: gzip缓存文件路径}"""
+    keys = iter_local_files(compact_pages, hashed_assets, pack) if keys is None else keys
+    sources = ((local_source(f, compact_pages, hashed_assets), f) for f in keys if should_upload_file(f))
+    candidates = {path: f for path, f in sources if is_compressible(path)}
+    print(f"🗜️  预压缩 {len(candidates)} 个文件...")
+    variants, stats = precompress_files(list(candidates), ('gzip',))
+    print_compress_stats(stats)
+    return {candidates[path]: v['gzip'] for path, v in variants.items() if 'gzip' in v}
+
+def sync_to_oss(full=False, workers=DEFAULT_WORKERS, retries=DEFAULT_RETRIES, local_bucket=None,
+                dry_run=False, plan_json=None, compress=True, compact_pages=False, quiet=False, report_file=None,
+                resume=True, journal_file=JOURNAL_FILE, reconcile=False, reconcile_days=DEFAULT_RECONCILE_DAYS,
+                hashed_assets=False, asset_retention_days=DEFAULT_ASSET_RETENTION_DAYS, pack=False):
+    """同步文件到阿里云OSS，确保与GitHub版本完全一致
+    
+    本地文件流与OSS列举流按key有序归并，边列举边上传/删除：
+    默认只上传新增或内容变化（MD5与ETag不一致）的文件；
+    full=True 时忽略比较结果，重新上传全部文件。
+    local_bucket 指定本地目录时同步到模拟存储桶，不需要OSS配置。
+    dry_run=True 时只打印同步计划；plan_json 指定时将计划保存为JSON。
+    compress=True 时HTML/JSON/CSS/JS以gzip压缩后上传，并设置 Content-Encoding: gzip。
+    compact_pages=True 时 resources/ 下的页面改为上传 render_pages.py 生成的精简页面（key不变）。
+    quiet=True 时不逐个打印上传/删除的文件（失败仍然打印）。
+    report_file 指定时写入JSON运行报告（阶段耗时、单个对象耗时直方图、字节数、重试、最慢对象），
+    同步失败时也会写入。
+    resume=True 时把已上传的文件记入部署日志 journal_file，中断后重跑跳过日志中内容未变的文件，
+    全部成功后删除日志；resume=False 时忽略并清空已有日志。
+    大文件使用分片上传，分片进度保存在 .cache/multipart/，重跑时从已完成的分片继续。
+    
+    存储桶中的部署记录（DEPLOY_STATE_KEY）保存上次成功部署的提交。有记录、选项相同、工作区干净、
+    且距上次完整比对不超过 reconcile_days 天时，按 git diff 上次提交..HEAD 增量部署：
+    只上传/删除变化的文件，生成文件（GENERATED_PATHS）按前缀列举比对，不列举整个存储桶；
+    否则（或 reconcile=True、full=True）列举整个存储桶完整比对。
+    
+    hashed_assets=True 时同时上传 build_assets.py 生成的内容哈希文件（一年强缓存），index.html 换为引用
+    哈希文件的版本。不再被引用的哈希文件保留 asset_retention_days 天后删除。
+    
+    pack=True 时 resources/ 下的页面不再逐个上传，改为上传 page_pack.py 生成的归档文件和偏移表，
+    存储桶中原有的页面对象在完整比对时删除；旧的归档文件同样保留 asset_retention_days 天。
+    """
+    timer = PhaseTimer()
+    options = {'full': full, 'workers': workers, 'retries': retries, 'compress': compress,
+               'compact_pages': compact_pages, 'hashed_assets': hashed_assets, 'pack': pack,
+               'local_bucket': bool(local_bucket)}
+    upload_stats = delete_stats = journal = None
+    
+    if local_bucket:
+        bucket, endpoint, bucket_name = LocalBucket(local_bucket), None, None
+    else:
+        bucket, endpoint, bucket_name = create_oss_bucket()
+    multipart_etags = MultipartEtags()
+    
     try:
-        # 创建OSS客户端
-        auth = oss2.Auth(access_key_id, access_key_secret)
-        bucket = oss2.Bucket(auth, endpoint, bucket_name)
-        
         print("🔄 开始同步文件到OSS...")
         
-        # 获取本地文件列表
-        local_files = get_local_files()
-        local_files = [f for f in local_files if should_upload_file(f)]
+        # 部署选项不同时上传内容不同（压缩、精简页面、哈希文件、页面归档），不能沿用上次的部署记录
+        deploy_options = {'compress': compress, 'compact_pages': compact_pages, 'hashed_assets': hashed_assets,
+                          'pack': pack}
+        head = git_head()
+        dirty = dirty_files(ROOT_FILES + DEPLOY_DIRS) if head else []
+        state, changes, reason = None, None, '指定了 --full' if full else '指定了 --reconcile'
+        if not (full or reconcile):
+            with timer.phase('plan.git_range'):
+                state = load_deploy_state(bucket)
+                changes, reason = git_range_changes(state, deploy_options, head, dirty, reconcile_days)
+        options['mode'] = 'reconcile' if changes is None else 'git-range'
+        if changes is None:
+            print(f"🔍 完整比对存储桶: {reason}")
+        else:
+            print(f"⚡ 按提交范围增量部署 {reason}: {len(changes)} 个文件有变化")
+            # index.html 等生成文件按前缀比对，不按提交中的变更上传；使用归档时页面的变化体现在归档中
+            generated = set(generated_paths(hashed_assets, pack))
+            changes = [(status, key) for status, key in changes
+                       if key not in generated and not (pack and is_packed_key(key))]
         
-        print(f"📁 本地文件数量: {len(local_files)}")
+        # 哈希文件：本次的清单，上次部署的清单和保留中的旧文件
+        assets_state = load_deploy_state(bucket, DEPLOY_ASSETS_KEY) or {'files': {}, 'stale': {}}
+        asset_files = load_manifest() if hashed_assets else {}
+        kept_assets = {}
+        now = int(time.time())
         
-        # 获取OSS现有文件列表
-        oss_files = get_oss_files(bucket)
-        print(f"☁️  OSS现有文件数量: {len(oss_files)}")
+        # 预压缩：OSS不做内容协商，直接上传gzip内容（所有浏览器都支持）
+        with timer.phase('precompress'):
+            keys = None
+            if changes is not None:
+                keys = [key for status, key in changes if status != 'D'] + \
+                    list(iter_generated_files(compact_pages, hashed_assets, pack)) + \
+                    sorted(set(asset_files.values()) - set(assets_state['files'].values()))
+            compressed = precompress_local_files(compact_pages, keys, hashed_assets, pack) if compress else {}
         
-        # 找出需要删除的文件（在OSS上但不在本地）
-        files_to_delete = [f for f in oss_files if f not in local_files]
+        def resolve_path(key):
+            if key in compressed:
+                return compressed[key]
+            return local_source(key, compact_pages, hashed_assets)
         
-        # 找出需要上传的文件（在本地但不在OSS上，或需要更新）
-        files_to_upload = []
-        for file_path in local_files:
-            if file_path not in oss_files:
-                files_to_upload.append(file_path)
-            else:
-                # 检查文件是否需要更新（这里简化处理，实际可以比较修改时间或MD5）
-                files_to_upload.append(file_path)
+        def get_upload_headers(key):
+            return get_content_type_and_headers(key, 'gzip' if key in compressed else None)
         
-        # 执行删除操作
-        if files_to_delete:
-            print(f"\n🗑️  删除 {len(files_to_delete)} 个文件:")
-            for file_path in files_to_delete:
-                try:
-                    bucket.delete_object(file_path)
-                    print(f"   ✅ 删除: {file_path}")
-                except Exception as e:
-                    print(f"   ❌ 删除失败 {file_path}: {e}")
+        is_changed = lambda path, etag: is_file_changed(path, etag, multipart_etags)
+        if changes is None:
+            # 本地文件与OSS对象均按key有序流式产出，归并生成同步动作；部署记录不参与比对
+            local_files = (f for f in iter_local_files(compact_pages, hashed_assets, pack) if should_upload_file(f))
+            remote_objects = (obj for obj in bucket.list_objects() if not obj[0].startswith(DEPLOY_STATE_PREFIX))
         else:
-            print("\n✅ 没有需要删除的文件")
+            # 提交范围内的变更直接生成动作，生成文件按前缀列举比对
+            local_files = (f for f in iter_generated_files(compact_pages, hashed_assets, pack) if should_upload_file(f))
+            remote_objects = list_generated_objects(bucket, compact_pages, hashed_assets, pack)
+        actions = plan_sync(timer.wrap_iter('plan.local_scan', local_files),
+                            timer.wrap_iter('plan.remote_listing', remote_objects),
+                            timer.wrap_func('plan.change_detection', is_changed), full=full,
+                            resolve_path=resolve_path)
+        if changes is not None:
+            actions = itertools.chain(
+                plan_changes(changes, resolve_path),
+                plan_asset_changes(assets_state['files'], asset_files, assets_state['stale'], resolve_path),
+                actions
+            )
+        actions = retain_stale_assets(actions, assets_state['stale'], kept_assets, asset_retention_days, now)
+        if not dry_run:
+            # 日志按部署目标和影响上传内容的选项区分，--full 与增量部署共用
+            target = os.path.abspath(local_bucket) if local_bucket else f'{endpoint}/{bucket_name}'
+            journal = DeployJournal(journal_file, plan_id(dict(deploy_options, target=target)), resume=resume)
+            if journal.completed:
+                print(f"⏯️  从部署日志继续: 已上传 {len(journal.completed)} 个文件")
+                actions = journal.filter(actions, timer.wrap_func('plan.journal', get_file_md5))
         
-        # 执行上传操作
-        if files_to_upload:
-            print(f"\n📤 上传 {len(files_to_upload)} 个文件:")
-            for file_path in files_to_upload:
-                try:
-                    if os.path.exists(file_path):
-                        # 获取文件headers
-                        headers = get_content_type_and_headers(file_path)
-                        
-                        # 上传文件
-                        bucket.put_object_from_file(file_path, file_path, headers=headers)
-                        print(f"   ✅ 上传: {file_path}")
-                    else:
-                        print(f"   ⚠️  文件不存在: {file_path}")
-                except Exception as e:
-                    print(f"   ❌ 上传失败 {file_path}: {e}")
-        else:
-            print("\n✅ 没有需要上传的文件")
+        def on_uploaded(action, etag):
+            md5 = get_file_md5(action.path)
+            journal.record(action.key, md5)
+            if etag and '-' in etag:
+                multipart_etags.add(etag, md5)
+        
+        if plan_json:
+            actions = save_plan_json(actions, plan_json)
+        
+        if dry_run:
+            print("\n📋 同步计划 (dry-run):")
+            counts = print_plan(actions)
+            print(f"\n📊 计划统计:")
+            print(f"   - 删除文件: {counts['delete']}")
+            print(f"   - 上传文件: {counts['upload']}")
+            print(f"   - 未变化跳过: {counts['skip']}")
+            if plan_json:
+                print(f"\n💾 同步计划已保存: {plan_json}")
+            return
+        
+        print(f"\n🚀 执行同步 (并发数: {workers}):")
+        upload_stats, delete_stats, skipped = execute_plan(
+            bucket, actions, get_upload_headers, workers=workers, retries=retries,
+            verbose=not quiet, timer=timer, on_uploaded=on_uploaded
+        )
+        counts = {'upload': upload_stats.objects + len(upload_stats.failed),
+                  'delete': delete_stats.objects + len(delete_stats.failed), 'skip': skipped,
+                  'resumed': journal.skipped}
+        failed = upload_stats.failed + delete_stats.failed
+        # 有失败时保留日志，重跑时只处理未完成的文件
+        journal.close(finished=not failed)
+        if not failed:
+            # 工作区有未提交的修改时不记录提交，下次部署完整比对
+            reconciled = int(time.time()) if changes is None else state['reconciled']
+            save_deploy_state(bucket, None if dirty else head, reconciled, deploy_options)
+            if asset_files or kept_assets or assets_state['files']:
+                save_assets_state(bucket, asset_files, kept_assets)
         
         print(f"\n🎉 同步完成！")
         print(f"📊 统计信息:")
-        print(f"   - 删除文件: {len(files_to_delete)}")
-        print(f"   - 上传文件: {len(files_to_upload)}")
-        print(f"   - 最终文件总数: {len(local_files)}")
+        print(f"   - 删除文件: {delete_stats.objects}")
+        print(f"   - 上传文件: {upload_stats.objects}")
+        print(f"   - 未变化跳过: {skipped}")
+        if journal.skipped:
+            print(f"   - 部署日志中已完成: {journal.skipped}")
+        if changes is None:
+            print(f"   - 最终文件总数: {upload_stats.objects + len(upload_stats.failed) + skipped}")
+        if upload_stats.objects:
+            print(f"   - 上传速度: {upload_stats.rate_summary()} (耗时 {upload_stats.elapsed:.1f} 秒, 重试 {upload_stats.retries} 次)")
+        
+        if failed:
+            print(f"   - ❌ 失败文件: {len(failed)}，已保留部署日志 {journal_file}，重新运行将从中断处继续")
+        report = build_report(timer, options, counts, upload_stats, delete_stats)
+        print_report(report)
+        if report_file:
+            write_report(report, report_file)
+            print(f"\n💾 运行报告已保存: {report_file}")
+        if plan_json:
+            print(f"\n💾 同步计划已保存: {plan_json}")
         
-        # 显示访问URL
-        if endpoint and endpoint.startswith('https://'):
-            domain = endpoint.replace('https://', '')
-        elif endpoint:
-            domain = endpoint
+        if local_bucket:
+            print(f'\n📂 本地存储桶: {local_bucket}')
         else:
-            domain = 'oss-cn-hangzhou.aliyuncs.com'  # 默认域名
+            # 显示访问URL
+            if endpoint and endpoint.startswith('https://'):
+                domain = endpoint.replace('https://', '')
+            elif endpoint:
+                domain = endpoint
+            else:
+                domain = 'oss-cn-hangzhou.aliyuncs.com'  # 默认域名
             
-        print(f'\n🌐 访问地址: https://{bucket_name}.{domain}')
+            print(f'\n🌐 访问地址: https://{bucket_name}.{domain}')
         
     except Exception as e:
         print(f'❌ 同步失败: {e}')
+        if journal:
+            journal.close()
+            print(f'⏯️  已保留部署日志 {journal_file}，重新运行将从中断处继续')
+        if report_file:
+            write_report(build_report(timer, options, None, upload_stats, delete_stats, error=e), report_file)
+        sys.exit(1)
+    
+    if failed:
         sys.exit(1)
 
 def create_github_action():
@@ -227,6 +581,9 @@ on:
   push:
     branches: [ main ]
   workflow_dispatch:
+  # 每周完整比对一次存储桶（平时按上次部署的提交增量部署）
+  schedule:
+    - cron: '0 18 * * 0'
 
 jobs:
   deploy:
@@ -234,6 +591,9 @@ jobs:
     steps:
       - name: Checkout
         uses: actions/checkout@v2
+        with:
+          # 完整历史，用于与上次部署的提交做 git diff
+          fetch-depth: 0
       
       - name: Setup Python
         uses: actions/setup-python@v2
@@ -244,6 +604,28 @@ jobs:
         run: |
           pip install -r requirements.txt
       
+      # 在已安装全部依赖（含 pypinyin）的环境中运行测试，失败时不部署
+      - name: Run tests
+        run: |
+          python test_build.py
+          python test_server.py
+          python test_sync.py
+      
+      # 预压缩缓存、部署日志和分片上传进度；部署失败或取消时也保存，重跑时从中断处继续
+      - name: Restore deploy cache
+        uses: actions/cache/restore@v4
+        with:
+          path: .cache
+          key: deploy-cache-${{ github.sha }}-${{ github.run_attempt }}
+          restore-keys: |
+            deploy-cache-
+      
+      - name: Build table list
+        run: |
+          python build_table_list.py
+          python build_catalog.py
+          python build_search_index.py
+      
       - name: Deploy to Aliyun OSS
         env:
           OSS_ACCESS_KEY_ID: ${{ secrets.OSS_ACCESS_KEY_ID }}
@@ -251,7 +633,22 @@ jobs:
           OSS_ENDPOINT: ${{ secrets.OSS_ENDPOINT }}
           OSS_BUCKET: ${{ secrets.OSS_BUCKET }}
         run: |
-          python deploy.py
+          python deploy.py --quiet --report deploy-report.json ${{ github.event_name == 'schedule' && '--reconcile' || '' }}
+      
+      - name: Upload deploy report
+        if: always()
+        uses: actions/upload-artifact@v4
+        with:
+          name: deploy-report
+          path: deploy-report.json
+          if-no-files-found: ignore
+      
+      - name: Save deploy cache
+        if: always()
+        uses: actions/cache/save@v4
+        with:
+          path: .cache
+          key: deploy-cache-${{ github.sha }}-${{ github.run_attempt }}
 '''
     
     # 确保目录存在
@@ -264,7 +661,54 @@ jobs:
     print('✅ GitHub Action工作流文件已创建: .github/workflows/deploy-aliyun.yml')
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1 and sys.argv[1] == '--create-action':
+    parser = argparse.ArgumentParser(description='同步文件到阿里云OSS')
+    parser.add_argument('--create-action', action='store_true', help='创建GitHub Action工作流文件')
+    parser.add_argument('--full', action='store_true', help='忽略变化检测，重新上传全部文件')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help=f'并发上传/删除线程数 (默认 {DEFAULT_WORKERS})')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES, help=f'单个文件失败重试次数 (默认 {DEFAULT_RETRIES})')
+    parser.add_argument('--local-bucket', metavar='DIR', help='同步到本地目录模拟的存储桶（用于测试）')
+    parser.add_argument('--dry-run', action='store_true', help='只打印同步计划，不执行上传和删除')
+    parser.add_argument('--plan-json', metavar='FILE', help='将同步计划保存为JSON文件')
+    parser.add_argument('--no-compress', action='store_true', help='上传原始文件，不做gzip预压缩')
+    parser.add_argument('--compact-pages', action='store_true',
+                        help=f'resources/ 下的页面上传 {PAGES_DIR} 中的精简页面（先运行 render_pages.py）')
+    parser.add_argument('--quiet', '-q', action='store_true', help='不逐个打印上传/删除的文件，只打印失败和统计')
+    parser.add_argument('--reconcile', action='store_true',
+                        help='列举整个存储桶完整比对，不按上次部署的提交增量部署')
+    parser.add_argument('--reconcile-days', type=int, default=DEFAULT_RECONCILE_DAYS,
+                        help=f'距上次完整比对超过该天数时自动完整比对 (默认 {DEFAULT_RECONCILE_DAYS})')
+    parser.add_argument('--hashed-assets', action='store_true',
+                        help=f'同时上传 build_assets.py 生成的内容哈希文件（{ASSETS_DIR}），index.html 引用哈希文件')
+    parser.add_argument('--asset-retention-days', type=int, default=DEFAULT_ASSET_RETENTION_DAYS,
+                        help=f'不再引用的哈希文件保留天数 (默认 {DEFAULT_ASSET_RETENTION_DAYS})')
+    parser.add_argument('--pack', action='store_true',
+                        help=f'页面改为上传 page_pack.py 生成的归档文件和偏移表（{PACK_DIR}），不再逐个上传')
+    parser.add_argument('--no-resume', action='store_true', help='忽略上次中断留下的部署日志，从头开始')
+    parser.add_argument('--report', metavar='FILE', help='写入JSON运行报告（阶段耗时、耗时直方图、重试、最慢对象）')
+    args = parser.parse_args()
+    
+    if args.compact_pages and not os.path.isdir(PAGES_DIR):
+        print(f"错误: 目录不存在 {PAGES_DIR}，请先运行 python render_pages.py")
+        sys.exit(1)
+    
+    if args.hashed_assets and not os.path.exists(ASSETS_MANIFEST):
+        print(f"错误: {ASSETS_MANIFEST} 不存在，请先运行 python build_assets.py")
+        sys.exit(1)
+    
+    if args.pack and find_pack(PACK_DIR) is None:
+        print(f"错误: {PACK_DIR} 中没有页面归档，请先运行 python page_pack.py build")
+        sys.exit(1)
+    
+    if args.pack and args.hashed_assets:
+        print("错误: --pack 与 --hashed-assets 不能同时使用（归档文件本身以内容哈希命名）")
+        sys.exit(1)
+    
+    if args.create_action:
         create_github_action()
     else:
-        sync_to_oss() 
\ No newline at end of file
+        sync_to_oss(full=args.full, workers=args.workers, retries=args.retries, local_bucket=args.local_bucket,
+                    dry_run=args.dry_run, plan_json=args.plan_json, compress=not args.no_compress,
+                    compact_pages=args.compact_pages, quiet=args.quiet, report_file=args.report,
+                    resume=not args.no_resume, reconcile=args.reconcile, reconcile_days=args.reconcile_days,
+                    hashed_assets=args.hashed_assets, asset_retention_days=args.asset_retention_days,
+                    pack=args.pack) 
\ No newline at end of file
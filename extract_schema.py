@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+表结构数据提取
+
+从 resources/ 下的页面中提取基本信息和字段详细信息，生成紧凑的结构化数据：
+1. data/schema/tables/<文件ID>.json: 每张表一个文件，字段按行存为数组
+2. data/schema/columns.json: 全部表合并的列式存储，重复取值（数据类型等）字典编码
+
+后续的搜索、对比、渲染直接读取这些小文件，不再重复解析430MB的HTML。
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+from table_parser import (
+    list_table_pages, parse_pages_cached, parse_table_schema,
+    COLUMN_FIELDS, TABLE_FIELDS, CACHE_DIR
+)
+
+SCHEMA_DIR = os.path.join('data', 'schema')
+COLUMN_STORE_FILE = 'columns.json'
+CACHE_FILE = os.path.join(CACHE_DIR, 'schema_cache.json')
+
+# 列式存储格式版本
+STORE_VERSION = 1
+
+# 列式存储中做字典编码的字段
+DICTIONARY_FIELDS = ['data_type', 'length', 'default']
+
+def table_file_name(table):
+    """单表数据文件名"""
+    return f"{table['file_id'] or os.path.splitext(table['filename'])[0]}.json"
+
+def table_to_record(table):
+    """单表结构转为紧凑记录：表级字段 + 字段按 COLUMN_FIELDS 顺序存为数组"""
+    record = {field: table[field] for field in TABLE_FIELDS}
+    record['column_fields'] = COLUMN_FIELDS
+    record['columns'] = [[column[field] for field in COLUMN_FIELDS] for column in table['columns']]
+    return record
+
+def record_to_table(record):
+    """紧凑记录还原为单表结构"""
+    table = {field: record.get(field, '') for field in TABLE_FIELDS}
+    fields = record.get('column_fields', COLUMN_FIELDS)
+    table['columns'] = [dict(zip(fields, row)) for row in record['columns']]
+    return table
+
+def build_column_store(tables):
+    """构建全部表的列式存储
+
+    tables 中第 i 张表的字段位于 columns 各数组的
+    [column_start[i], column_start[i] + column_count[i]) 区间。
+    """
+    store_tables = {field: [] for field in TABLE_FIELDS + ['column_start', 'column_count']}
+    store_columns = {field: [] for field in COLUMN_FIELDS}
+    dictionaries = {field: [] for field in DICTIONARY_FIELDS}
+    dictionary_index = {field: {} for field in DICTIONARY_FIELDS}
+
+    column_count = 0
+    for table in tables:
+        for field in TABLE_FIELDS:
+            store_tables[field].append(table[field])
+        store_tables['column_start'].append(column_count)
+        store_tables['column_count'].append(len(table['columns']))
+        column_count += len(table['columns'])
+
+        for column in table['columns']:
+            for field in COLUMN_FIELDS:
+                value = column[field]
+                if field in dictionary_index:
+                    index = dictionary_index[field]
+                    if value not in index:
+                        index[value] = len(dictionaries[field])
+                        dictionaries[field].append(value)
+                    value = index[value]
+                store_columns[field].append(value)
+
+    return {
+        'version': STORE_VERSION,
+        'table_count': len(tables),
+        'column_count': column_count,
+        'tables': store_tables,
+        'columns': store_columns,
+        'dictionaries': dictionaries
+    }
+
+def iter_column_store(store):
+    """遍历列式存储，逐个产出单表结构（与 parse_table_schema 的结果格式一致）"""
+    tables = store['tables']
+    columns = store['columns']
+    dictionaries = store['dictionaries']
+    for i in range(store['table_count']):
+        table = {field: tables[field][i] for field in TABLE_FIELDS}
+        start = tables['column_start'][i]
+        table['columns'] = []
+        for j in range(start, start + tables['column_count'][i]):
+            column = {}
+            for field in COLUMN_FIELDS:
+                value = columns[field][j]
+                if field in dictionaries:
+                    value = dictionaries[field][value]
+                column[field] = value
+            table['columns'].append(column)
+        yield table
+
+def load_column_store(schema_dir=SCHEMA_DIR):
+    """读取列式存储"""
+    with open(os.path.join(schema_dir, COLUMN_STORE_FILE), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def write_json(file_path, data):
+    """紧凑格式写入JSON（先写临时文件再替换）"""
+    tmp_path = file_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        # json.dumps 走C实现的编码器，比 json.dump 直接写文件快得多
+        f.write(json.dumps(data, ensure_ascii=False, separators=(',', ':')))
+    os.replace(tmp_path, file_path)
+
+def load_tables(resources_dir='resources', workers=None, cache_file=CACHE_FILE):
+    """解析全部页面的完整结构，返回 (表结构列表, 本次实际解析的页面路径列表)"""
+    pages = list_table_pages(resources_dir)
+    results, parsed = parse_pages_cached(pages, parse_table_schema, cache_file, workers)
+    return [results[file_path] for file_path in pages], parsed
+
+def extract_schema(resources_dir='resources', output_dir=SCHEMA_DIR, workers=None, cache_file=CACHE_FILE):
+    """提取全部表结构并写入单表文件和列式存储，返回统计信息"""
+    tables, parsed = load_tables(resources_dir, workers, cache_file)
+    parsed_names = {os.path.basename(file_path) for file_path in parsed}
+
+    tables_dir = os.path.join(output_dir, 'tables')
+    os.makedirs(tables_dir, exist_ok=True)
+    existing = set(os.listdir(tables_dir))
+
+    # 只重写解析过或缺失的单表文件，并清理已删除表的文件
+    written = 0
+    current = set()
+    for table in tables:
+        name = table_file_name(table)
+        current.add(name)
+        if table['filename'] in parsed_names or name not in existing:
+            write_json(os.path.join(tables_dir, name), table_to_record(table))
+            written += 1
+
+    removed = 0
+    for name in existing - current:
+        if name.endswith('.json'):
+            os.remove(os.path.join(tables_dir, name))
+            removed += 1
+
+    store = build_column_store(tables)
+    write_json(os.path.join(output_dir, COLUMN_STORE_FILE), store)
+
+    return {
+        'tables': len(tables),
+        'columns': store['column_count'],
+        'parsed': len(parsed),
+        'written': written,
+        'removed': removed
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='提取表结构字段信息为结构化数据')
+    parser.add_argument('--resources', default='resources', help='表结构页面目录 (默认 resources)')
+    parser.add_argument('--output', default=SCHEMA_DIR, help=f'输出目录 (默认 {SCHEMA_DIR})')
+    parser.add_argument('--workers', type=int, default=None, help='并行进程数 (默认CPU核数)')
+    parser.add_argument('--no-cache', action='store_true', help='忽略缓存，重新解析全部页面')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.resources):
+        print(f"错误: 目录不存在 {args.resources}")
+        sys.exit(1)
+
+    start = time.time()
+    print(f"🔍 提取 {args.resources} 下的表结构...")
+    stats = extract_schema(args.resources, args.output, args.workers, None if args.no_cache else CACHE_FILE)
+
+    store_size = os.path.getsize(os.path.join(args.output, COLUMN_STORE_FILE))
+    print(f"✅ 已提取 {stats['tables']} 张表, {stats['columns']} 个字段")
+    print(f"   - 本次解析: {stats['parsed']} 个页面")
+    print(f"   - 单表文件: 写入 {stats['written']} 个, 删除 {stats['removed']} 个")
+    print(f"   - 列式存储: {os.path.join(args.output, COLUMN_STORE_FILE)} ({store_size / 1024 / 1024:.1f} MB)")
+    print(f"   - 耗时: {time.time() - start:.1f} 秒")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+外键关系图索引
+
+导出页面中"外键信息"一列全部为空，只有 237 个字段勾选了"是否为外键"，
+因此引用目标按字段名推断：
+- 外键信息非空时取其中的 表名.字段名
+- xxx_id / xxxid 引用名为 xxx 或以 _xxx 结尾、且有 id 字段的表（xxx 为单个词时，
+  后缀匹配只限与当前表名前缀相同的表）；候选多个时优先同一数据库、表名与 xxx 相同、
+  与当前表名前缀相同的表，其次表名最短的
+- 少量约定俗成的字段名按别名处理（creator、user_id -> employee，parent_id -> 本表）
+
+勾选了外键的字段记为 declared，其余按字段名推断出的记为 inferred。
+边保存为紧凑的平行数组（data/schema/fk_graph.json），加载后在内存中建立邻接表，
+"哪些字段引用了 hrm_*.id" 和 "两张表之间的最短关联路径"（BFS）都在毫秒级完成。
+
+    python3 fk_graph.py build
+    python3 fk_graph.py refs 'hrm_*'
+    python3 fk_graph.py path wf_request employee
+"""
+
+import os
+import sys
+import json
+import time
+import fnmatch
+import argparse
+from collections import deque
+
+from extract_schema import load_tables, write_json, SCHEMA_DIR, CACHE_FILE as SCHEMA_CACHE_FILE
+
+GRAPH_FILE = os.path.join(SCHEMA_DIR, 'fk_graph.json')
+GRAPH_VERSION = 1
+
+# 边的来源
+DECLARED = 'declared'
+INFERRED = 'inferred'
+EDGE_KINDS = [DECLARED, INFERRED]
+
+# 目标表的主键字段
+TARGET_COLUMN = 'id'
+
+# 去掉 id 后缀后的字段名 -> 目标表名（None 表示引用本表）
+COLUMN_ALIASES = {
+    'creator': 'employee',
+    'modifier': 'employee',
+    'updater': 'employee',
+    'operator': 'employee',
+    'user': 'employee',
+    'dept': 'department',
+    'parent': None,
+    'p': None
+}
+
+# 最短路径的默认最大跳数
+DEFAULT_MAX_DEPTH = 6
+
+def table_label(table):
+    """表的显示名：数据库.表名"""
+    return f"{table['database']}.{table['table_name']}" if table['database'] else table['table_name']
+
+def reference_base(column_name):
+    """字段名去掉 id 后缀，得到被引用对象的名称；不像引用字段时返回空串"""
+    name = column_name.lower()
+    if name in COLUMN_ALIASES:
+        return name
+    if name.endswith('_id'):
+        return name[:-3]
+    if name.endswith('id') and len(name) > 4:
+        return name[:-2]
+    return ''
+
+def common_prefix_parts(a, b):
+    """两个表名按 _ 切分后相同前缀的段数"""
+    count = 0
+    for x, y in zip(a.split('_'), b.split('_')):
+        if x != y:
+            break
+        count += 1
+    return count
+
+class TargetResolver:
+    """按字段名推断被引用的表"""
+
+    def __init__(self, tables):
+        self.tables = tables
+        # 只有带 id 字段的表可以作为引用目标
+        self.by_name = {}
+        self.by_suffix = {}
+        for i, table in enumerate(tables):
+            if not any(column['name'].lower() == TARGET_COLUMN for column in table['columns']):
+                continue
+            name = table['table_name'].lower()
+            if not name:
+                continue
+            self.by_name.setdefault(name, []).append(i)
+            parts = name.split('_')
+            for k in range(1, len(parts)):
+                self.by_suffix.setdefault('_'.join(parts[k:]), []).append(i)
+
+    def resolve(self, source, column):
+        """推断 tables[source] 的字段 column 引用的表，返回 (表序号, 字段名)，推断不出时返回 None"""
+        fk_info = (column.get('fk_info') or '').strip()
+        if fk_info:
+            name, _, target_column = fk_info.partition('.')
+            candidates = self.by_name.get(name.lower(), [])
+            if candidates:
+                return self.best(source, candidates), target_column or TARGET_COLUMN
+
+        base = reference_base(column['name'])
+        if not base:
+            return None
+        if base in COLUMN_ALIASES:
+            alias = COLUMN_ALIASES[base]
+            if alias is None:
+                return source, TARGET_COLUMN
+            candidates = self.by_name.get(alias, [])
+        else:
+            # 单个词（如 relate、target）按后缀匹配误判太多，只匹配与源表前缀相同的表
+            name = self.tables[source]['table_name'].lower()
+            candidates = self.by_name.get(base, []) + [
+                i for i in self.by_suffix.get(base, [])
+                if '_' in base or common_prefix_parts(name, self.tables[i]['table_name'].lower()) > 0
+            ]
+        candidates = [i for i in candidates if i != source]
+        if not candidates:
+            return None
+        return self.best(source, candidates, base), TARGET_COLUMN
+
+    def best(self, source, candidates, base=''):
+        """候选表中与源表最接近的：同一数据库 > 表名与字段名完全相同 > 表名相同前缀更长 > 表名更短"""
+        table = self.tables[source]
+        name = table['table_name'].lower()
+
+        def score(i):
+            target = self.tables[i]
+            return (
+                target['database'] == table['database'],
+                target['table_name'].lower() == base,
+                common_prefix_parts(name, target['table_name'].lower()),
+                -len(target['table_name']),
+                -i
+            )
+        return max(candidates, key=score)
+
+def build_graph(tables):
+    """由表结构构建外键关系图（紧凑格式）"""
+    resolver = TargetResolver(tables)
+    column_names = []
+    column_index = {}
+
+    def column_id(name):
+        if name not in column_index:
+            column_index[name] = len(column_names)
+            column_names.append(name)
+        return column_index[name]
+
+    edges = {'source': [], 'source_column': [], 'target': [], 'target_column': [], 'kind': []}
+    for source, table in enumerate(tables):
+        for column in table['columns']:
+            if column['name'].lower() == TARGET_COLUMN:
+                continue
+            declared = bool(column.get('foreign_key'))
+            resolved = resolver.resolve(source, column)
+            if resolved is None:
+                continue
+            target, target_column = resolved
+            edges['source'].append(source)
+            edges['source_column'].append(column_id(column['name']))
+            edges['target'].append(target)
+            edges['target_column'].append(column_id(target_column))
+            edges['kind'].append(0 if declared else 1)
+
+    return {
+        'version': GRAPH_VERSION,
+        'kinds': EDGE_KINDS,
+        'tables': {
+            'table_name': [table['table_name'] for table in tables],
+            'database': [table['database'] for table in tables],
+            'filename': [table['filename'] for table in tables]
+        },
+        'column_names': column_names,
+        'edges': edges
+    }
+
+class ForeignKeyGraph:
+    """内存中的外键关系图：出边、入边邻接表"""
+
+    def __init__(self, data, declared_only=False):
+        tables = data['tables']
+        self.table_names = tables['table_name']
+        self.databases = tables['database']
+        self.filenames = tables['filename']
+        column_names = data['column_names']
+        kinds = data['kinds']
+        edges = data['edges']
+
+        # 邻接表元素: (对端表, 本端字段, 对端字段, 来源)
+        self.outgoing = [[] for _ in self.table_names]
+        self.incoming = [[] for _ in self.table_names]
+        self.edge_count = 0
+        for source, source_column, target, target_column, kind in zip(
+                edges['source'], edges['source_column'], edges['target'], edges['target_column'], edges['kind']):
+            kind = kinds[kind]
+            if declared_only and kind != DECLARED:
+                continue
+            source_column = column_names[source_column]
+            target_column = column_names[target_column]
+            self.outgoing[source].append((target, source_column, target_column, kind))
+            self.incoming[target].append((source, target_column, source_column, kind))
+            self.edge_count += 1
+
+        self.by_name = {}
+        for i, name in enumerate(self.table_names):
+            self.by_name.setdefault(name.lower(), []).append(i)
+            if self.databases[i]:
+                self.by_name.setdefault(f'{self.databases[i]}.{name}'.lower(), []).append(i)
+
+    @classmethod
+    def load(cls, file_path=GRAPH_FILE, declared_only=False):
+        """从 fk_graph.json 加载"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), declared_only)
+
+    def __len__(self):
+        return len(self.table_names)
+
+    def label(self, i):
+        return f'{self.databases[i]}.{self.table_names[i]}' if self.databases[i] else self.table_names[i]
+
+    def find_tables(self, pattern):
+        """按表名或 数据库.表名 查找表，支持 * ? 通配符，返回表序号列表"""
+        pattern = pattern.lower()
+        if not any(c in pattern for c in '*?['):
+            return list(self.by_name.get(pattern, []))
+        return [
+            i for i, name in enumerate(self.table_names)
+            if fnmatch.fnmatchcase(name.lower(), pattern) or fnmatch.fnmatchcase(self.label(i).lower(), pattern)
+        ]
+
+    def edge(self, source, source_column, target, target_column, kind):
+        return {
+            'from': self.label(source), 'from_column': source_column,
+            'to': self.label(target), 'to_column': target_column,
+            'kind': kind, 'from_file': self.filenames[source]
+        }
+
+    def references(self, pattern, column=None, limit=None):
+        """引用了匹配 pattern 的表（column 指定时只看该字段，如 id）的全部字段"""
+        results = []
+        for target in self.find_tables(pattern):
+            for source, target_column, source_column, kind in self.incoming[target]:
+                if column is None or target_column == column:
+                    results.append(self.edge(source, source_column, target, target_column, kind))
+        results.sort(key=lambda edge: (edge['to'], edge['from'], edge['from_column']))
+        total = len(results)
+        return {'total': total, 'items': results[:limit] if limit is not None else results}
+
+    def neighbors(self, table):
+        """表的出边和入边"""
+        tables = self.find_tables(table)
+        return {
+            'tables': [self.label(i) for i in tables],
+            'references': [self.edge(i, sc, t, tc, kind) for i in tables for t, sc, tc, kind in self.outgoing[i]],
+            'referenced_by': [self.edge(s, sc, i, tc, kind) for i in tables for s, tc, sc, kind in self.incoming[i]]
+        }
+
+    def join_path(self, start, end, max_depth=DEFAULT_MAX_DEPTH):
+        """两张表之间的最短关联路径（忽略边的方向做BFS），返回连接步骤列表，不连通时返回 None
+
+        start、end 可以匹配多张表（重名表或通配符），返回其中最短的一条路径。
+        """
+        sources = self.find_tables(start)
+        targets = set(self.find_tables(end))
+        if not sources or not targets:
+            return None
+
+        previous = {i: None for i in sources}
+        queue = deque((i, 0) for i in sources)
+        found = next((i for i in sources if i in targets), None)
+        while queue and found is None:
+            node, depth = queue.popleft()
+            if depth >= max_depth:
+                continue
+            steps = [(t, (node, sc, t, tc, kind)) for t, sc, tc, kind in self.outgoing[node]]
+            steps += [(s, (s, sc, node, tc, kind)) for s, tc, sc, kind in self.incoming[node]]
+            for neighbor, edge in steps:
+                if neighbor in previous:
+                    continue
+                previous[neighbor] = (node, edge)
+                if neighbor in targets:
+                    found = neighbor
+                    break
+                queue.append((neighbor, depth + 1))
+        if found is None:
+            return None
+
+        # 沿前驱回溯到起点表
+        path = []
+        node = found
+        while previous[node] is not None:
+            node, edge = previous[node]
+            path.append(self.edge(*edge))
+        path.reverse()
+        return {'from': self.label(node), 'to': self.label(found), 'length': len(path), 'steps': path}
+
+def print_edges(edges):
+    """打印引用关系"""
+    for edge in edges:
+        mark = '' if edge['kind'] == DECLARED else ' (推断)'
+        print(f"   {edge['from']}.{edge['from_column']} -> {edge['to']}.{edge['to_column']}{mark}")
+
+def main():
+    parser = argparse.ArgumentParser(description='外键关系图索引')
+    parser.add_argument('--graph', default=GRAPH_FILE, help=f'关系图文件 (默认 {GRAPH_FILE})')
+    parser.add_argument('--declared-only', action='store_true', help='只使用勾选了"是否为外键"的字段')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='解析页面并生成关系图')
+    build_parser.add_argument('--resources', default='resources', help='表结构页面目录 (默认 resources)')
+    build_parser.add_argument('--workers', type=int, default=None, help='并行进程数 (默认CPU核数)')
+
+    refs_parser = subparsers.add_parser('refs', help='哪些字段引用了指定的表')
+    refs_parser.add_argument('table', help='表名、数据库.表名，支持通配符，如 hrm_*')
+    refs_parser.add_argument('--column', default=TARGET_COLUMN, help=f'被引用的字段 (默认 {TARGET_COLUMN})')
+    refs_parser.add_argument('--limit', type=int, default=50, help='打印条数 (默认 50)')
+
+    show_parser = subparsers.add_parser('show', help='表的全部引用和被引用关系')
+    show_parser.add_argument('table', help='表名或 数据库.表名')
+
+    path_parser = subparsers.add_parser('path', help='两张表之间的最短关联路径')
+    path_parser.add_argument('start', help='起点表')
+    path_parser.add_argument('end', help='终点表')
+    path_parser.add_argument('--max-depth', type=int, default=DEFAULT_MAX_DEPTH,
+                             help=f'最大跳数 (默认 {DEFAULT_MAX_DEPTH})')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        if not os.path.isdir(args.resources):
+            print(f"错误: 目录不存在 {args.resources}")
+            sys.exit(1)
+        start = time.time()
+        tables, _ = load_tables(args.resources, args.workers, SCHEMA_CACHE_FILE)
+        data = build_graph(tables)
+        os.makedirs(os.path.dirname(args.graph) or '.', exist_ok=True)
+        write_json(args.graph, data)
+        kinds = data['edges']['kind']
+        print(f"✅ {len(tables)} 张表, {len(kinds)} 条引用关系 "
+              f"(勾选外键 {kinds.count(0)}, 按字段名推断 {kinds.count(1)}) -> {args.graph} "
+              f"({os.path.getsize(args.graph) / 1024:.0f} KB, {time.time() - start:.1f} 秒)")
+        return
+
+    if not os.path.exists(args.graph):
+        print(f"错误: 关系图不存在 {args.graph}（先运行 python3 fk_graph.py build）")
+        sys.exit(1)
+    graph = ForeignKeyGraph.load(args.graph, args.declared_only)
+
+    start = time.time()
+    if args.command == 'refs':
+        result = graph.references(args.table, args.column or None, args.limit)
+        print_edges(result['items'])
+        print(f"共 {result['total']} 个字段引用了 {args.table}.{args.column} ({(time.time() - start) * 1000:.1f} ms)")
+    elif args.command == 'show':
+        result = graph.neighbors(args.table)
+        if not result['tables']:
+            print(f"未找到表 {args.table}")
+            sys.exit(1)
+        print(f"🔗 {', '.join(result['tables'])} 引用 {len(result['references'])} 张表:")
+        print_edges(result['references'])
+        print(f"🔗 被 {len(result['referenced_by'])} 个字段引用:")
+        print_edges(result['referenced_by'])
+    else:
+        result = graph.join_path(args.start, args.end, args.max_depth)
+        if result is None:
+            print(f"未找到 {args.start} 与 {args.end} 之间 {args.max_depth} 跳以内的关联路径")
+            sys.exit(1)
+        print(f"🔗 {result['from']} -> {result['to']}: {result['length']} 跳 ({(time.time() - start) * 1000:.1f} ms)")
+        print_edges(result['steps'])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+表结构页面归档
+
+一万多个页面各占一个文件：本地目录遍历和CI检出慢，OSS上也是一万多个对象。
+本脚本把 resources/ 下的全部页面写入一个归档文件（可选逐个gzip压缩，复用 precompress.py 的缓存）：
+
+    头部:   PACK_MAGIC + 偏移表位置(u64) + 偏移表长度(u64)
+    正文:   各页面的内容依次存放
+    偏移表: JSON，各页面的 key、偏移、长度、原始大小、压缩编码、内容MD5（列式存放）
+
+输出（默认 data/pack/）：
+- resources.<哈希>.pack: 归档文件，文件名带内容哈希，部署时设置强缓存
+- index.json: 偏移表（不含MD5）和归档文件名，浏览器据此用 Range 请求读取单个页面
+
+server.py --pack 用 mmap 打开归档，按原来的URL（/resources/<文件名>）直接发送其中的内容；
+deploy.py --pack 上传归档和偏移表，代替逐个上传页面。extract 子命令把归档还原为页面文件。
+"""
+
+import os
+import sys
+import gzip
+import json
+import mmap
+import time
+import struct
+import hashlib
+import argparse
+from collections import namedtuple
+
+from table_parser import list_table_pages
+from precompress import is_compressible, precompress_files, CACHE_DIR
+from build_assets import HASH_LENGTH
+
+PACK_VERSION = 1
+PACK_DIR = os.path.join('data', 'pack')
+PACK_INDEX_NAME = 'index.json'
+PACK_MAGIC = b'E10PACK1'
+# 头部：魔数、偏移表位置、偏移表长度
+PACK_HEADER = struct.Struct('<8sQQ')
+
+# 偏移表中的一项；encoding 为 gzip 或空字符串（未压缩），md5 为原始内容的MD5
+PackEntry = namedtuple('PackEntry', ['name', 'offset', 'length', 'size', 'encoding', 'md5'])
+
+def pack_sources(resources_dir='resources', pages_dir=None):
+    """归档的页面 [(key, 本地文件)]，按key排序；pages_dir 中有同名精简页面时取自其中"""
+    sources = []
+    for page in list_table_pages(resources_dir):
+        name = os.path.basename(page)
+        source = page
+        if pages_dir and os.path.isfile(os.path.join(pages_dir, name)):
+            source = os.path.join(pages_dir, name)
+        sources.append((f'resources/{name}', source))
+    return sources
+
+def read_file(file_path):
+    with open(file_path, 'rb') as f:
+        return f.read()
+
+def file_md5(file_path):
+    md5 = hashlib.md5()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+def build_pack(resources_dir='resources', output_dir=PACK_DIR, compress=True, pages_dir=None,
+               workers=None, cache_dir=CACHE_DIR):
+    """生成归档文件和偏移表，删除旧的归档文件，返回 index.json 的内容"""
+    sources = pack_sources(resources_dir, pages_dir)
+    variants = {}
+    if compress:
+        variants, _ = precompress_files([path for _, path in sources if is_compressible(path)],
+                                        ('gzip',), workers, cache_dir)
+
+    columns = {'names': [], 'offsets': [], 'lengths': [], 'sizes': [], 'encodings': [], 'md5s': []}
+    os.makedirs(output_dir, exist_ok=True)
+    tmp_path = os.path.join(output_dir, 'resources.pack.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(PACK_HEADER.pack(PACK_MAGIC, 0, 0))
+        for key, path in sources:
+            data = read_file(path)
+            gzip_path = variants.get(path, {}).get('gzip')
+            body = read_file(gzip_path) if gzip_path else data
+            columns['names'].append(key)
+            columns['offsets'].append(f.tell())
+            columns['lengths'].append(len(body))
+            columns['sizes'].append(len(data))
+            columns['encodings'].append('gzip' if gzip_path else '')
+            columns['md5s'].append(hashlib.md5(data).hexdigest())
+            f.write(body)
+
+        index_offset = f.tell()
+        index_data = json.dumps(dict(columns, version=PACK_VERSION), ensure_ascii=False,
+                                separators=(',', ':')).encode('utf-8')
+        f.write(index_data)
+        f.seek(0)
+        f.write(PACK_HEADER.pack(PACK_MAGIC, index_offset, len(index_data)))
+
+    # 归档文件名带内容哈希，内容不变时文件名不变
+    pack_name = f'resources.{file_md5(tmp_path)[:HASH_LENGTH]}.pack'
+    os.replace(tmp_path, os.path.join(output_dir, pack_name))
+    for name in os.listdir(output_dir):
+        if name.endswith('.pack') and name != pack_name:
+            os.remove(os.path.join(output_dir, name))
+
+    # 浏览器用的偏移表不需要MD5（归档内的偏移表保留，供 server.py 生成ETag和 verify 校验）
+    index = {key: values for key, values in columns.items() if key != 'md5s'}
+    index.update(version=PACK_VERSION, pack=pack_name,
+                 pack_size=os.path.getsize(os.path.join(output_dir, pack_name)))
+    # 偏移表最后写入，读到它时归档文件已经就绪
+    index_path = os.path.join(output_dir, PACK_INDEX_NAME)
+    with open(index_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(index_path + '.tmp', index_path)
+    return index
+
+def find_pack(path=PACK_DIR):
+    """归档文件路径：path 可以是归档文件、偏移表或其所在目录，找不到时返回 None"""
+    if os.path.isdir(path):
+        path = os.path.join(path, PACK_INDEX_NAME)
+    if path.endswith('.json'):
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            path = os.path.join(os.path.dirname(path), json.load(f)['pack'])
+    return path if os.path.isfile(path) else None
+
+def is_packed_key(key):
+    """key 是否为归档中的页面：resources/ 下一级的 .html 文件（与 list_table_pages 一致）"""
+    return key.startswith('resources/') and key.endswith('.html') and '/' not in key[len('resources/'):]
+
+class PagePack:
+    """mmap 打开的归档文件，按key取出页面，多线程读取安全"""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._file = open(file_path, 'rb')
+        try:
+            self.stat = os.fstat(self._file.fileno())
+            self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self._file.close()
+            raise
+        magic, index_offset, index_length = PACK_HEADER.unpack_from(self.data, 0)
+        if magic != PACK_MAGIC:
+            self.close()
+            raise ValueError(f'不是页面归档文件: {file_path}')
+        index = json.loads(self.data[index_offset:index_offset + index_length].decode('utf-8'))
+        self.entries = {
+            row[0]: PackEntry(*row)
+            for row in zip(index['names'], index['offsets'], index['lengths'], index['sizes'],
+                           index['encodings'], index['md5s'])
+        }
+
+    @classmethod
+    def open(cls, path=PACK_DIR):
+        """打开归档：path 可以是归档文件、偏移表或其所在目录"""
+        file_path = find_pack(path)
+        if file_path is None:
+            raise OSError(f'未找到页面归档: {path}')
+        return cls(file_path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, name):
+        """key 对应的条目，不存在时返回 None"""
+        return self.entries.get(name)
+
+    def raw(self, entry):
+        """条目在归档中存放的内容（可能是压缩的），返回 mmap 的 memoryview，不复制"""
+        return memoryview(self.data)[entry.offset:entry.offset + entry.length]
+
+    def read(self, name):
+        """key 对应的原始内容（已解压），不存在时返回 None"""
+        entry = self.entries.get(name)
+        if entry is None:
+            return None
+        data = self.data[entry.offset:entry.offset + entry.length]
+        return gzip.decompress(data) if entry.encoding == 'gzip' else data
+
+    def close(self):
+        self.data.close()
+        self._file.close()
+
+def extract_pack(pack, output_dir='.', names=None):
+    """把归档中的页面（names 指定时只取这些key）写到 output_dir/<key>，返回写出的文件数"""
+    count = 0
+    for name in sorted(names if names is not None else pack.entries):
+        data = pack.read(name)
+        if data is None:
+            raise KeyError(f'归档中没有 {name}')
+        parts = name.split('/')
+        if '..' in parts or not all(parts):
+            raise KeyError(f'无效的key {name}')
+        target = os.path.join(output_dir, *parts)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(data)
+        count += 1
+    return count
+
+def verify_pack(pack):
+    """校验每个条目解压后的大小和MD5，返回不一致的key列表"""
+    bad = []
+    for name, entry in pack.entries.items():
+        data = pack.read(name)
+        if len(data) != entry.size or hashlib.md5(data).hexdigest() != entry.md5:
+            bad.append(name)
+    return sorted(bad)
+
+def main():
+    parser = argparse.ArgumentParser(description='表结构页面归档')
+    parser.add_argument('--pack', default=PACK_DIR, help=f'归档目录，或归档文件/偏移表 (默认 {PACK_DIR})')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='把页面写入归档文件')
+    build_parser.add_argument('--resources', default='resources', help='表结构页面目录 (默认 resources)')
+    build_parser.add_argument('--compact-pages', action='store_true',
+                              help='页面取自 render_pages.py 生成的 data/pages（与 deploy.py --compact-pages 对应）')
+    build_parser.add_argument('--no-compress', action='store_true', help='页面不压缩')
+    build_parser.add_argument('--workers', type=int, default=None, help='并行压缩的进程数 (默认CPU核数)')
+
+    extract_parser = subparsers.add_parser('extract', help='把归档还原为页面文件')
+    extract_parser.add_argument('names', nargs='*', help='只还原这些key（如 resources/xxx.html），默认全部')
+    extract_parser.add_argument('--output', default='.', help='输出目录，页面写到 <输出目录>/<key> (默认当前目录)')
+
+    subparsers.add_parser('verify', help='校验归档中每个页面的大小和MD5')
+    args = parser.parse_args()
+
+    start = time.time()
+    if args.command == 'build':
+        if not os.path.isdir(args.resources):
+            print(f"错误: 目录不存在 {args.resources}")
+            sys.exit(1)
+        pages_dir = os.path.join('data', 'pages') if args.compact_pages else None
+        if pages_dir and not os.path.isdir(pages_dir):
+            print(f"错误: 目录不存在 {pages_dir}，请先运行 python render_pages.py")
+            sys.exit(1)
+        print(f"📦 生成页面归档到 {args.pack}...")
+        index = build_pack(args.resources, args.pack, not args.no_compress, pages_dir, args.workers)
+        original = sum(index['sizes'])
+        print(f"✅ {len(index['names'])} 个页面 -> {os.path.join(args.pack, index['pack'])}")
+        print(f"   - 大小: {index['pack_size'] / 1024 / 1024:.1f} MB (原始 {original / 1024 / 1024:.1f} MB)")
+        print(f"   - 耗时: {time.time() - start:.1f} 秒")
+        return
+
+    try:
+        pack = PagePack.open(args.pack)
+    except (OSError, ValueError) as e:
+        print(f"错误: {e}（先运行 python3 page_pack.py build）")
+        sys.exit(1)
+    try:
+        if args.command == 'extract':
+            try:
+                count = extract_pack(pack, args.output, args.names or None)
+            except KeyError as e:
+                print(f"错误: {e.args[0]}")
+                sys.exit(1)
+            print(f"✅ 已还原 {count} 个页面到 {args.output} ({time.time() - start:.1f} 秒)")
+        else:
+            bad = verify_pack(pack)
+            for name in bad:
+                print(f"   ❌ {name}")
+            if bad:
+                print(f"❌ {len(bad)} / {len(pack)} 个页面校验失败")
+                sys.exit(1)
+            print(f"✅ {len(pack)} 个页面校验通过 ({time.time() - start:.1f} 秒)")
+    finally:
+        pack.close()
+
+if __name__ == "__main__":
+    main()
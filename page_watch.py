@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+表结构页面变化监视
+
+server.py --watch 使用：在后台线程中定时扫描 resources/ 目录（安装了 inotify_simple 时改为等待文件系统事件），
+按 修改时间+大小 找出新增、修改、删除的页面，只重新解析这些页面，把变化交给回调函数。
+解析结果与 build_table_list.py 共用缓存文件，之后手动生成 table_list.json 时不必重新解析。
+
+单独运行时打印检测到的变化，可用于确认导出工具写入的页面能被识别。
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+from collections import namedtuple
+
+from table_parser import parse_pages_cached, parse_table_entry, save_parse_cache
+from build_table_list import web_path, CACHE_FILE
+
+# 可选的 inotify 支持（Linux）；没有时按间隔轮询
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+    HAS_INOTIFY = True
+except ImportError:
+    HAS_INOTIFY = False
+
+# 轮询间隔（秒）
+DEFAULT_INTERVAL = 2.0
+
+# 收到 inotify 事件后继续收集该毫秒数内的事件，导出工具连续写入大量页面时合并为一次更新
+INOTIFY_DELAY = 500
+
+# 少于该数量的变化页面在监视线程中直接解析，不启动进程池
+PARALLEL_MIN_PAGES = 64
+
+# 一次扫描发现的变化：added/modified/removed 为页面的 filepath，changed 为新增和修改页面的表记录
+PageChanges = namedtuple('PageChanges', ['added', 'modified', 'removed', 'changed'])
+
+def scan_pages(resources_dir='resources'):
+    """目录下各页面的签名 {文件路径: [修改时间(纳秒), 大小]}，路径格式与 list_table_pages 一致"""
+    signatures = {}
+    try:
+        entries = list(os.scandir(resources_dir))
+    except FileNotFoundError:
+        return signatures
+    for entry in entries:
+        if not entry.name.endswith('.html'):
+            continue
+        try:
+            st = entry.stat()
+        except FileNotFoundError:
+            continue
+        if entry.is_file():
+            signatures[os.path.join(resources_dir, entry.name)] = [st.st_mtime_ns, st.st_size]
+    return signatures
+
+def diff_signatures(old, new):
+    """对比两次扫描，返回 (新增, 修改, 删除) 的文件路径，各自排序"""
+    added = sorted(path for path in new if path not in old)
+    modified = sorted(path for path in new if path in old and old[path] != new[path])
+    removed = sorted(path for path in old if path not in new)
+    return added, modified, removed
+
+class PageWatcher:
+    """监视页面目录，维护 {文件路径: 解析结果} 并在页面变化时调用 on_change(PageChanges)"""
+
+    def __init__(self, resources_dir='resources', on_change=None, interval=DEFAULT_INTERVAL,
+                 workers=None, cache_file=CACHE_FILE):
+        self.resources_dir = resources_dir
+        self.on_change = on_change
+        self.interval = interval
+        self.workers = workers
+        self.cache_file = cache_file
+        # 与 parse_pages_cached 的缓存格式相同：{文件路径: {"sig": 签名, "data": 解析结果}}
+        self.entries = {}
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def record(self, file_path):
+        """页面的表记录（table_list.json 中的一条）"""
+        entry = dict(self.entries[file_path]['data'])
+        entry['filepath'] = web_path(file_path, self.resources_dir)
+        return entry
+
+    def tables(self):
+        """当前全部表记录，按文件路径排序（与 build_table_list.py 生成的顺序一致）"""
+        return [self.record(file_path) for file_path in sorted(self.entries)]
+
+    def load(self):
+        """全量扫描并解析（命中缓存的页面不重新解析），返回本次实际解析的页面数"""
+        signatures = scan_pages(self.resources_dir)
+        results, parsed = parse_pages_cached(sorted(signatures), parse_table_entry, self.cache_file, self.workers)
+        # 记录解析前扫描到的签名，解析期间又被修改的页面在下次扫描时重新解析
+        self.entries = {
+            file_path: {'sig': signatures[file_path], 'data': data}
+            for file_path, data in results.items()
+        }
+        return len(parsed)
+
+    def poll(self):
+        """扫描一次，只解析新增和修改的页面，返回 PageChanges；没有变化时返回 None"""
+        signatures = scan_pages(self.resources_dir)
+        old = {file_path: entry['sig'] for file_path, entry in self.entries.items()}
+        added, modified, removed = diff_signatures(old, signatures)
+        if not (added or modified or removed):
+            return None
+
+        # 解析失败（如页面在扫描后被删除）时不更新状态，下次扫描重试
+        paths = added + modified
+        workers = self.workers if len(paths) >= PARALLEL_MIN_PAGES else 1
+        results, _ = parse_pages_cached(paths, parse_table_entry, None, workers)
+        for file_path in paths:
+            self.entries[file_path] = {'sig': signatures[file_path], 'data': results[file_path]}
+        for file_path in removed:
+            del self.entries[file_path]
+        if self.cache_file:
+            save_parse_cache(self.cache_file, self.entries)
+
+        return PageChanges(
+            added=[web_path(file_path, self.resources_dir) for file_path in added],
+            modified=[web_path(file_path, self.resources_dir) for file_path in modified],
+            removed=[web_path(file_path, self.resources_dir) for file_path in removed],
+            changed=[self.record(file_path) for file_path in paths]
+        )
+
+    def run(self):
+        """监视循环，直到 stop() 被调用"""
+        inotify = None
+        if HAS_INOTIFY and os.path.isdir(self.resources_dir):
+            inotify = INotify()
+            inotify.add_watch(self.resources_dir, inotify_flags.CREATE | inotify_flags.DELETE |
+                              inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO | inotify_flags.MOVED_FROM)
+        try:
+            while not self.stop_event.is_set():
+                if inotify is not None:
+                    # 没有事件时按间隔超时，及时响应 stop()
+                    if not inotify.read(timeout=int(self.interval * 1000), read_delay=INOTIFY_DELAY):
+                        continue
+                elif self.stop_event.wait(self.interval):
+                    break
+                try:
+                    changes = self.poll()
+                    if changes and self.on_change:
+                        self.on_change(changes)
+                except Exception as e:
+                    print(f"⚠️  处理页面变化失败: {e}")
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+    def start(self):
+        """在后台线程中运行监视循环"""
+        self.thread = threading.Thread(target=self.run, name='page-watcher', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+
+def main():
+    parser = argparse.ArgumentParser(description='监视表结构页面的变化')
+    parser.add_argument('--resources', default='resources', help='表结构页面目录 (默认 resources)')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help=f'轮询间隔，秒 (默认 {DEFAULT_INTERVAL:g})')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.resources):
+        print(f"错误: 目录不存在 {args.resources}")
+        sys.exit(1)
+
+    def on_change(changes):
+        print(f"🔄 {time.strftime('%H:%M:%S')} 新增 {len(changes.added)}，修改 {len(changes.modified)}，"
+              f"删除 {len(changes.removed)}")
+        for label, paths in (('+', changes.added), ('~', changes.modified), ('-', changes.removed)):
+            for path in paths[:20]:
+                print(f"   {label} {path}")
+
+    watcher = PageWatcher(args.resources, on_change, args.interval)
+    start = time.time()
+    parsed = watcher.load()
+    print(f"👀 监视 {args.resources}（{len(watcher.entries)} 个页面，本次解析 {parsed} 个，"
+          f"{time.time() - start:.1f} 秒，{'inotify' if HAS_INOTIFY else f'每 {args.interval:g} 秒轮询'}）")
+    print("按 Ctrl+C 停止")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+静态文件预压缩
+
+表结构页面大量重复单元格样板，gzip压缩比约19:1。部署前多进程并行生成
+gzip/brotli压缩版本，按内容哈希缓存在本地，未变化的页面不会重复压缩。
+gzip输出固定 mtime=0，相同内容每次得到相同字节，保证OSS ETag比较有效。
+"""
+
+import os
+import sys
+import gzip
+import shutil
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+# 只在需要时导入brotli
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# 需要压缩的文件类型
+COMPRESS_EXTENSIONS = ('.html', '.json', '.css', '.js')
+
+# 小于该大小的文件压缩收益不大
+MIN_COMPRESS_SIZE = 1024
+
+# 压缩结果缓存目录
+CACHE_DIR = os.path.join('.cache', 'precompress')
+
+# 编码 -> 缓存文件扩展名
+ENCODING_SUFFIXES = {
+    'gzip': '.gz',
+    'br': '.br'
+}
+
+# 压缩无收益的标记文件扩展名（加在缓存文件名之后）
+SKIP_SUFFIX = '.skip'
+
+def is_compressible(file_path):
+    """判断文件是否需要预压缩"""
+    if not file_path.endswith(COMPRESS_EXTENSIONS):
+        return False
+    try:
+        return os.path.getsize(file_path) >= MIN_COMPRESS_SIZE
+    except OSError:
+        return False
+
+def available_encodings(encodings):
+    """过滤掉当前环境不支持的编码"""
+    result = []
+    for encoding in encodings:
+        if encoding == 'br' and not BROTLI_AVAILABLE:
+            continue
+        if encoding in ENCODING_SUFFIXES:
+            result.append(encoding)
+    return result
+
+def compress_bytes(data, encoding, level=None):
+    """按指定编码压缩数据（level 为空时使用最高压缩级别）"""
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=level or 9, mtime=0)
+    if encoding == 'br':
+        return brotli.compress(data, quality=level or 11)
+    raise ValueError(f'不支持的压缩编码: {encoding}')
+
+def compress_file(file_path, encodings=('gzip',), cache_dir=CACHE_DIR):
+    """压缩单个文件，返回 ({编码: 缓存文件路径}, 本次实际压缩的次数)
+
+    缓存文件以源文件内容的SHA1命名；压缩后不比原文件小的编码不返回。
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha1(data).hexdigest()
+
+    variants = {}
+    compressed_count = 0
+    for encoding in encodings:
+        cache_path = os.path.join(cache_dir, digest[:2], digest + ENCODING_SUFFIXES[encoding])
+        # 压缩后不变小的内容只留下空的 .skip 标记，之后部署不再重复压缩
+        skip_path = cache_path + SKIP_SUFFIX
+        if os.path.exists(skip_path):
+            continue
+        if not os.path.exists(cache_path):
+            compressed = compress_bytes(data, encoding)
+            compressed_count += 1
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            if len(compressed) >= len(data):
+                open(skip_path, 'wb').close()
+                continue
+            # 先写临时文件再替换，避免并行进程读到不完整的缓存
+            tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(compressed)
+            os.replace(tmp_path, cache_path)
+        variants[encoding] = cache_path
+    return variants, compressed_count
+
+def _compress_task(args):
+    file_path, encodings, cache_dir = args
+    return compress_file(file_path, encodings, cache_dir)
+
+def precompress_files(file_paths, encodings=('gzip',), workers=None, cache_dir=CACHE_DIR):
+    """多进程并行预压缩，返回 ({文件路径: {编码: 缓存文件路径}}, 统计信息)"""
+    encodings = tuple(available_encodings(encodings))
+    file_paths = list(file_paths)
+    results = {}
+    stats = {'files': len(file_paths), 'compressed': 0, 'original_bytes': 0, 'compressed_bytes': {}}
+    if not file_paths or not encodings:
+        return results, stats
+
+    tasks = [(file_path, encodings, cache_dir) for file_path in file_paths]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for file_path, (variants, compressed_count) in zip(
+                file_paths, executor.map(_compress_task, tasks, chunksize=64)):
+            results[file_path] = variants
+            stats['compressed'] += compressed_count
+            stats['original_bytes'] += os.path.getsize(file_path)
+            for encoding, cache_path in variants.items():
+                stats['compressed_bytes'][encoding] = (
+                    stats['compressed_bytes'].get(encoding, 0) + os.path.getsize(cache_path)
+                )
+    return results, stats
+
+def write_sidecars(results):
+    """在源文件旁写出压缩版本（x.html.gz / x.html.br），供 server.py 直接发送
+
+    已存在且不比源文件旧、大小一致的旁路文件不重写，返回写出的文件数。
+    """
+    written = 0
+    for file_path, variants in results.items():
+        source_mtime = os.stat(file_path).st_mtime_ns
+        for encoding, cache_path in variants.items():
+            sidecar_path = file_path + ENCODING_SUFFIXES[encoding]
+            try:
+                st = os.stat(sidecar_path)
+                if st.st_mtime_ns >= source_mtime and st.st_size == os.path.getsize(cache_path):
+                    continue
+            except OSError:
+                pass
+            shutil.copyfile(cache_path, sidecar_path)
+            written += 1
+    return written
+
+def print_stats(stats):
+    """打印压缩统计"""
+    original = stats['original_bytes']
+    print(f"   - 文件数量: {stats['files']} (本次压缩 {stats['compressed']} 次，其余命中缓存)")
+    print(f"   - 原始大小: {original / 1024 / 1024:.1f} MB")
+    for encoding, size in stats['compressed_bytes'].items():
+        ratio = original / size if size else 0
+        print(f"   - {encoding}: {size / 1024 / 1024:.1f} MB (压缩比 {ratio:.1f}:1)")
+
+def main():
+    """命令行入口：预先生成压缩缓存"""
+    parser = argparse.ArgumentParser(description='预压缩静态文件')
+    parser.add_argument('paths', nargs='*', default=['resources'], help='需要压缩的文件或目录 (默认 resources)')
+    parser.add_argument('--encodings', default='gzip,br', help='压缩编码，逗号分隔 (默认 gzip,br)')
+    parser.add_argument('--workers', type=int, default=None, help='并行进程数 (默认CPU核数)')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help=f'缓存目录 (默认 {CACHE_DIR})')
+    parser.add_argument('--sidecar', action='store_true',
+                        help='同时在源文件旁写出 .gz/.br 文件，供 server.py 直接发送')
+    args = parser.parse_args()
+
+    encodings = available_encodings(args.encodings.split(','))
+    if 'br' in args.encodings.split(',') and not BROTLI_AVAILABLE:
+        print("⚠️  缺少brotli模块，跳过brotli压缩（pip install brotli）")
+    if not encodings:
+        print("错误: 没有可用的压缩编码")
+        sys.exit(1)
+
+    file_paths = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                for file in files:
+                    file_path = os.path.join(root, file)
+                    if is_compressible(file_path):
+                        file_paths.append(file_path)
+        elif is_compressible(path):
+            file_paths.append(path)
+
+    print(f"🗜️  预压缩 {len(file_paths)} 个文件 ({', '.join(encodings)})...")
+    results, stats = precompress_files(file_paths, encodings, args.workers, args.cache_dir)
+    print_stats(stats)
+    if args.sidecar:
+        print(f"   - 旁路文件: 写出 {write_sidecars(results)} 个")
+
+if __name__ == "__main__":
+    main()
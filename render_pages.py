@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+精简表结构页面渲染
+
+resources/ 下的页面是电子表格渲染器的导出结果，包含9列布局表格和大量空白单元格。
+这里把解析出的基本信息和字段详细信息重新渲染为语义化的精简HTML，
+沿用共享样式 resources/css/889749337939845157.css，文件名与原页面一致：
+
+    data/pages/<原文件名>.html
+    data/pages/css/889749337939845157.css
+    data/pages/css/schema.css
+
+精简页面额外的少量样式放在 data/pages/css/schema.css，各页面共用。
+页面结构保持 table_parser 可解析（基本信息为"标签单元格 + 取值单元格"，
+字段行为 <tr data-id>，开关字段为复选框），渲染结果可以再次提取出相同的数据。
+多进程渲染，按表结构内容的摘要增量更新，只重新渲染变化的表。
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from html import escape
+from concurrent.futures import ProcessPoolExecutor
+
+from table_parser import BASIC_INFO_LABELS, COLUMN_FIELDS, FLAG_FIELDS, CACHE_DIR
+from extract_schema import load_tables, CACHE_FILE as SCHEMA_CACHE_FILE
+
+PAGES_DIR = os.path.join('data', 'pages')
+STYLE_FILE = os.path.join('css', '889749337939845157.css')
+PAGE_STYLE_FILE = os.path.join('css', 'schema.css')
+RENDER_CACHE_FILE = os.path.join(CACHE_DIR, 'render_cache.json')
+
+# 模板版本，修改页面模板后递增，使已有页面全部重新渲染
+RENDER_VERSION = 1
+
+# 字段详细信息表头（与 COLUMN_FIELDS 顺序一致）
+COLUMN_LABELS = [
+    '序号', '数据库列名', '中文名称', '数据类型', '长度', '是否允许空值',
+    '是否为外键', '是否自增长', '默认值', '是否为主键', '外键信息', '说明'
+]
+
+# 基本信息按原页面的两列布局排列
+BASIC_INFO_ROWS = [
+    ('table_name', 'chinese_name'),
+    ('module', 'microservice'),
+    ('database', 'description')
+]
+
+FIELD_LABELS = {field: label for label, field in BASIC_INFO_LABELS.items()}
+
+# 精简页面样式：共享样式中 table 为 table-layout: fixed，这里补充自适应列宽和边框
+PAGE_STYLE = (
+    'body{padding:12px}'
+    '.page-title{font-size:18px;font-weight:700;padding:6px 12px}'
+    '.internal-title{font-size:14px;font-weight:700}'
+    '.schema{width:100%;table-layout:auto}'
+    '.schema td,.schema th{border:1px solid #e5e5e5;padding:5px;white-space:pre-line}'
+    '.schema th{background:#f5f5f5;font-weight:400}'
+    '.schema tbody tr:nth-child(even){background:#fafafa}'
+    '.info td:nth-child(odd){width:10%;color:#666}\n'
+)
+
+def text(value):
+    """单元格文本（HTML转义）"""
+    return escape(str(value), quote=False)
+
+def render_basic_info(table):
+    """基本信息：每行两组 标签单元格 + 取值单元格"""
+    rows = []
+    for fields in BASIC_INFO_ROWS:
+        cells = ''.join(f'<td>{FIELD_LABELS[field]}</td><td>{text(table.get(field, ""))}</td>' for field in fields)
+        rows.append(f'<tr>{cells}</tr>')
+    return f"<table class='schema info'>{''.join(rows)}</table>"
+
+def render_column(column):
+    """字段详细信息的一行"""
+    cells = []
+    for field in COLUMN_FIELDS:
+        value = column.get(field, '')
+        if field in FLAG_FIELDS:
+            # 未勾选的开关留空：每行4个空复选框约占页面体积的三分之一
+            cells.append('<td><input type=checkbox checked disabled></td>' if value else '<td></td>')
+        else:
+            cells.append(f'<td>{text(value)}</td>')
+    return f"<tr data-id='{column.get('seq', '')}'>{''.join(cells)}</tr>"
+
+def render_page(table):
+    """渲染单张表的精简页面"""
+    title = text(table['table_name'])
+    if table.get('chinese_name'):
+        title += f"({text(table['chinese_name'])})"
+    header = ''.join(f'<th>{label}</th>' for label in COLUMN_LABELS)
+    rows = ''.join(render_column(column) for column in table['columns'])
+    return (
+        '<!DOCTYPE html>\n'
+        f'<html lang="zh-CN"><head><meta charset="utf-8"><title>{title}</title>'
+        f'<link href="./{STYLE_FILE}" rel="stylesheet" type="text/css">'
+        f'<link href="./{PAGE_STYLE_FILE}" rel="stylesheet" type="text/css"></head><body>\n'
+        "<div class='page-title'>数据字典</div>\n"
+        "<div class='internal-title'>基本信息</div>\n"
+        f'{render_basic_info(table)}\n'
+        "<div class='internal-title'>详细信息</div>\n"
+        "<div class='detail-title-content'><div class='detail-title'>字段详细信息</div></div>\n"
+        f"<table class='schema'><thead><tr>{header}</tr></thead><tbody>\n{rows}\n</tbody></table>\n"
+        '</body></html>\n'
+    )
+
+def table_digest(table):
+    """表结构内容摘要（含模板版本），用于判断是否需要重新渲染"""
+    data = json.dumps([RENDER_VERSION, table], ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+def render_to_file(task):
+    """渲染并写入单个页面（子进程中执行），返回写入的字节数"""
+    table, file_path = task
+    data = render_page(table).encode('utf-8')
+    tmp_path = file_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, file_path)
+    return len(data)
+
+def load_render_cache(cache_file):
+    """读取渲染缓存，格式为 {文件名: 内容摘要}"""
+    if not cache_file or not os.path.exists(cache_file):
+        return {}
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_render_cache(cache_file, cache):
+    """写入渲染缓存"""
+    os.makedirs(os.path.dirname(cache_file) or '.', exist_ok=True)
+    tmp_path = cache_file + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(cache, ensure_ascii=False, separators=(',', ':')))
+    os.replace(tmp_path, cache_file)
+
+def write_if_changed(file_path, data):
+    """内容有变化时写入文件，返回是否写入"""
+    if os.path.exists(file_path):
+        with open(file_path, 'rb') as f:
+            if f.read() == data:
+                return False
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'wb') as f:
+        f.write(data)
+    return True
+
+def write_styles(resources_dir, output_dir):
+    """复制共享样式文件并写入精简页面样式，返回更新的文件数"""
+    updated = write_if_changed(os.path.join(output_dir, PAGE_STYLE_FILE), PAGE_STYLE.encode('utf-8'))
+    source = os.path.join(resources_dir, STYLE_FILE)
+    if os.path.exists(source):
+        with open(source, 'rb') as f:
+            updated += write_if_changed(os.path.join(output_dir, STYLE_FILE), f.read())
+    return updated
+
+def render_pages(tables, output_dir=PAGES_DIR, workers=None, cache_file=RENDER_CACHE_FILE,
+                 resources_dir='resources'):
+    """渲染全部表的精简页面，只渲染内容有变化或缺失的页面，并删除已不存在的表的页面"""
+    os.makedirs(output_dir, exist_ok=True)
+    cache = load_render_cache(cache_file)
+    existing = {name for name in os.listdir(output_dir) if name.endswith('.html')}
+
+    new_cache = {}
+    tasks = []
+    for table in tables:
+        name = table['filename']
+        digest = table_digest(table)
+        new_cache[name] = digest
+        if cache.get(name) != digest or name not in existing:
+            tasks.append((table, os.path.join(output_dir, name)))
+
+    written_bytes = 0
+    if tasks:
+        if len(tasks) == 1 or workers == 1:
+            sizes = [render_to_file(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                sizes = list(executor.map(render_to_file, tasks, chunksize=64))
+        written_bytes = sum(sizes)
+
+    removed = 0
+    for name in existing - set(new_cache):
+        os.remove(os.path.join(output_dir, name))
+        removed += 1
+
+    if cache_file and (tasks or removed or new_cache != cache):
+        save_render_cache(cache_file, new_cache)
+
+    return {
+        'tables': len(tables),
+        'rendered': len(tasks),
+        'written_bytes': written_bytes,
+        'removed': removed,
+        'styles_updated': write_styles(resources_dir, output_dir)
+    }
+
+def dir_size(directory):
+    """目录下 .html 文件的总大小"""
+    return sum(
+        entry.stat().st_size for entry in os.scandir(directory)
+        if entry.is_file() and entry.name.endswith('.html')
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description='由提取的表结构渲染精简页面')
+    parser.add_argument('--resources', default='resources', help='原始页面目录 (默认 resources)')
+    parser.add_argument('--output', default=PAGES_DIR, help=f'输出目录 (默认 {PAGES_DIR})')
+    parser.add_argument('--workers', type=int, default=None, help='并行进程数 (默认CPU核数)')
+    parser.add_argument('--force', action='store_true', help='忽略缓存，重新渲染全部页面')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.resources):
+        print(f"错误: 目录不存在 {args.resources}")
+        sys.exit(1)
+
+    start = time.time()
+    print(f"🔍 解析 {args.resources} 下的表结构...")
+    tables, parsed = load_tables(args.resources, args.workers, SCHEMA_CACHE_FILE)
+    print(f"   - {len(tables)} 张表, 本次解析 {len(parsed)} 个页面")
+
+    print(f"📝 渲染精简页面到 {args.output}...")
+    stats = render_pages(tables, args.output, args.workers, None if args.force else RENDER_CACHE_FILE,
+                         args.resources)
+
+    source_size = dir_size(args.resources)
+    output_size = dir_size(args.output)
+    print(f"✅ 渲染 {stats['rendered']} 个页面 ({stats['written_bytes'] / 1024 / 1024:.1f} MB), "
+          f"删除 {stats['removed']} 个")
+    if output_size:
+        print(f"   - 页面总大小: {source_size / 1024 / 1024:.1f} MB -> {output_size / 1024 / 1024:.1f} MB "
+              f"({source_size / output_size:.1f}x)")
+    print(f"   - 耗时: {time.time() - start:.1f} 秒")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+表结构 SQLite 导出与查询
+
+把全部表和字段导出为带索引的 SQLite 文件（默认 data/schema.db），供离线分析：
+- tables: 表级信息（表名、中文名、所属模块、数据库、微服务、文件ID、描述）
+- columns: 字段明细（table_id 关联 tables.id），字段名、数据类型建有索引
+- tables_fts / columns_fts: FTS5 全文索引，覆盖名称、中文名和描述/说明
+
+FTS5 自带的分词器不切分中文，这里与 build_search_index.py 的规则一致：
+字母数字串整体作为词（查询时按前缀匹配），中文索引单字和相邻二元组；
+表和字段的中文名另外索引拼音串（安装 pypinyin 时），kqxm、kaoqin 按前缀匹配"考勤项目"。
+全文索引只用于快速筛选候选，含中文或分隔符的查询词再按子串校验。
+
+    python3 schema_db.py export                              # 从 resources/ 导出
+    python3 schema_db.py tables 流程                          # 表名/中文名/描述包含"流程"的表
+    python3 schema_db.py columns --name tenant_key --type varchar --database X
+    python3 schema_db.py columns 流程 --field description      # 说明中提到"流程"的字段
+    python3 schema_db.py sql "SELECT database, COUNT(*) FROM tables GROUP BY 1"
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+
+from table_parser import COLUMN_FIELDS, TABLE_FIELDS
+from build_search_index import ASCII_TOKEN_RE, NON_ASCII_RUN_RE, text_pinyin_keys
+from extract_schema import load_tables, CACHE_FILE as SCHEMA_CACHE_FILE
+
+DB_FILE = os.path.join('data', 'schema.db')
+
+# 每个事务写入的表数量
+BATCH_SIZE = 500
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+
+# 全文索引的字段（两个FTS表同名，便于按字段限定查询）
+FTS_FIELDS = ['name', 'chinese_name', 'description']
+
+# 精确筛选条件 -> SQL列
+TABLE_FILTERS = {
+    'database': 't.database',
+    'module': 't.module',
+    'microservice': 't.microservice',
+    'table': 't.table_name'
+}
+COLUMN_FILTERS = dict(TABLE_FILTERS, name='c.name', type='c.data_type')
+
+# 常用的SQL类型名 -> 页面中的数据类型
+TYPE_ALIASES = {
+    'varchar': '字符',
+    'nvarchar': '字符',
+    'char': '固定长度',
+    'bigint': '长整型',
+    'int': '整型',
+    'integer': '整型',
+    'smallint': '小整数',
+    'tinyint': '小整数',
+    'decimal': '小数',
+    'numeric': '小数',
+    'double': '双精度浮点数',
+    'float': '单精度浮点数',
+    'datetime': '日期时间',
+    'timestamp': '日期时间',
+    'date': '日期',
+    'time': '时间'
+}
+
+SCHEMA_SQL = '''
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE tables (
+    id INTEGER PRIMARY KEY,
+    table_name TEXT, chinese_name TEXT, filename TEXT, module TEXT, database TEXT,
+    microservice TEXT, file_id TEXT, description TEXT
+);
+CREATE TABLE columns (
+    id INTEGER PRIMARY KEY,
+    table_id INTEGER NOT NULL REFERENCES tables(id),
+    seq INTEGER, name TEXT, chinese_name TEXT, data_type TEXT, length TEXT,
+    nullable INTEGER, foreign_key INTEGER, auto_increment INTEGER, "default" TEXT,
+    primary_key INTEGER, fk_info TEXT, description TEXT
+);
+CREATE VIRTUAL TABLE tables_fts USING fts5(name, chinese_name, description);
+CREATE VIRTUAL TABLE columns_fts USING fts5(name, chinese_name, description);
+'''
+
+# 数据写入后再建索引，比边写边维护索引快
+INDEX_SQL = '''
+CREATE INDEX idx_tables_name ON tables(table_name);
+CREATE INDEX idx_tables_database ON tables(database);
+CREATE INDEX idx_tables_module ON tables(module);
+CREATE INDEX idx_columns_table ON columns(table_id);
+CREATE INDEX idx_columns_name ON columns(name);
+CREATE INDEX idx_columns_type ON columns(data_type);
+'''
+
+# 查询结果中的表级字段、字段明细字段
+TABLE_COLUMNS = ['t.' + field for field in TABLE_FIELDS]
+COLUMN_COLUMNS = [
+    't.table_name', 't.chinese_name', 't.database', 't.module', 't.filename',
+    'c.seq', 'c.name', 'c.chinese_name', 'c.data_type', 'c.length', 'c.nullable', 'c.foreign_key',
+    'c.auto_increment', 'c."default"', 'c.primary_key', 'c.fk_info', 'c.description'
+]
+COLUMN_RESULT_FIELDS = [
+    'table_name', 'table_chinese_name', 'database', 'module', 'filename',
+    'seq', 'name', 'chinese_name', 'data_type', 'length', 'nullable', 'foreign_key',
+    'auto_increment', 'default', 'primary_key', 'fk_info', 'description'
+]
+
+def fts_text(text, pinyin=False):
+    """全文索引文本：字母数字串 + 中文单字和二元组（pinyin 为真时再加拼音串），空格分隔"""
+    text = (text or '').lower()
+    tokens = ASCII_TOKEN_RE.findall(text)
+    for run in NON_ASCII_RUN_RE.findall(text):
+        tokens.extend(run)
+        tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    if pinyin:
+        tokens.extend(sorted(text_pinyin_keys(text)))
+    return ' '.join(tokens)
+
+def fts_query(terms, field=None):
+    """查询词转为 FTS5 查询：字母数字串按前缀，中文按二元组（单字时按单字），全部 AND
+
+    没有可索引字符时返回 None（只按子串筛选）。
+    """
+    parts = []
+    for term in terms:
+        parts.extend(f'"{token}"*' for token in ASCII_TOKEN_RE.findall(term))
+        for run in NON_ASCII_RUN_RE.findall(term):
+            if len(run) == 1:
+                parts.append(f'"{run}"')
+            parts.extend(f'"{run[i:i + 2]}"' for i in range(len(run) - 1))
+    if not parts:
+        return None
+    query = ' AND '.join(parts)
+    return f'{field} : ({query})' if field else query
+
+def export_database(tables, db_file=DB_FILE, batch_size=BATCH_SIZE, source=''):
+    """把表结构写入新的 SQLite 文件（先写临时文件再替换），返回 (表数, 字段数)"""
+    os.makedirs(os.path.dirname(db_file) or '.', exist_ok=True)
+    tmp_file = db_file + '.tmp'
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+
+    conn = sqlite3.connect(tmp_file)
+    try:
+        # 临时文件出错时直接丢弃，不需要日志和同步刷盘
+        conn.execute('PRAGMA journal_mode = OFF')
+        conn.execute('PRAGMA synchronous = OFF')
+        conn.executescript(SCHEMA_SQL)
+
+        table_sql = f"INSERT INTO tables (id, {', '.join(TABLE_FIELDS)}) VALUES (?{', ?' * len(TABLE_FIELDS)})"
+        column_names = ', '.join(f'"{field}"' for field in COLUMN_FIELDS)
+        column_sql = f"INSERT INTO columns (id, table_id, {column_names}) VALUES (?, ?{', ?' * len(COLUMN_FIELDS)})"
+        fts_sql = 'INSERT INTO {}_fts (rowid, name, chinese_name, description) VALUES (?, ?, ?, ?)'
+
+        column_id = 0
+        column_total = 0
+        for start in range(0, len(tables), batch_size):
+            table_rows = []
+            table_fts = []
+            column_rows = []
+            column_fts = []
+            for table_id, table in enumerate(tables[start:start + batch_size], start + 1):
+                table_rows.append([table_id] + [table.get(field, '') for field in TABLE_FIELDS])
+                table_fts.append((table_id, fts_text(table.get('table_name')),
+                                  fts_text(table.get('chinese_name'), pinyin=True),
+                                  fts_text(table.get('description'))))
+                for column in table['columns']:
+                    column_id += 1
+                    column_rows.append([column_id, table_id] + [column.get(field, '') for field in COLUMN_FIELDS])
+                    column_fts.append((column_id, fts_text(column.get('name')),
+                                       fts_text(column.get('chinese_name'), pinyin=True),
+                                       fts_text(column.get('description'))))
+            with conn:
+                conn.executemany(table_sql, table_rows)
+                conn.executemany(column_sql, column_rows)
+                conn.executemany(fts_sql.format('tables'), table_fts)
+                conn.executemany(fts_sql.format('columns'), column_fts)
+            column_total += len(column_rows)
+
+        with conn:
+            conn.executescript(INDEX_SQL)
+            conn.executemany('INSERT INTO meta (key, value) VALUES (?, ?)', [
+                ('source', source),
+                ('created', time.strftime('%Y-%m-%d %H:%M:%S')),
+                ('tables', str(len(tables))),
+                ('columns', str(column_total))
+            ])
+        conn.execute("INSERT INTO tables_fts(tables_fts) VALUES ('optimize')")
+        conn.execute("INSERT INTO columns_fts(columns_fts) VALUES ('optimize')")
+        conn.commit()
+        conn.execute('VACUUM')
+    finally:
+        conn.close()
+
+    os.replace(tmp_file, db_file)
+    return len(tables), column_total
+
+def connect(db_file=DB_FILE):
+    """只读打开数据库"""
+    if not os.path.exists(db_file):
+        raise FileNotFoundError(f'数据库不存在: {db_file}（先运行 python3 schema_db.py export）')
+    uri = 'file:' + os.path.abspath(db_file).replace('?', '%3f').replace('#', '%23') + '?mode=ro'
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+def search(conn, scope='tables', query='', filters=None, field=None, offset=0, limit=DEFAULT_LIMIT):
+    """搜索表（scope='tables'）或字段（scope='columns'）
+
+    query: 空格分隔的关键词，每个词都要出现在名称、中文名或描述中（field 指定时只查该字段）；
+    filters: 精确筛选 {database, module, microservice, table, [name, type]}，type 可用SQL类型名。
+    返回 {"total", "offset", "limit", "items": [...]}。
+    """
+    if scope not in ('tables', 'columns'):
+        raise ValueError(f'不支持的搜索范围: {scope}')
+    if field is not None and field not in FTS_FIELDS:
+        raise ValueError(f'不支持的搜索字段: {field}')
+    allowed = TABLE_FILTERS if scope == 'tables' else COLUMN_FILTERS
+    filters = {key: value for key, value in (filters or {}).items() if value}
+    for key in filters:
+        if key not in allowed:
+            raise ValueError(f'不支持的筛选条件: {key}')
+    if 'type' in filters:
+        filters['type'] = TYPE_ALIASES.get(filters['type'].lower(), filters['type'])
+    offset = max(0, offset)
+    limit = max(0, min(limit, MAX_LIMIT))
+
+    if scope == 'tables':
+        alias, fts_table, select = 't', 'tables_fts', TABLE_COLUMNS
+        from_sql = 'tables t'
+        text_columns = {'name': 't.table_name', 'chinese_name': 't.chinese_name', 'description': 't.description'}
+        order_sql = 't.table_name, t.id'
+    else:
+        alias, fts_table, select = 'c', 'columns_fts', COLUMN_COLUMNS
+        from_sql = 'columns c JOIN tables t ON t.id = c.table_id'
+        text_columns = {'name': 'c.name', 'chinese_name': 'c.chinese_name', 'description': 'c.description'}
+        order_sql = 't.table_name, t.id, c.seq'
+
+    where = []
+    params = []
+    terms = query.lower().split()
+    match = fts_query(terms, field)
+    if match:
+        where.append(f'{alias}.id IN (SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH ?)')
+        params.append(match)
+    # 全文索引按词匹配，再按子串校验（与页面搜索的结果一致）；
+    # 单个字母数字串的查询词已由全文索引精确匹配（词的前缀或中文名的拼音前缀），不再校验
+    searched = [text_columns[field]] if field else list(text_columns.values())
+    for term in terms:
+        if match and ASCII_TOKEN_RE.fullmatch(term):
+            continue
+        where.append('(' + ' OR '.join(f'instr(lower({column}), ?) > 0' for column in searched) + ')')
+        params.extend([term] * len(searched))
+    for key, value in filters.items():
+        where.append(f'{allowed[key]} = ?')
+        params.append(value)
+    where_sql = f" WHERE {' AND '.join(where)}" if where else ''
+
+    total = conn.execute(f'SELECT COUNT(*) FROM {from_sql}{where_sql}', params).fetchone()[0]
+    rows = conn.execute(
+        f"SELECT {', '.join(select)} FROM {from_sql}{where_sql} ORDER BY {order_sql} LIMIT ? OFFSET ?",
+        params + [limit, offset]
+    ).fetchall()
+    names = TABLE_FIELDS if scope == 'tables' else COLUMN_RESULT_FIELDS
+    return {
+        'total': total,
+        'offset': offset,
+        'limit': limit,
+        'items': [dict(zip(names, row)) for row in rows]
+    }
+
+class SchemaDatabase:
+    """多线程共享的只读数据库（server.py 使用），每个线程一个连接"""
+
+    def __init__(self, db_file=DB_FILE):
+        self.db_file = db_file
+        self.local = threading.local()
+        conn = connect(db_file)
+        try:
+            self.meta = dict(conn.execute('SELECT key, value FROM meta').fetchall())
+        finally:
+            conn.close()
+
+    def search(self, *args, **kwargs):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.local.conn = connect(self.db_file)
+        return search(conn, *args, **kwargs)
+
+def print_rows(items, fields):
+    """按列对齐打印查询结果"""
+    if not items:
+        return
+    widths = {field: max(len(field), *(len(str(item[field])) for item in items)) for field in fields}
+    print('  '.join(field.ljust(widths[field]) for field in fields))
+    for item in items:
+        print('  '.join(str(item[field]).ljust(widths[field]) for field in fields))
+
+def main():
+    parser = argparse.ArgumentParser(description='表结构 SQLite 导出与查询')
+    parser.add_argument('--db', default=DB_FILE, help=f'数据库文件 (默认 {DB_FILE})')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help='解析页面并导出数据库')
+    export_parser.add_argument('--resources', default='resources', help='表结构页面目录 (默认 resources)')
+    export_parser.add_argument('--workers', type=int, default=None, help='并行进程数 (默认CPU核数)')
+    export_parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                               help=f'每个事务写入的表数量 (默认 {BATCH_SIZE})')
+
+    for scope, help_text in (('tables', '搜索表'), ('columns', '搜索字段')):
+        search_parser = subparsers.add_parser(scope, help=help_text)
+        search_parser.add_argument('query', nargs='*', help='关键词（空格分隔，全部匹配）')
+        search_parser.add_argument('--field', choices=FTS_FIELDS, help='只在该字段中搜索关键词')
+        search_parser.add_argument('--database', help='所属数据库')
+        search_parser.add_argument('--module', help='所属模块')
+        search_parser.add_argument('--microservice', help='微服务')
+        search_parser.add_argument('--table', help='表名')
+        if scope == 'columns':
+            search_parser.add_argument('--name', help='字段名')
+            search_parser.add_argument('--type', help='数据类型，如 字符、长整型，或 varchar、bigint')
+        search_parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT, help=f'返回条数 (默认 {DEFAULT_LIMIT})')
+        search_parser.add_argument('--offset', type=int, default=0, help='跳过条数')
+        search_parser.add_argument('--json', action='store_true', help='以JSON输出')
+
+    sql_parser = subparsers.add_parser('sql', help='执行只读SQL')
+    sql_parser.add_argument('statement', help='SQL语句')
+    args = parser.parse_args()
+
+    if args.command == 'export':
+        if not os.path.isdir(args.resources):
+            print(f"错误: 目录不存在 {args.resources}")
+            sys.exit(1)
+        start = time.time()
+        print(f"🔍 解析 {args.resources} 下的表结构...")
+        tables, parsed = load_tables(args.resources, args.workers, SCHEMA_CACHE_FILE)
+        print(f"   - {len(tables)} 张表, 本次解析 {len(parsed)} 个页面 ({time.time() - start:.1f} 秒)")
+        load_start = time.time()
+        table_count, column_count = export_database(tables, args.db, args.batch_size, args.resources)
+        print(f"✅ 已导出 {table_count} 张表, {column_count} 个字段 -> {args.db} "
+              f"({os.path.getsize(args.db) / 1024 / 1024:.1f} MB)")
+        print(f"   - 写入耗时: {time.time() - load_start:.1f} 秒, 总耗时: {time.time() - start:.1f} 秒")
+        return
+
+    try:
+        conn = connect(args.db)
+    except FileNotFoundError as e:
+        print(f"错误: {e}")
+        sys.exit(1)
+
+    if args.command == 'sql':
+        try:
+            rows = conn.execute(args.statement).fetchall()
+        except sqlite3.Error as e:
+            print(f"错误: {e}")
+            sys.exit(1)
+        if rows:
+            print_rows([dict(row) for row in rows], rows[0].keys())
+        print(f"({len(rows)} 行)")
+        return
+
+    filters = {key: getattr(args, key, None) for key in COLUMN_FILTERS}
+    start = time.time()
+    result = search(conn, args.command, ' '.join(args.query), filters, args.field, args.offset, args.limit)
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+        return
+    if args.command == 'tables':
+        print_rows(result['items'], ['table_name', 'chinese_name', 'database', 'module'])
+    else:
+        print_rows(result['items'], ['table_name', 'database', 'name', 'chinese_name', 'data_type', 'length',
+                                     'primary_key', 'description'])
+    shown = len(result['items'])
+    print(f"共 {result['total']} 条" + (f"，显示 {result['offset'] + 1}-{result['offset'] + shown}" if shown else '')
+          + f" ({(time.time() - start) * 1000:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
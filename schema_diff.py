@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+表结构快照对比
+
+比较两次导出的数据字典，列出新增、删除、变化的表和字段（类型、长度、是否允许空值、
+主键/外键、默认值等），输出机器可读的变更日志，以及需要重新生成、重建索引、重新部署的页面。
+
+快照中每张表、每个字段都带内容签名：表签名相同直接跳过，
+表签名不同时只逐项比较签名不同的字段。快照来源可以是：
+- 页面目录（如 resources/，按 table_parser 解析，使用解析缓存）
+- extract_schema.py 的输出目录或其中的 columns.json
+- 本脚本保存的快照文件（--save-new）
+
+    python3 schema_diff.py data/schema/snapshot.json resources -o changelog.json --save-new data/schema/snapshot.json
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+
+from table_parser import COLUMN_FIELDS, TABLE_FIELDS, CACHE_DIR
+from extract_schema import (
+    load_tables, iter_column_store, COLUMN_STORE_FILE, CACHE_FILE as SCHEMA_CACHE_FILE, write_json
+)
+
+SNAPSHOT_FORMAT = 'schema-snapshot'
+SNAPSHOT_VERSION = 1
+CHANGELOG_VERSION = 1
+
+# 签名长度（十六进制字符数）
+SIGNATURE_LENGTH = 16
+
+# table_list.json / 搜索索引使用的表级字段，这些字段变化时需要重建索引
+INDEX_FIELDS = ['table_name', 'chinese_name', 'filename', 'module', 'database', 'microservice', 'file_id']
+
+# 参与比较的表级字段（filename 含文件ID，单独按页面变化处理）
+COMPARE_TABLE_FIELDS = [field for field in TABLE_FIELDS if field not in ('filename', 'file_id')]
+
+# 参与比较的字段属性（序号变化体现为字段顺序变化）
+COMPARE_COLUMN_FIELDS = [field for field in COLUMN_FIELDS if field not in ('seq', 'name')]
+
+def signature(value):
+    """JSON值的内容签名"""
+    data = json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()[:SIGNATURE_LENGTH]
+
+def column_keys(columns):
+    """字段的标识：字段名；同一张表中重名的字段依次加 #2、#3 区分"""
+    keys = []
+    seen = {}
+    for column in columns:
+        name = column['name']
+        seen[name] = seen.get(name, 0) + 1
+        keys.append(name if seen[name] == 1 else f'{name}#{seen[name]}')
+    return keys
+
+def snapshot_table(table):
+    """单表快照：表级字段、字段行（按 COLUMN_FIELDS 顺序）、字段签名和表签名"""
+    rows = [[column.get(field, '') for field in COLUMN_FIELDS] for column in table['columns']]
+    column_sigs = [signature(row[2:]) for row in rows]
+    fields = {field: table.get(field, '') for field in TABLE_FIELDS}
+    return {
+        'sig': signature([[fields[field] for field in TABLE_FIELDS], [row[1] for row in rows], column_sigs]),
+        'fields': fields,
+        'keys': column_keys(table['columns']),
+        'column_sigs': column_sigs,
+        'columns': rows
+    }
+
+def build_snapshot(tables, source=''):
+    """由表结构列表构建快照"""
+    return {
+        'format': SNAPSHOT_FORMAT,
+        'version': SNAPSHOT_VERSION,
+        'source': source,
+        'column_fields': COLUMN_FIELDS,
+        'tables': [snapshot_table(table) for table in tables]
+    }
+
+def snapshot_cache_file(source):
+    """页面目录的解析缓存文件：resources/ 与 extract_schema.py、fk_graph.py 共用缓存，其他目录按绝对路径各用一个
+
+    parse_pages_cached 只保留本次解析的页面，两个页面目录共用一个缓存文件会互相清空对方的缓存。
+    """
+    source_dir = os.path.abspath(source)
+    if source_dir == os.path.abspath('resources'):
+        return SCHEMA_CACHE_FILE
+    digest = hashlib.sha1(source_dir.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(CACHE_DIR, f'schema_cache_{digest}.json')
+
+def load_snapshot(source, workers=None):
+    """从页面目录、extract_schema 输出（目录或 columns.json）或快照文件加载快照"""
+    if os.path.isdir(source):
+        store_file = os.path.join(source, COLUMN_STORE_FILE)
+        if not os.path.exists(store_file):
+            tables, _ = load_tables(source, workers, snapshot_cache_file(source))
+            return build_snapshot(tables, source)
+        source_file = store_file
+    elif os.path.isfile(source):
+        source_file = source
+    else:
+        raise FileNotFoundError(f'快照来源不存在: {source}')
+
+    with open(source_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('format') == SNAPSHOT_FORMAT:
+        if data.get('version') != SNAPSHOT_VERSION or data.get('column_fields') != COLUMN_FIELDS:
+            raise ValueError(f'快照格式版本不兼容: {source_file}')
+        return data
+    if 'dictionaries' in data:
+        return build_snapshot(list(iter_column_store(data)), source)
+    raise ValueError(f'无法识别的快照文件: {source_file}')
+
+def table_label(table):
+    """变更日志中的表标识：数据库.表名（页面中没有表名时用文件名）"""
+    fields = table['fields']
+    name = fields['table_name'] or fields['filename']
+    return f"{fields['database']}.{name}" if fields['database'] else name
+
+def unique_index(tables, key_func):
+    """按 key_func 建立索引，只保留取值唯一的表"""
+    index = {}
+    duplicated = set()
+    for i, table in enumerate(tables):
+        key = key_func(table)
+        if key in index:
+            duplicated.add(key)
+        index[key] = i
+    return {key: i for key, i in index.items() if key not in duplicated}
+
+def match_tables(old_tables, new_tables):
+    """匹配两个快照中的同一张表：先按文件ID，剩余的按 (数据库, 表名) 唯一匹配
+
+    返回 (匹配对列表 [(旧序号, 新序号)], 未匹配的旧表序号, 未匹配的新表序号)。
+    """
+    pairs = []
+    old_index = unique_index(old_tables, lambda t: t['fields']['file_id'] or None)
+    new_index = unique_index(new_tables, lambda t: t['fields']['file_id'] or None)
+    old_index.pop(None, None)
+    for file_id, j in new_index.items():
+        if file_id in old_index:
+            pairs.append((old_index[file_id], j))
+
+    matched_old = {i for i, _ in pairs}
+    matched_new = {j for _, j in pairs}
+    old_rest = [i for i in range(len(old_tables)) if i not in matched_old]
+    new_rest = [j for j in range(len(new_tables)) if j not in matched_new]
+
+    def name_key(table):
+        return (table['fields']['database'], table['fields']['table_name'])
+
+    old_names = unique_index([old_tables[i] for i in old_rest], name_key)
+    new_names = unique_index([new_tables[j] for j in new_rest], name_key)
+    for key, k in new_names.items():
+        if key in old_names:
+            pairs.append((old_rest[old_names[key]], new_rest[k]))
+
+    matched_old = {i for i, _ in pairs}
+    matched_new = {j for _, j in pairs}
+    return (
+        pairs,
+        [i for i in old_rest if i not in matched_old],
+        [j for j in new_rest if j not in matched_new]
+    )
+
+def diff_fields(old, new, fields):
+    """比较两条记录的指定字段，返回 {字段: [旧值, 新值]}"""
+    return {field: [old[field], new[field]] for field in fields if old[field] != new[field]}
+
+def diff_table(old, new):
+    """比较同一张表的两个版本（表签名不同时调用），返回变更记录"""
+    change = {}
+    fields = diff_fields(old['fields'], new['fields'], COMPARE_TABLE_FIELDS)
+    if fields:
+        change['fields'] = fields
+    if old['fields']['filename'] != new['fields']['filename']:
+        change['old_filename'] = old['fields']['filename']
+
+    old_columns = dict(zip(old['keys'], zip(old['column_sigs'], old['columns'])))
+    new_columns = dict(zip(new['keys'], zip(new['column_sigs'], new['columns'])))
+    added = [key for key in new['keys'] if key not in old_columns]
+    dropped = [key for key in old['keys'] if key not in new_columns]
+    changed = []
+    for key in new['keys']:
+        if key not in old_columns:
+            continue
+        (old_sig, old_row), (new_sig, new_row) = old_columns[key], new_columns[key]
+        if old_sig == new_sig:
+            continue
+        column_diff = diff_fields(dict(zip(COLUMN_FIELDS, old_row)), dict(zip(COLUMN_FIELDS, new_row)),
+                                  COMPARE_COLUMN_FIELDS)
+        changed.append({'name': key, 'fields': column_diff})
+    if added:
+        change['columns_added'] = added
+    if dropped:
+        change['columns_dropped'] = dropped
+    if changed:
+        change['columns_changed'] = changed
+    common = [key for key in old['keys'] if key in new_columns]
+    if common != [key for key in new['keys'] if key in old_columns]:
+        change['columns_reordered'] = True
+    return change
+
+def diff_snapshots(old_snapshot, new_snapshot):
+    """比较两个快照，返回变更日志"""
+    old_tables = old_snapshot['tables']
+    new_tables = new_snapshot['tables']
+    pairs, dropped, added = match_tables(old_tables, new_tables)
+
+    entries = []
+    summary = {
+        'tables_old': len(old_tables), 'tables_new': len(new_tables),
+        'tables_added': len(added), 'tables_dropped': len(dropped),
+        'tables_changed': 0, 'tables_unchanged': 0,
+        'columns_added': 0, 'columns_dropped': 0, 'columns_changed': 0
+    }
+    regenerate = set()
+    reindex = False
+    remove = set()
+
+    for j in added:
+        table = new_tables[j]
+        entries.append({'table': table_label(table), 'change': 'added', 'filename': table['fields']['filename'],
+                        'columns': len(table['columns'])})
+        summary['columns_added'] += len(table['columns'])
+        regenerate.add(table['fields']['filename'])
+        reindex = True
+    for i in dropped:
+        table = old_tables[i]
+        entries.append({'table': table_label(table), 'change': 'dropped', 'filename': table['fields']['filename'],
+                        'columns': len(table['columns'])})
+        summary['columns_dropped'] += len(table['columns'])
+        remove.add(table['fields']['filename'])
+        reindex = True
+
+    for i, j in pairs:
+        old, new = old_tables[i], new_tables[j]
+        if old['sig'] == new['sig']:
+            summary['tables_unchanged'] += 1
+            continue
+        change = diff_table(old, new)
+        if not change:
+            summary['tables_unchanged'] += 1
+            continue
+        summary['tables_changed'] += 1
+        summary['columns_added'] += len(change.get('columns_added', []))
+        summary['columns_dropped'] += len(change.get('columns_dropped', []))
+        summary['columns_changed'] += len(change.get('columns_changed', []))
+        entry = {'table': table_label(new), 'change': 'changed', 'filename': new['fields']['filename']}
+        entry.update(change)
+        entries.append(entry)
+        regenerate.add(new['fields']['filename'])
+        if 'old_filename' in change:
+            remove.add(change['old_filename'])
+        if any(old['fields'][field] != new['fields'][field] for field in INDEX_FIELDS):
+            reindex = True
+
+    entries.sort(key=lambda entry: (entry['table'], entry['filename']))
+    remove -= regenerate
+    redeploy = sorted('resources/' + name for name in regenerate)
+    if reindex:
+        redeploy.append('table_list.json')
+        redeploy.append('data/search/')
+        redeploy.append('data/catalog/')
+    return {
+        'version': CHANGELOG_VERSION,
+        'old': old_snapshot.get('source', ''),
+        'new': new_snapshot.get('source', ''),
+        'summary': summary,
+        'tables': entries,
+        'pages': {
+            # render_pages.py 需要重新渲染的页面
+            'regenerate': sorted(regenerate),
+            # 是否需要重新生成 table_list.json 和搜索索引
+            'reindex': reindex,
+            # 需要上传的OSS key（目录以 / 结尾）和需要删除的页面
+            'redeploy': redeploy,
+            'remove': sorted('resources/' + name for name in remove)
+        }
+    }
+
+def print_changelog(changelog, limit=20):
+    """打印变更摘要和前 limit 张变化的表"""
+    summary = changelog['summary']
+    print(f"📊 表: {summary['tables_old']} -> {summary['tables_new']}, "
+          f"新增 {summary['tables_added']}, 删除 {summary['tables_dropped']}, "
+          f"变化 {summary['tables_changed']}, 未变化 {summary['tables_unchanged']}")
+    print(f"   字段: 新增 {summary['columns_added']}, 删除 {summary['columns_dropped']}, "
+          f"变化 {summary['columns_changed']}")
+    symbols = {'added': '➕', 'dropped': '➖', 'changed': '✏️ '}
+    for entry in changelog['tables'][:limit]:
+        details = []
+        for key, label in (('columns_added', '新增'), ('columns_dropped', '删除')):
+            if key in entry:
+                details.append(f"{label}字段 {', '.join(entry[key])}")
+        for column in entry.get('columns_changed', []):
+            fields = ', '.join(f'{field}: {old!r} -> {new!r}' for field, (old, new) in column['fields'].items())
+            details.append(f"{column['name']} ({fields})")
+        for field, (old, new) in entry.get('fields', {}).items():
+            details.append(f'{field}: {old!r} -> {new!r}')
+        print(f"   {symbols[entry['change']]} {entry['table']}" + (f": {'; '.join(details)}" if details else ''))
+    if len(changelog['tables']) > limit:
+        print(f"   ... 共 {len(changelog['tables'])} 张表有变化")
+    pages = changelog['pages']
+    print(f"📄 需重新渲染 {len(pages['regenerate'])} 个页面, 删除 {len(pages['remove'])} 个页面, "
+          f"{'需要' if pages['reindex'] else '不需要'}重建索引")
+
+def main():
+    parser = argparse.ArgumentParser(description='比较两次导出的表结构快照')
+    parser.add_argument('old', help='旧快照：页面目录、extract_schema 输出目录/columns.json 或快照文件')
+    parser.add_argument('new', help='新快照：同上')
+    parser.add_argument('--output', '-o', metavar='FILE', help='将变更日志写入JSON文件')
+    parser.add_argument('--save-new', metavar='FILE', help='将新快照保存为快照文件，供下次对比')
+    parser.add_argument('--workers', type=int, default=None, help='解析页面的并行进程数 (默认CPU核数)')
+    parser.add_argument('--limit', type=int, default=20, help='打印的变化表数量 (默认 20)')
+    args = parser.parse_args()
+
+    start = time.time()
+    try:
+        old_snapshot = load_snapshot(args.old, args.workers)
+        new_snapshot = load_snapshot(args.new, args.workers)
+    except (OSError, ValueError) as e:
+        print(f"错误: {e}")
+        sys.exit(1)
+    print(f"🔍 对比 {args.old} ({len(old_snapshot['tables'])} 张表) 与 {args.new} ({len(new_snapshot['tables'])} 张表)")
+
+    changelog = diff_snapshots(old_snapshot, new_snapshot)
+    print_changelog(changelog, args.limit)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(changelog, f, ensure_ascii=False, indent=2)
+        print(f"💾 变更日志已保存: {args.output}")
+    if args.save_new:
+        os.makedirs(os.path.dirname(args.save_new) or '.', exist_ok=True)
+        write_json(args.save_new, new_snapshot)
+        print(f"💾 新快照已保存: {args.save_new}")
+    print(f"   - 耗时: {time.time() - start:.1f} 秒")
+
+if __name__ == "__main__":
+    main()
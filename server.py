@@ -2,11 +2,566 @@
 # -*- coding: utf-8 -*-
 
 import http.server
-import socketserver
+import io
 import os
+import sys
+import gzip
+import time
+import json
+import errno
+import signal
+import socket
+import sqlite3
+import argparse
+import datetime
+import threading
 import mimetypes
+import email.utils
+import urllib.parse
+from http import HTTPStatus
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from precompress import (
+    COMPRESS_EXTENSIONS, MIN_COMPRESS_SIZE, ENCODING_SUFFIXES, available_encodings, compress_bytes
+)
+from catalog import TableCatalog, FILTER_FIELDS, DEFAULT_LIMIT
+from schema_db import SchemaDatabase, COLUMN_FILTERS
+from fk_graph import ForeignKeyGraph, GRAPH_FILE, TARGET_COLUMN, DEFAULT_MAX_DEPTH
+from page_pack import PagePack, PACK_DIR
+from page_watch import PageWatcher, HAS_INOTIFY, DEFAULT_INTERVAL as WATCH_INTERVAL
+from build_table_list import write_table_list, CACHE_FILE as TABLE_LIST_CACHE
+
+DEFAULT_PORT = 8080
+
+# 默认工作线程数（每个保持中的连接占用一个线程）
+DEFAULT_WORKERS = 32
+
+# 空闲的持久连接超过该秒数自动关闭，释放工作线程
+KEEP_ALIVE_TIMEOUT = 15
+
+# 关闭服务器时等待进行中请求完成的最长秒数
+SHUTDOWN_TIMEOUT = 10
+
+# 压缩响应缓存的总大小上限（MB）和单个响应的大小上限（MB）
+DEFAULT_CACHE_SIZE = 64
+DEFAULT_CACHE_ENTRY_SIZE = 8
+
+# 超过该大小的文件不做即时压缩
+MAX_COMPRESS_SIZE = 32 * 1024 * 1024
+
+# 即时压缩的优先顺序和压缩级别（比预压缩的最高级别快得多，压缩率相差不大）
+ONLINE_ENCODINGS = ('br', 'gzip')
+ONLINE_LEVELS = {
+    'br': 5,
+    'gzip': 6
+}
+
+# 预压缩旁路文件（x.html.br / x.html.gz）的优先顺序，直接发送无需brotli模块
+SIDECAR_ENCODINGS = ('br', 'gzip')
+
+# 服务器运行统计接口
+STATS_PATH = '/api/stats'
+
+# 默认加载的表目录
+CATALOG_FILE = 'table_list.json'
+
+# 接口路径 -> 处理方法
+API_ROUTES = {
+    STATS_PATH: 'api_stats',
+    '/api/tables': 'api_tables',
+    '/api/search': 'api_search',
+    '/api/fk/refs': 'api_fk_refs',
+    '/api/fk/table': 'api_fk_table',
+    '/api/fk/path': 'api_fk_path'
+}
+
+class ResponseCache:
+    """线程安全的LRU缓存，按内容总字节数限制容量"""
+
+    def __init__(self, max_bytes, max_entry_bytes):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if len(value) > self.max_entry_bytes or len(value) > self.max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old)
+            self.entries[key] = value
+            self.bytes += len(value)
+            while self.bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.bytes -= len(evicted)
+                self.evictions += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'max_entry_bytes': self.max_entry_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+class MemoryBody:
+    """归档（mmap）中的一段内容，发送时直接写出，不复制到新的缓冲区"""
+
+    def __init__(self, view):
+        self.view = view
+
+    def close(self):
+        self.view.release()
+
+def parse_accept_encoding(header):
+    """解析 Accept-Encoding，返回 {编码: q值}"""
+    accepted = {}
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name] = q
+    return accepted
+
+def accepted_encodings(header, encodings):
+    """客户端接受的编码，按服务器优先顺序排列"""
+    accepted = parse_accept_encoding(header)
+    return [encoding for encoding in encodings if accepted.get(encoding, accepted.get('*', 0)) > 0]
+
+def choose_encoding(header, encodings):
+    """按服务器优先顺序选出客户端接受的编码，都不接受时返回 None"""
+    encodings = accepted_encodings(header, encodings)
+    return encodings[0] if encodings else None
+
+def find_sidecar(path, st, header):
+    """查找客户端接受的预压缩旁路文件，返回 (编码, 路径)，没有时返回 None
+
+    比源文件旧的旁路文件视为过期，不使用。
+    """
+    for encoding in accepted_encodings(header, SIDECAR_ENCODINGS):
+        sidecar_path = path + ENCODING_SUFFIXES[encoding]
+        try:
+            sidecar_st = os.stat(sidecar_path)
+        except OSError:
+            continue
+        if sidecar_st.st_mtime_ns >= st.st_mtime_ns:
+            return encoding, sidecar_path
+    return None
+
+def make_etag(st, encoding=None):
+    """强ETag：修改时间+大小，压缩版本附加编码名"""
+    tag = f'{st.st_mtime_ns:x}-{st.st_size:x}'
+    if encoding:
+        tag += f'-{encoding}'
+    return f'"{tag}"'
+
+def etag_matches(header, etag):
+    """If-None-Match 是否命中（弱比较）"""
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
 
 class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    # HTTP/1.1 持久连接：响应都带 Content-Length，同一连接可连续请求
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEP_ALIVE_TIMEOUT
+    # 响应头和正文分两次写出，持久连接上需关闭Nagle算法，否则遇到延迟ACK每个请求多等约40ms
+    disable_nagle_algorithm = True
+
+    def handle(self):
+        """处理一个连接上的全部请求，期间在服务器登记该连接"""
+        track = getattr(self.server, 'track_connection', None)
+        if track:
+            track(self.connection, True)
+        try:
+            super().handle()
+        except (ConnectionResetError, BrokenPipeError):
+            # 客户端提前断开，无需记录
+            pass
+        finally:
+            if track:
+                track(self.connection, False)
+
+    def parse_request(self):
+        if not super().parse_request():
+            return False
+        # 服务器正在关闭：处理完本次请求后断开连接
+        if getattr(self.server, 'draining', False):
+            self.close_connection = True
+        return True
+
+    def do_GET(self):
+        if not self.handle_api():
+            super().do_GET()
+
+    def do_HEAD(self):
+        if not self.handle_api():
+            super().do_HEAD()
+
+    def handle_api(self):
+        """处理 /api/ 接口请求，不是接口路径时返回 False"""
+        parts = urllib.parse.urlsplit(self.path)
+        route = API_ROUTES.get(parts.path)
+        if route is None:
+            return False
+        params = urllib.parse.parse_qs(parts.query)
+        try:
+            getattr(self, route)(params)
+        except ValueError as e:
+            self.send_json({'error': str(e)}, HTTPStatus.BAD_REQUEST)
+        return True
+
+    def api_stats(self, params):
+        """运行统计"""
+        self.send_json(self.server.stats())
+
+    def api_tables(self, params):
+        """表目录搜索：q、各筛选字段、sort、offset/limit 分页、facets 分面统计"""
+        catalog = self.server.catalog
+        if catalog is None:
+            self.send_json({'error': '表目录未加载'}, HTTPStatus.SERVICE_UNAVAILABLE)
+            return
+
+        def param(name, default=''):
+            values = params.get(name)
+            return values[-1] if values else default
+
+        facets = param('facets', None)
+        if facets is not None:
+            facets = [field for field in facets.split(',') if field]
+        facet_max = param('facet_max')
+        result = catalog.search(
+            query=param('q'),
+            filters={field: param(field) for field in FILTER_FIELDS},
+            sort=param('sort', 'name'),
+            offset=int(param('offset', 0)),
+            limit=int(param('limit', DEFAULT_LIMIT)),
+            facets=facets,
+            facet_max=int(facet_max) if facet_max else None
+        )
+        self.server.count('api_search')
+        self.send_json(result)
+
+    def api_search(self, params):
+        """指定 --db 时从 SQLite 搜索表或字段（scope=tables|columns），否则同 /api/tables"""
+        schema_db = self.server.schema_db
+        if schema_db is None:
+            self.api_tables(params)
+            return
+
+        def param(name, default=''):
+            values = params.get(name)
+            return values[-1] if values else default
+
+        result = schema_db.search(
+            scope=param('scope', 'tables'),
+            query=param('q'),
+            filters={field: param(field) for field in COLUMN_FILTERS if param(field)},
+            field=param('field', None),
+            offset=int(param('offset', 0)),
+            limit=int(param('limit', DEFAULT_LIMIT))
+        )
+        self.server.count('api_db_search')
+        self.send_json(result)
+
+    def fk_graph(self):
+        """外键关系图，未加载时返回503并返回 None"""
+        graph = self.server.fk_graph
+        if graph is None:
+            self.send_json({'error': '外键关系图未加载'}, HTTPStatus.SERVICE_UNAVAILABLE)
+        return graph
+
+    def api_fk_refs(self, params):
+        """引用了指定表（table 支持通配符，如 hrm_*）的字段"""
+        graph = self.fk_graph()
+        if graph is None:
+            return
+        table = params.get('table', [''])[-1]
+        if not table:
+            raise ValueError('缺少参数 table')
+        column = params.get('column', [TARGET_COLUMN])[-1] or None
+        limit = int(params.get('limit', [DEFAULT_LIMIT])[-1])
+        self.send_json(graph.references(table, column, max(0, limit)))
+
+    def api_fk_table(self, params):
+        """表的引用和被引用关系"""
+        graph = self.fk_graph()
+        if graph is None:
+            return
+        table = params.get('table', [''])[-1]
+        if not table:
+            raise ValueError('缺少参数 table')
+        self.send_json(graph.neighbors(table))
+
+    def api_fk_path(self, params):
+        """两张表之间的最短关联路径，没有路径时返回404"""
+        graph = self.fk_graph()
+        if graph is None:
+            return
+        start = params.get('from', [''])[-1]
+        end = params.get('to', [''])[-1]
+        if not start or not end:
+            raise ValueError('缺少参数 from 或 to')
+        max_depth = int(params.get('max_depth', [DEFAULT_MAX_DEPTH])[-1])
+        result = graph.join_path(start, end, min(max(max_depth, 1), DEFAULT_MAX_DEPTH * 2))
+        if result is None:
+            self.send_json({'error': f'未找到 {start} 与 {end} 之间的关联路径'}, HTTPStatus.NOT_FOUND)
+            return
+        self.send_json(result)
+
+    def send_json(self, data, status=HTTPStatus.OK):
+        """发送JSON响应，较大的响应按 Accept-Encoding 压缩"""
+        body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        encoding = None
+        if len(body) >= MIN_COMPRESS_SIZE and getattr(self.server, 'encodings', None):
+            encoding = choose_encoding(self.headers.get('Accept-Encoding'), self.server.encodings)
+            if encoding:
+                body = compress_bytes(body, encoding, ONLINE_LEVELS[encoding])
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def translate_path(self, path):
+        """指定 --pages 时，/resources/ 下的页面优先使用 render_pages.py 生成的精简页面"""
+        local_path = super().translate_path(path)
+        pages_dir = getattr(self.server, 'pages_dir', None)
+        if pages_dir:
+            relative = os.path.relpath(local_path, self.directory)
+            prefix = 'resources' + os.sep
+            # --watch 发现已变化的页面不再使用按旧内容渲染的精简页面
+            if relative.startswith(prefix) and relative.replace(os.sep, '/') not in self.server.stale_pages:
+                page_path = os.path.join(pages_dir, relative[len(prefix):])
+                if os.path.isfile(page_path):
+                    return page_path
+        return local_path
+
+    def send_head(self):
+        """归档中的页面从 mmap 发送；普通文件走条件请求、压缩和缓存；目录跳转、列目录、404等交给父类处理"""
+        pack = getattr(self.server, 'pack', None)
+        if pack is not None:
+            name = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path).lstrip('/')
+            entry = pack.get(name)
+            if entry is not None and name not in self.server.stale_pages:
+                return self.send_pack_entry(pack, entry)
+
+        path = self.resolve_file(self.translate_path(self.path))
+        if path is None:
+            return super().send_head()
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            return super().send_head()
+        try:
+            return self.send_file(path, f, os.fstat(f.fileno()))
+        except:
+            f.close()
+            raise
+
+    def resolve_file(self, path):
+        """请求对应的普通文件路径（目录取其 index.html），其他情况返回 None"""
+        if os.path.isdir(path):
+            if not urllib.parse.urlsplit(self.path).path.endswith('/'):
+                return None
+            for index in ('index.html', 'index.htm'):
+                index_path = os.path.join(path, index)
+                if os.path.isfile(index_path):
+                    return index_path
+            return None
+        if path.endswith('/') or not os.path.isfile(path):
+            return None
+        return path
+
+    def send_file(self, path, f, st):
+        """发送文件响应头，返回需要写出的正文对象（304时返回 None）
+
+        正文按以下顺序选择：预压缩旁路文件 > 内存中的即时压缩结果 > 原文件。
+        """
+        server = self.server
+        accept_encoding = self.headers.get('Accept-Encoding')
+        compressible = path.endswith(COMPRESS_EXTENSIONS)
+        encoding = None
+        sidecar = None
+        if compressible:
+            sidecar = find_sidecar(path, st, accept_encoding)
+            if sidecar:
+                encoding, sidecar_path = sidecar
+                sidecar_file = open(sidecar_path, 'rb')
+                f.close()
+                f = sidecar_file
+                body_st = os.fstat(f.fileno())
+            elif getattr(server, 'encodings', None) and MIN_COMPRESS_SIZE <= st.st_size <= MAX_COMPRESS_SIZE:
+                encoding = choose_encoding(accept_encoding, server.encodings)
+        # 旁路文件按自身的修改时间和大小生成ETag，与即时压缩的版本区分
+        etag = make_etag(body_st if sidecar else st, encoding)
+
+        if self.is_not_modified(etag, st):
+            f.close()
+            server.count('not_modified')
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_validators(etag, st, compressible)
+            self.end_headers()
+            return None
+
+        if sidecar:
+            server.count('sidecar')
+            length = body_st.st_size
+        elif encoding:
+            body = self.compressed_body(path, f, st, encoding)
+            f.close()
+            f = io.BytesIO(body)
+            length = len(body)
+        else:
+            length = st.st_size
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-type', self.guess_type(path))
+        self.send_header('Content-Length', str(length))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_validators(etag, st, compressible)
+        self.end_headers()
+        return f
+
+    def send_pack_entry(self, pack, entry):
+        """发送归档中的页面响应头，返回需要写出的正文对象（304时返回 None）
+
+        客户端接受归档中的压缩编码时直接发送 mmap 中的内容；否则解压，再按需即时压缩（结果缓存）。
+        ETag 取页面内容的MD5，归档重新生成但页面未变时仍然有效。
+        """
+        server = self.server
+        accept_encoding = self.headers.get('Accept-Encoding')
+        compressible = entry.name.endswith(COMPRESS_EXTENSIONS)
+        body = pack.raw(entry)
+        encoding = entry.encoding or None
+        if encoding and not accepted_encodings(accept_encoding, (encoding,)):
+            body.release()
+            body = gzip.decompress(pack.raw(entry))
+            encoding = None
+            if compressible and getattr(server, 'encodings', None) and \
+                    MIN_COMPRESS_SIZE <= entry.size <= MAX_COMPRESS_SIZE:
+                encoding = choose_encoding(accept_encoding, server.encodings)
+        etag = f'"{entry.md5}-{encoding}"' if encoding else f'"{entry.md5}"'
+
+        if self.is_not_modified(etag, pack.stat):
+            if isinstance(body, memoryview):
+                body.release()
+            server.count('not_modified')
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_validators(etag, pack.stat, compressible)
+            self.end_headers()
+            return None
+
+        if isinstance(body, memoryview):
+            server.count('pack')
+            length = len(body)
+            body = MemoryBody(body)
+        else:
+            if encoding:
+                body = self.compressed_body(f'{pack.file_path}:{entry.name}', io.BytesIO(body), pack.stat, encoding)
+            length = len(body)
+            body = io.BytesIO(body)
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-type', self.guess_type(entry.name))
+        self.send_header('Content-Length', str(length))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_validators(etag, pack.stat, compressible)
+        self.end_headers()
+        return body
+
+    def copyfile(self, source, outputfile):
+        """磁盘文件用 sendfile 由内核直接发送到套接字，归档中的内容直接写出，内存中的内容走默认复制"""
+        if isinstance(source, MemoryBody):
+            outputfile.write(source.view)
+            return
+        try:
+            source.fileno()
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            super().copyfile(source, outputfile)
+            return
+        # 响应头已在 end_headers 中写出（wfile 无缓冲），可以直接操作套接字
+        self.server.count('sendfile')
+        self.server.count('sendfile_bytes', self.connection.sendfile(source))
+
+    def send_validators(self, etag, st, compressible):
+        """ETag/Last-Modified 等缓存相关响应头；no-cache 让浏览器每次用验证器确认"""
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', self.date_time_string(st.st_mtime))
+        self.send_header('Cache-Control', 'no-cache')
+        if compressible:
+            self.send_header('Vary', 'Accept-Encoding')
+
+    def is_not_modified(self, etag, st):
+        """条件请求判断：有 If-None-Match 时只比较ETag，否则比较 If-Modified-Since"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return etag_matches(if_none_match, etag)
+
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if not if_modified_since:
+            return False
+        try:
+            ims = email.utils.parsedate_to_datetime(if_modified_since)
+        except (TypeError, IndexError, OverflowError, ValueError):
+            return False
+        if ims.tzinfo is None:
+            ims = ims.replace(tzinfo=datetime.timezone.utc)
+        return int(st.st_mtime) <= ims.timestamp()
+
+    def compressed_body(self, path, f, st, encoding):
+        """文件的压缩内容，按 路径+修改时间+大小+编码 缓存"""
+        server = self.server
+        key = (path, st.st_mtime_ns, st.st_size, encoding)
+        body = server.cache.get(key)
+        if body is None:
+            body = compress_bytes(f.read(), encoding, ONLINE_LEVELS[encoding])
+            server.cache.put(key, body)
+            server.count('compressed')
+        return body
+
     def end_headers(self):
         # 为HTML文件添加UTF-8编码
         if self.path.endswith('.html') or self.path == '/':
@@ -20,9 +575,17 @@ class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         # 为JS文件添加UTF-8编码
         elif self.path.endswith('.js'):
             self.send_header('Content-Type', 'application/javascript; charset=utf-8')
-        
+
+        # 即将断开的HTTP/1.1连接需告知客户端（send_error 等已自带该头）
+        if self.close_connection and self.request_version == 'HTTP/1.1' and not self._has_header(b'connection:'):
+            self.send_header('Connection', 'close')
+
         super().end_headers()
 
+    def _has_header(self, prefix):
+        """判断待发送的响应头中是否已有指定头（prefix 为小写的 b'name:'）"""
+        return any(line.lower().startswith(prefix) for line in getattr(self, '_headers_buffer', []))
+
     def guess_type(self, path):
         """重写MIME类型猜测，确保正确处理UTF-8"""
         base, ext = os.path.splitext(path)
@@ -37,20 +600,297 @@ class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         else:
             return super().guess_type(path)
 
-if __name__ == "__main__":
-    PORT = 8080
-    
+    def log_message(self, format, *args):
+        if not getattr(self.server, 'quiet', False):
+            super().log_message(format, *args)
+
+class ConcurrentHTTPServer(http.server.HTTPServer):
+    """线程池并发的HTTP服务器
+
+    每个连接交给线程池处理，工作线程数即同时服务的连接上限，超出的连接排队等待。
+    关闭时先停止接受新连接，再让空闲的持久连接断开、进行中的请求处理完毕。
+    """
+
+    # 并发场景下加大监听队列，避免突发连接被内核丢弃后等待重传
+    request_queue_size = 128
+
+    def __init__(self, server_address, handler_class, workers=DEFAULT_WORKERS, quiet=False,
+                 cache_size=DEFAULT_CACHE_SIZE, cache_entry_size=DEFAULT_CACHE_ENTRY_SIZE, compress=True,
+                 catalog=None, pages_dir=None, schema_db=None, fk_graph=None, pack=None):
+        self.workers = workers
+        self.pack = pack
+        self.catalog = catalog
+        self.schema_db = schema_db
+        self.fk_graph = fk_graph
+        self.pages_dir = pages_dir
+        # --watch 发现已变化的页面（resources/<文件名>），不再从精简页面和归档中读取；整体替换，不原地修改
+        self.stale_pages = frozenset()
+        self.quiet = quiet
+        self.draining = False
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='http-worker')
+        self.connections = set()
+        self.lock = threading.Lock()
+        self.cache = ResponseCache(int(cache_size * 1024 * 1024), int(cache_entry_size * 1024 * 1024))
+        self.encodings = available_encodings(ONLINE_ENCODINGS) if compress else []
+        self.counters = {'not_modified': 0, 'compressed': 0, 'sidecar': 0, 'sendfile': 0, 'sendfile_bytes': 0,
+                         'pack': 0}
+        super().__init__(server_address, handler_class)
+
+    def count(self, name, n=1):
+        """累加运行计数"""
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def stats(self):
+        """运行统计：缓存命中情况和各项计数"""
+        with self.lock:
+            counters = dict(self.counters)
+            connections = len(self.connections)
+        return {
+            'workers': self.workers,
+            'connections': connections,
+            'encodings': self.encodings,
+            'catalog_size': len(self.catalog) if self.catalog is not None else None,
+            'pack_entries': len(self.pack) if self.pack is not None else None,
+            'cache': self.cache.stats(),
+            'counters': counters
+        }
+
+    def process_request(self, request, client_address):
+        """把连接交给线程池，监听线程立即返回继续接受连接"""
+        self.executor.submit(self.process_request_thread, request, client_address)
+
+    def process_request_thread(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def track_connection(self, connection, active):
+        """登记/注销正在处理的连接，关闭服务器时用于断开空闲连接"""
+        with self.lock:
+            if active:
+                self.connections.add(connection)
+                # 排队期间服务器已开始关闭：登记后立即让读端结束
+                if self.draining:
+                    self._shutdown_socket(connection, socket.SHUT_RD)
+            else:
+                self.connections.discard(connection)
+
+    @staticmethod
+    def _shutdown_socket(connection, how):
+        try:
+            connection.shutdown(how)
+        except OSError:
+            pass
+
+    def graceful_shutdown(self, timeout=SHUTDOWN_TIMEOUT):
+        """停止服务：关闭监听、结束空闲连接、等待进行中的请求，超时后强制断开
+
+        返回超时时仍未结束的连接数。须在 serve_forever() 返回之后调用。
+        """
+        with self.lock:
+            self.draining = True
+            # 关闭读端：等待下一个请求的空闲连接立即读到EOF并退出，
+            # 正在写响应的连接不受影响，写完后同样因EOF退出
+            for connection in self.connections:
+                self._shutdown_socket(connection, socket.SHUT_RD)
+        self.socket.close()
+
+        done = threading.Event()
+        waiter = threading.Thread(target=lambda: (self.executor.shutdown(wait=True), done.set()), daemon=True)
+        waiter.start()
+        if done.wait(timeout):
+            return 0
+
+        with self.lock:
+            remaining = list(self.connections)
+        for connection in remaining:
+            self._shutdown_socket(connection, socket.SHUT_RDWR)
+        done.wait(1)
+        return len(remaining)
+
+def create_server(port=DEFAULT_PORT, bind='', workers=DEFAULT_WORKERS, quiet=False,
+                  cache_size=DEFAULT_CACHE_SIZE, cache_entry_size=DEFAULT_CACHE_ENTRY_SIZE, compress=True,
+                  catalog=None, pages_dir=None, schema_db=None, fk_graph=None, pack=None):
+    """创建并发HTTP服务器"""
+    return ConcurrentHTTPServer((bind, port), CustomHTTPRequestHandler, workers=workers, quiet=quiet,
+                                cache_size=cache_size, cache_entry_size=cache_entry_size, compress=compress,
+                                catalog=catalog, pages_dir=pages_dir, schema_db=schema_db,
+                                fk_graph=fk_graph, pack=pack)
+
+def load_catalog(file_path=CATALOG_FILE):
+    """加载表目录，文件不存在或格式错误时返回 None（接口返回503，静态文件照常服务）"""
+    if not file_path or not os.path.exists(file_path):
+        return None
+    try:
+        return TableCatalog.load(file_path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️  加载表目录 {file_path} 失败: {e}")
+        return None
+
+def load_schema_db(file_path):
+    """打开 schema_db.py 导出的数据库，失败时返回 None（/api/search 改用表目录）"""
+    if not file_path:
+        return None
+    try:
+        return SchemaDatabase(file_path)
+    except (OSError, sqlite3.Error) as e:
+        print(f"⚠️  打开数据库 {file_path} 失败: {e}")
+        return None
+
+def load_fk_graph(file_path=GRAPH_FILE):
+    """加载外键关系图，文件不存在或格式错误时返回 None（/api/fk/ 接口返回503）"""
+    if not file_path or not os.path.exists(file_path):
+        return None
+    try:
+        return ForeignKeyGraph.load(file_path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️  加载外键关系图 {file_path} 失败: {e}")
+        return None
+
+def load_pack(path):
+    """打开 page_pack.py 生成的页面归档，失败时返回 None（页面从 resources/ 读取）"""
+    if not path:
+        return None
+    try:
+        return PagePack.open(path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️  打开页面归档 {path} 失败: {e}")
+        return None
+
+def watch_pages(httpd, resources_dir='resources', catalog_file=CATALOG_FILE, interval=WATCH_INTERVAL,
+                cache_file=TABLE_LIST_CACHE):
+    """--watch：监视页面变化，增量更新表目录并热替换，同时重写 table_list.json，返回已启动的 PageWatcher
+
+    新目录在监视线程中构建，完成后一次赋值替换 httpd.catalog，进行中的请求继续使用旧目录；
+    变化的页面此后直接发送 resources/ 中的文件，不再使用精简页面和归档中的旧内容。
+    """
+    def save(tables):
+        if catalog_file:
+            write_table_list(tables, catalog_file)
+
+    def on_change(changes):
+        start = time.time()
+        catalog = httpd.catalog
+        if catalog is None:
+            catalog = TableCatalog(watcher.tables())
+        else:
+            catalog = catalog.updated(changes.changed, changes.removed)
+        httpd.stale_pages = httpd.stale_pages.union(changes.added, changes.modified, changes.removed)
+        httpd.catalog = catalog
+        httpd.count('catalog_reloads')
+        save(watcher.tables())
+        if not httpd.quiet:
+            print(f"🔄 页面变化: 新增 {len(changes.added)}，修改 {len(changes.modified)}，"
+                  f"删除 {len(changes.removed)}，表目录已更新为 {len(catalog)} 张表 ({time.time() - start:.2f} 秒)")
+
+    watcher = PageWatcher(resources_dir, on_change, interval, cache_file=cache_file)
+    watcher.load()
+    # 启动时加载的 table_list.json 可能与页面目录不一致，以页面目录为准
+    tables = watcher.tables()
+    if httpd.catalog is None or httpd.catalog.live_tables() != tables:
+        httpd.catalog = TableCatalog(tables)
+        save(tables)
+    watcher.start()
+    return watcher
+
+def main():
+    parser = argparse.ArgumentParser(description='表结构文档HTTP服务器')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'监听端口 (默认 {DEFAULT_PORT})')
+    parser.add_argument('--bind', default='', help='监听地址 (默认所有地址)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'工作线程数，即同时服务的连接上限 (默认 {DEFAULT_WORKERS})')
+    parser.add_argument('--quiet', action='store_true', help='不打印访问日志')
+    parser.add_argument('--cache-size', type=float, default=DEFAULT_CACHE_SIZE,
+                        help=f'压缩响应缓存总大小，MB，0为不缓存 (默认 {DEFAULT_CACHE_SIZE})')
+    parser.add_argument('--cache-entry-size', type=float, default=DEFAULT_CACHE_ENTRY_SIZE,
+                        help=f'单个缓存响应的大小上限，MB (默认 {DEFAULT_CACHE_ENTRY_SIZE})')
+    parser.add_argument('--no-compress', action='store_true', help='不做即时压缩')
+    parser.add_argument('--catalog', default=CATALOG_FILE,
+                        help=f'/api/tables、/api/search 使用的表目录 (默认 {CATALOG_FILE})')
+    parser.add_argument('--db', metavar='FILE',
+                        help='由该 SQLite 文件（schema_db.py export 生成）响应 /api/search，支持字段级搜索')
+    parser.add_argument('--fk-graph', default=GRAPH_FILE,
+                        help=f'/api/fk/ 接口使用的外键关系图 (默认 {GRAPH_FILE}，由 fk_graph.py build 生成)')
+    parser.add_argument('--pages', metavar='DIR',
+                        help='优先使用该目录下的精简页面响应 /resources/ 请求（render_pages.py 生成，如 data/pages）')
+    parser.add_argument('--pack', nargs='?', const=PACK_DIR, metavar='PATH',
+                        help=f'由页面归档响应 /resources/ 请求（page_pack.py build 生成，默认 {PACK_DIR}）')
+    parser.add_argument('--watch', action='store_true',
+                        help='监视 resources/ 的页面变化，增量更新搜索接口的表目录并重写 table_list.json')
+    parser.add_argument('--watch-interval', type=float, default=WATCH_INTERVAL,
+                        help=f'--watch 的轮询间隔，秒 (默认 {WATCH_INTERVAL:g}，安装 inotify_simple 后按文件系统事件)')
+    args = parser.parse_args()
+    PORT = args.port
+
+    if args.pages and not os.path.isdir(args.pages):
+        print(f"错误: 目录不存在 {args.pages}")
+        sys.exit(1)
+
+    catalog = load_catalog(args.catalog)
+    schema_db = load_schema_db(args.db)
+    fk_graph = load_fk_graph(args.fk_graph)
+    pack = load_pack(args.pack)
+
     # 确保端口没有被占用
     try:
-        with socketserver.TCPServer(("", PORT), CustomHTTPRequestHandler) as httpd:
-            print(f"服务器启动在端口 {PORT}")
-            print(f"访问地址: http://localhost:{PORT}")
-            print("按 Ctrl+C 停止服务器")
-            httpd.serve_forever()
+        httpd = create_server(PORT, args.bind, args.workers, args.quiet,
+                              args.cache_size, args.cache_entry_size, not args.no_compress, catalog,
+                              os.path.abspath(args.pages) if args.pages else None, schema_db, fk_graph, pack)
     except OSError as e:
-        if e.errno == 48:  # Address already in use
+        if e.errno in (48, errno.EADDRINUSE):  # Address already in use
             print(f"端口 {PORT} 已被占用，请先停止其他服务器")
         else:
             print(f"启动服务器时出错: {e}")
+        sys.exit(1)
+
+    watcher = None
+    if args.watch:
+        watcher = watch_pages(httpd, 'resources', args.catalog, args.watch_interval)
+        catalog = httpd.catalog
+
+    # SIGTERM 与 Ctrl+C 一样优雅退出；shutdown() 会等待 serve_forever 返回，需在其他线程调用
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=httpd.shutdown).start())
+
+    print(f"服务器启动在端口 {PORT}（{args.workers} 个工作线程，HTTP/1.1 持久连接）")
+    print(f"访问地址: http://localhost:{PORT}")
+    if httpd.encodings:
+        print(f"即时压缩: {', '.join(httpd.encodings)}，缓存上限 {args.cache_size:g} MB，运行统计: {STATS_PATH}")
+    if catalog is not None:
+        print(f"表目录: {args.catalog}（{len(catalog)} 张表），搜索接口: /api/tables、/api/search")
+    else:
+        print(f"⚠️  未找到 {args.catalog}，搜索接口不可用（先运行 python3 build_table_list.py）")
+    if schema_db is not None:
+        print(f"数据库: {args.db}（{schema_db.meta.get('tables')} 张表，{schema_db.meta.get('columns')} 个字段），"
+              f"/api/search 支持 scope=columns")
+    if fk_graph is not None:
+        print(f"外键关系图: {args.fk_graph}（{fk_graph.edge_count} 条引用关系），接口: /api/fk/refs、/api/fk/table、/api/fk/path")
+    if args.pages:
+        print(f"精简页面: {args.pages}")
+    if watcher is not None:
+        print(f"监视页面变化: resources/（{'inotify' if HAS_INOTIFY else f'每 {args.watch_interval:g} 秒轮询'}），"
+              f"变化后更新 {args.catalog}")
+    if pack is not None:
+        print(f"页面归档: {pack.file_path}（{len(pack)} 个页面，{pack.stat.st_size / 1024 / 1024:.1f} MB，mmap）")
+    print("按 Ctrl+C 停止服务器")
+    try:
+        httpd.serve_forever()
     except KeyboardInterrupt:
-        print("\n服务器已停止") 
\ No newline at end of file
+        pass
+
+    print("\n正在停止服务器，等待进行中的请求完成...")
+    if watcher is not None:
+        watcher.stop()
+    remaining = httpd.graceful_shutdown()
+    if remaining:
+        print(f"⚠️  {remaining} 个连接超时未结束，已强制断开")
+    cache = httpd.cache.stats()
+    print(f"缓存命中 {cache['hits']} 次，未命中 {cache['misses']} 次，"
+          f"304响应 {httpd.counters['not_modified']} 次")
+    print("服务器已停止")
+
+if __name__ == "__main__":
+    main()
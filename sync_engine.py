@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+OSS同步执行引擎
+
+提供统一的存储桶接口和并发上传/批量删除的执行逻辑：
+1. OssBucket: 对 oss2.Bucket 的薄封装，大文件使用断点续传的分片上传
+2. LocalBucket: 基于本地目录的模拟存储桶，便于测试和演练（同样模拟分片上传和分片ETag）
+3. execute_plan: 流式消费同步动作，有界线程池并发上传、按批删除，失败自动重试
+4. TransferStats: 传输统计，含单个对象的耗时直方图和最慢对象
+"""
+
+import os
+import json
+import time
+import heapq
+import shutil
+import hashlib
+import threading
+from bisect import bisect_left
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from sync_plan import SyncAction, walk_sorted
+
+# 只在需要时导入oss2
+try:
+    import oss2
+    OSS2_AVAILABLE = True
+except ImportError:
+    OSS2_AVAILABLE = False
+
+# OSS批量删除接口单次最多1000个key
+MAX_DELETE_BATCH = 1000
+
+DEFAULT_WORKERS = 16
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+
+# 不小于该大小的文件使用分片上传，每个分片完成后记录进度，中断后从已完成的分片继续
+MULTIPART_THRESHOLD = 32 * 1024 * 1024
+PART_SIZE = 8 * 1024 * 1024
+PART_THREADS = 4
+MULTIPART_DIR = os.path.join('.cache', 'multipart')
+
+# 单个对象耗时直方图的桶上界（毫秒），超过最大上界的计入最后一个桶
+LATENCY_BUCKETS_MS = [1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+# 统计中保留的最慢对象数
+SLOWEST_OBJECTS = 10
+# 统计中保留的失败样例数
+FAILED_SAMPLES = 20
+
+class OssBucket:
+    """阿里云OSS存储桶"""
+
+    def __init__(self, bucket, multipart_threshold=MULTIPART_THRESHOLD, part_size=PART_SIZE,
+                 checkpoint_dir=MULTIPART_DIR):
+        self.bucket = bucket
+        self.multipart_threshold = multipart_threshold
+        self.part_size = part_size
+        self.checkpoint_dir = checkpoint_dir
+
+    def list_objects(self, prefix=''):
+        """遍历存储桶中 key 以 prefix 开头的对象，产出 (key, etag, size)"""
+        for obj in oss2.ObjectIterator(self.bucket, prefix=prefix):
+            yield obj.key, obj.etag, obj.size
+
+    def get_object(self, key):
+        """读取对象内容，不存在时返回 None"""
+        try:
+            return self.bucket.get_object(key).read()
+        except oss2.exceptions.NoSuchKey:
+            return None
+
+    def put_object(self, key, data, headers=None):
+        """写入小对象"""
+        self.bucket.put_object(key, data, headers=headers)
+
+    def upload_file(self, key, file_path, headers=None):
+        """上传单个文件，返回ETag
+
+        大文件使用 oss2.resumable_upload：分片进度保存在 checkpoint_dir，
+        上传中断后再次上传同一文件时只上传未完成的分片。
+        """
+        if os.path.getsize(file_path) >= self.multipart_threshold:
+            result = oss2.resumable_upload(
+                self.bucket, key, file_path, store=oss2.ResumableStore(root=self.checkpoint_dir),
+                headers=headers, multipart_threshold=self.multipart_threshold,
+                part_size=self.part_size, num_threads=PART_THREADS
+            )
+        else:
+            result = self.bucket.put_object_from_file(key, file_path, headers=headers)
+        return result.etag
+
+    def delete_objects(self, keys):
+        """批量删除对象（不超过1000个）"""
+        self.bucket.batch_delete_objects(list(keys))
+
+def multipart_etag(part_md5s):
+    """分片上传的ETag：各分片MD5拼接后的MD5 + "-分片数"（与OSS/S3一致）"""
+    digest = hashlib.md5(b''.join(bytes.fromhex(md5) for md5 in part_md5s)).hexdigest().upper()
+    return f'{digest}-{len(part_md5s)}'
+
+class LocalBucket:
+    """基于本地目录的模拟存储桶，行为与OSS一致：普通上传的ETag为内容MD5，分片上传的ETag为分片MD5的MD5
+
+    分片上传的进度和对象ETag保存在存储桶目录旁的 <root>.multipart/ 中。
+    """
+
+    def __init__(self, root, multipart_threshold=MULTIPART_THRESHOLD, part_size=PART_SIZE):
+        self.root = root
+        self.multipart_threshold = multipart_threshold
+        self.part_size = part_size
+        self.checkpoint_dir = root.rstrip('/\\') + '.multipart'
+        self.headers = {}
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self.etags_file = os.path.join(self.checkpoint_dir, 'etags.json')
+        self.etags = {}
+        if os.path.exists(self.etags_file):
+            with open(self.etags_file, 'r', encoding='utf-8') as f:
+                self.etags = json.load(f)
+
+    def _path(self, key):
+        return os.path.join(self.root, *key.split('/'))
+
+    def _set_etag(self, key, etag):
+        """记录分片上传对象的ETag（etag 为 None 时删除记录）"""
+        with self._lock:
+            if etag is None and key not in self.etags:
+                return
+            if etag is None:
+                del self.etags[key]
+            else:
+                self.etags[key] = etag
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            with open(self.etags_file, 'w', encoding='utf-8') as f:
+                json.dump(self.etags, f, ensure_ascii=False)
+
+    def list_objects(self, prefix=''):
+        """按key字典序遍历存储桶中 key 以 prefix 开头的对象，产出 (key, etag, size)"""
+        directory = prefix.rsplit('/', 1)[0] + '/' if '/' in prefix else ''
+        for key in walk_sorted(self._path(directory) if directory else self.root, directory):
+            if not key.startswith(prefix):
+                continue
+            path = self._path(key)
+            etag = self.etags.get(key)
+            if etag is None:
+                md5 = hashlib.md5()
+                with open(path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                        md5.update(chunk)
+                etag = md5.hexdigest().upper()
+            yield key, etag, os.path.getsize(path)
+
+    def upload_file(self, key, file_path, headers=None):
+        """上传单个文件，返回ETag"""
+        target = self._path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.getsize(file_path) >= self.multipart_threshold:
+            etag = self._multipart_upload(key, file_path, target)
+        else:
+            shutil.copyfile(file_path, target)
+            self._set_etag(key, None)
+            etag = None
+        with self._lock:
+            self.headers[key] = dict(headers or {})
+        return etag
+
+    def get_object(self, key):
+        """读取对象内容，不存在时返回 None"""
+        path = self._path(key)
+        if not os.path.isfile(path):
+            return None
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def put_object(self, key, data, headers=None):
+        """写入小对象"""
+        target = self._path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(data)
+        self._set_etag(key, None)
+        with self._lock:
+            self.headers[key] = dict(headers or {})
+
+    def _multipart_upload(self, key, file_path, target):
+        """分片上传：每完成一个分片写入检查点，检查点与源文件（修改时间、大小）一致时从断点继续"""
+        name = hashlib.md5(key.encode('utf-8')).hexdigest()
+        checkpoint_file = os.path.join(self.checkpoint_dir, name + '.json')
+        part_file = os.path.join(self.checkpoint_dir, name + '.part')
+        st = os.stat(file_path)
+        source = [st.st_mtime_ns, st.st_size]
+
+        state = None
+        if os.path.exists(checkpoint_file) and os.path.exists(part_file):
+            with open(checkpoint_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('source') != source or state.get('part_size') != self.part_size:
+                state = None
+        if state is None:
+            state = {'key': key, 'source': source, 'part_size': self.part_size, 'parts': []}
+            os.makedirs(self.checkpoint_dir, exist_ok=True)
+            open(part_file, 'wb').close()
+
+        part_count = max(1, -(-st.st_size // self.part_size))
+        with open(file_path, 'rb') as src, open(part_file, 'r+b') as out:
+            for number in range(len(state['parts']), part_count):
+                src.seek(number * self.part_size)
+                data = src.read(self.part_size)
+                self.upload_part(out, number, data)
+                state['parts'].append(hashlib.md5(data).hexdigest())
+                tmp_path = checkpoint_file + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(state, f)
+                os.replace(tmp_path, checkpoint_file)
+
+        etag = multipart_etag(state['parts'])
+        os.replace(part_file, target)
+        os.remove(checkpoint_file)
+        self._set_etag(key, etag)
+        return etag
+
+    def upload_part(self, out, number, data):
+        """写入一个分片"""
+        out.seek(number * self.part_size)
+        out.write(data)
+        out.flush()
+
+    def delete_objects(self, keys):
+        """批量删除对象（不超过1000个）"""
+        keys = list(keys)
+        if len(keys) > MAX_DELETE_BATCH:
+            raise ValueError(f'单次最多删除 {MAX_DELETE_BATCH} 个对象')
+        for key in keys:
+            path = self._path(key)
+            if os.path.exists(path):
+                os.remove(path)
+            self._set_etag(key, None)
+            with self._lock:
+                self.headers.pop(key, None)
+
+class TransferStats:
+    """传输统计（线程安全）"""
+
+    def __init__(self):
+        self.objects = 0
+        self.bytes = 0
+        self.failed = []
+        self.retries = 0
+        self.started = time.time()
+        self.finished = None
+        # 单个对象（删除为单个批次）的耗时：直方图、累计、最慢的若干个（最小堆）
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.slowest = []
+        self.first_started = None
+        self.last_finished = None
+        self._lock = threading.Lock()
+
+    def add_success(self, size=0):
+        with self._lock:
+            self.objects += 1
+            self.bytes += size
+
+    def add_failure(self, key, error):
+        with self._lock:
+            self.failed.append((key, str(error)))
+
+    def add_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def add_latency(self, key, started, finished, size=0, retries=0):
+        """记录单个对象的耗时（time.perf_counter 时间戳，含重试和退避等待）"""
+        seconds = finished - started
+        index = bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)
+        with self._lock:
+            self.latency_counts[index] += 1
+            self.latency_total += seconds
+            self.latency_max = max(self.latency_max, seconds)
+            if self.first_started is None or started < self.first_started:
+                self.first_started = started
+            if self.last_finished is None or finished > self.last_finished:
+                self.last_finished = finished
+            item = (seconds, key, size, retries)
+            if len(self.slowest) < SLOWEST_OBJECTS:
+                heapq.heappush(self.slowest, item)
+            else:
+                heapq.heappushpop(self.slowest, item)
+
+    def finish(self):
+        self.finished = time.time()
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.time()) - self.started
+
+    @property
+    def active_seconds(self):
+        """第一个对象开始到最后一个对象结束的时长"""
+        if self.first_started is None:
+            return 0.0
+        return self.last_finished - self.first_started
+
+    def rate_summary(self):
+        """返回吞吐量描述，如 '120.5 个/秒, 3.21 MB/秒'"""
+        elapsed = max(self.elapsed, 1e-6)
+        return f"{self.objects / elapsed:.1f} 个/秒, {self.bytes / elapsed / 1024 / 1024:.2f} MB/秒"
+
+    def latency_percentile(self, p):
+        """按直方图估计耗时分位数（毫秒，取所在桶的上界，最后一个桶取最大值）"""
+        count = sum(self.latency_counts)
+        if not count:
+            return 0.0
+        rank = max(1, int(count * p / 100.0 + 0.5))
+        seen = 0
+        for index, bucket_count in enumerate(self.latency_counts):
+            seen += bucket_count
+            if seen >= rank:
+                if index < len(LATENCY_BUCKETS_MS):
+                    return min(LATENCY_BUCKETS_MS[index], round(self.latency_max * 1000, 1))
+                break
+        return round(self.latency_max * 1000, 1)
+
+    def to_dict(self):
+        """可写入JSON报告的统计信息"""
+        count = sum(self.latency_counts)
+        labels = [f'<={bound}ms' for bound in LATENCY_BUCKETS_MS] + [f'>{LATENCY_BUCKETS_MS[-1]}ms']
+        return {
+            'objects': self.objects,
+            'bytes': self.bytes,
+            'retries': self.retries,
+            'failed': len(self.failed),
+            'failed_samples': [{'key': key, 'error': error} for key, error in self.failed[:FAILED_SAMPLES]],
+            'elapsed_seconds': round(self.elapsed, 3),
+            'active_seconds': round(self.active_seconds, 3),
+            'busy_seconds': round(self.latency_total, 3),
+            'latency_ms': {
+                'count': count,
+                'mean': round(self.latency_total / count * 1000, 1) if count else 0.0,
+                'p50': self.latency_percentile(50),
+                'p90': self.latency_percentile(90),
+                'p99': self.latency_percentile(99),
+                'max': round(self.latency_max * 1000, 1),
+                'histogram': dict(zip(labels, self.latency_counts))
+            },
+            'slowest': [
+                {'key': key, 'ms': round(seconds * 1000, 1), 'bytes': size, 'retries': retries}
+                for seconds, key, size, retries in sorted(self.slowest, reverse=True)
+            ]
+        }
+
+def call_with_retry(func, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, on_retry=None):
+    """调用func，失败后按指数退避重试，重试耗尽后抛出最后一次异常"""
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except Exception:
+            if attempt >= retries:
+                raise
+            if on_retry:
+                on_retry()
+            time.sleep(backoff * (2 ** attempt))
+            attempt += 1
+
+def execute_plan(bucket, actions, headers_func, workers=DEFAULT_WORKERS,
+                 retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF,
+                 batch_size=MAX_DELETE_BATCH, verbose=True, timer=None, on_uploaded=None):
+    """流式执行同步动作，返回 (上传统计, 删除统计, 跳过数量)
+
+    headers_func(key) 返回上传对象的HTTP头，上传内容取自 action.path。
+    timer 为 sync_report.PhaseTimer 时记录等待动作产出（plan）、
+    在途任务已满时的等待（backpressure）和最后等待全部完成（drain）的耗时。
+    on_uploaded(action, etag) 在每个文件上传成功后于工作线程中调用（如写入部署日志）。
+
+    动作一边产出一边提交到线程池，同时在途的任务数不超过 workers 的4倍，
+    因此可以在OSS列举尚未结束时就开始上传，内存占用也不随文件数增长。
+    删除动作攒够 batch_size 个key后作为一次批量删除提交。
+    """
+    upload_stats = TransferStats()
+    delete_stats = TransferStats()
+    skipped = 0
+    workers = max(1, workers)
+    batch_size = max(1, min(batch_size, MAX_DELETE_BATCH))
+    max_pending = workers * 4
+    pending = {}
+    phase = timer.phase if timer else (lambda name: nullcontext())
+    if timer:
+        actions = timer.wrap_iter('plan', actions)
+
+    def run(stats, key, size, func):
+        attempts = [0]
+
+        def on_retry():
+            attempts[0] += 1
+            stats.add_retry()
+
+        started = time.perf_counter()
+        result = call_with_retry(func, retries=retries, backoff=backoff, on_retry=on_retry)
+        stats.add_latency(key, started, time.perf_counter(), size, attempts[0])
+        return result
+
+    def upload_one(action):
+        size = os.path.getsize(action.path)
+        etag = run(upload_stats, action.key, size,
+                   lambda: bucket.upload_file(action.key, action.path, headers=headers_func(action.key)))
+        if on_uploaded:
+            on_uploaded(action, etag)
+        return size
+
+    def delete_batch(keys):
+        run(delete_stats, f'{keys[0]} ({len(keys)} 个)', 0, lambda: bucket.delete_objects(keys))
+
+    def collect(done):
+        for future in done:
+            op, payload = pending.pop(future)
+            if op == 'upload':
+                try:
+                    upload_stats.add_success(future.result())
+                    if verbose:
+                        print(f"   ✅ 上传: {payload}")
+                except Exception as e:
+                    upload_stats.add_failure(payload, e)
+                    print(f"   ❌ 上传失败 {payload}: {e}")
+            else:
+                try:
+                    future.result()
+                    for key in payload:
+                        delete_stats.add_success()
+                        if verbose:
+                            print(f"   ✅ 删除: {key}")
+                except Exception as e:
+                    for key in payload:
+                        delete_stats.add_failure(key, e)
+                    print(f"   ❌ 删除失败 ({len(payload)} 个文件): {e}")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        delete_keys = []
+        for action in actions:
+            if action.op == 'upload':
+                pending[executor.submit(upload_one, action)] = ('upload', action.key)
+            elif action.op == 'delete':
+                delete_keys.append(action.key)
+                if len(delete_keys) >= batch_size:
+                    pending[executor.submit(delete_batch, delete_keys)] = ('delete', delete_keys)
+                    delete_keys = []
+            else:
+                skipped += 1
+
+            if len(pending) >= max_pending:
+                with phase('backpressure'):
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+
+        if delete_keys:
+            pending[executor.submit(delete_batch, delete_keys)] = ('delete', delete_keys)
+        with phase('drain'):
+            done, _ = wait(pending)
+        collect(done)
+
+    upload_stats.finish()
+    delete_stats.finish()
+    return upload_stats, delete_stats, skipped
+
+def upload_files(bucket, files, headers_func, workers=DEFAULT_WORKERS,
+                 retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, verbose=True):
+    """并发上传文件，files 为 (key, 本地路径) 序列，返回 TransferStats"""
+    actions = (SyncAction('upload', key, file_path, 'forced') for key, file_path in files)
+    upload_stats, _, _ = execute_plan(bucket, actions, headers_func, workers=workers,
+                                      retries=retries, backoff=backoff, verbose=verbose)
+    return upload_stats
+
+def delete_files(bucket, keys, batch_size=MAX_DELETE_BATCH, workers=DEFAULT_WORKERS,
+                 retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, verbose=True):
+    """按批并发删除对象，返回 TransferStats"""
+    actions = (SyncAction('delete', key, None, 'extra') for key in keys)
+    _, delete_stats, _ = execute_plan(bucket, actions, None, workers=workers, retries=retries,
+                                      backoff=backoff, batch_size=batch_size, verbose=verbose)
+    return delete_stats
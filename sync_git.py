@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+按git提交范围计算部署变更
+
+部署记录中保存上次部署的提交，本次部署用 git diff --name-status 得到两次提交之间
+新增/修改/删除的文件，不需要列举整个存储桶和本地目录。
+git 不可用或不在仓库中时各函数返回 None / 空结果，由调用方退回完整比对。
+"""
+
+import subprocess
+
+def git(*args):
+    """运行git命令，返回标准输出；git不可用或命令失败时返回 None"""
+    try:
+        result = subprocess.run(['git'] + list(args), capture_output=True, check=False)
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.decode('utf-8', 'surrogateescape')
+
+def git_head():
+    """当前提交的完整哈希，不在git仓库中时返回 None"""
+    output = git('rev-parse', '--verify', 'HEAD')
+    return output.strip() if output else None
+
+def has_commit(commit):
+    """本地仓库中是否有该提交（浅克隆可能没有）"""
+    return git('cat-file', '-e', f'{commit}^{{commit}}') is not None
+
+def changed_files(base, head='HEAD'):
+    """两次提交之间变化的文件，返回 [(状态, 路径)]，状态为 A/M/D/T，重命名拆为删除+新增"""
+    output = git('-c', 'core.quotepath=off', 'diff', '--name-status', '--no-renames', '-z', base, head, '--')
+    if output is None:
+        return None
+    fields = output.split('\0')
+    return [(fields[i][0], fields[i + 1]) for i in range(0, len(fields) - 1, 2)]
+
+def dirty_files(paths):
+    """指定路径下未提交的修改和未跟踪的文件（不含 .gitignore 忽略的文件）"""
+    output = git('status', '--porcelain', '-z', '--untracked-files=all', '--', *paths)
+    if not output:
+        return []
+    files = []
+    entries = iter(output.split('\0'))
+    for entry in entries:
+        if not entry:
+            continue
+        files.append(entry[3:])
+        # 重命名条目后面跟着原路径
+        if entry[0] in 'RC':
+            next(entries, None)
+    return files
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+部署日志与分片ETag记录
+
+1. DeployJournal: 记录本次部署已完成的上传（JSON Lines，每行写入后立即flush），
+   部署中断后重跑时，已在日志中且内容未变的文件直接跳过，不再上传（包括 --full）。
+   日志按部署目标和选项区分（plan），选项不同时重新开始；部署全部成功后删除日志。
+2. MultipartEtags: 分片上传对象的ETag不是内容MD5（形如 XXX-3），
+   记录 ETag -> 内容MD5，下次部署据此判断大文件是否变化，避免每次都重新上传。
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+from sync_plan import SyncAction
+
+JOURNAL_FILE = os.path.join('.cache', 'deploy_journal.jsonl')
+MULTIPART_ETAGS_FILE = os.path.join('.cache', 'multipart_etags.json')
+
+def plan_id(options):
+    """部署选项（目标存储桶、是否压缩等）的摘要，用于区分不同部署的日志"""
+    data = json.dumps(options, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()[:16]
+
+class DeployJournal:
+    """部署日志：首行为 {"plan", "started"}，之后每行一个已上传的文件 {"key", "md5"}
+
+    resume=False 时不读取已有日志，重新开始记录。
+    """
+
+    def __init__(self, file_path=JOURNAL_FILE, plan='', resume=True):
+        self.file_path = file_path
+        self.plan = plan
+        self.completed = {}
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+        resumed = False
+        if resume and os.path.exists(file_path):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                lines = f.read().split('\n')
+            try:
+                resumed = json.loads(lines[0]).get('plan') == plan
+            except ValueError:
+                resumed = False
+            if resumed:
+                for line in lines[1:]:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # 中断时最后一行可能不完整
+                        continue
+                    self.completed[entry['key']] = entry['md5']
+
+        os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+        if resumed:
+            # 保证后续追加的记录从新的一行开始
+            self._file = open(file_path, 'a', encoding='utf-8')
+            self._file.write('\n')
+        else:
+            self._file = open(file_path, 'w', encoding='utf-8')
+            self._file.write(json.dumps({'plan': plan, 'started': time.strftime('%Y-%m-%d %H:%M:%S')}) + '\n')
+        self._file.flush()
+
+    def filter(self, actions, md5_func):
+        """已在日志中且内容未变（md5_func(path) 与记录一致）的上传改为跳过，reason 为 journal"""
+        for action in actions:
+            if action.op == 'upload' and action.key in self.completed \
+                    and self.completed[action.key] == md5_func(action.path):
+                self.skipped += 1
+                yield SyncAction('skip', action.key, action.path, 'journal')
+            else:
+                yield action
+
+    def record(self, key, md5):
+        """记录一个已上传的文件（线程安全）"""
+        line = json.dumps({'key': key, 'md5': md5}, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self.completed[key] = md5
+
+    def close(self, finished=False):
+        """关闭日志，finished=True（全部成功）时删除日志文件"""
+        self._file.close()
+        if finished and os.path.exists(self.file_path):
+            os.remove(self.file_path)
+
+class MultipartEtags:
+    """分片上传对象的 ETag -> 内容MD5"""
+
+    def __init__(self, file_path=MULTIPART_ETAGS_FILE):
+        self.file_path = file_path
+        self.etags = {}
+        self._lock = threading.Lock()
+        if os.path.exists(file_path):
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    self.etags = json.load(f)
+            except (OSError, ValueError):
+                self.etags = {}
+
+    @staticmethod
+    def normalize(etag):
+        return (etag or '').strip('"').upper()
+
+    def get(self, etag):
+        """ETag对应的内容MD5，没有记录时返回 None"""
+        return self.etags.get(self.normalize(etag))
+
+    def add(self, etag, md5):
+        """记录一个分片上传对象，立即写入文件"""
+        with self._lock:
+            self.etags[self.normalize(etag)] = md5
+            os.makedirs(os.path.dirname(self.file_path) or '.', exist_ok=True)
+            tmp_path = self.file_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.etags, f)
+            os.replace(tmp_path, self.file_path)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+OSS同步计划
+
+将本地文件流和OSS对象列举流（两者均按key字典序）做归并连接，
+线性时间、常数内存地产出上传/删除/跳过动作，边列举边执行。
+"""
+
+import os
+import json
+from collections import namedtuple, Counter
+
+# op: upload / delete / skip
+# path: 本地文件路径（delete 为 None）
+# reason: new / changed / forced / unchanged / extra，
+#         commit / deleted（按提交范围增量部署）、journal（部署日志中已完成）、retained（保留中的旧哈希文件）
+SyncAction = namedtuple('SyncAction', ['op', 'key', 'path', 'reason'])
+
+def walk_sorted(root, prefix=''):
+    """按OSS key的字典序（UTF-8字节序）递归遍历目录，产出 '/' 分隔的相对路径
+
+    目录按 "名称/" 参与排序，保证 "css/a.css" 与 "css(x).html" 等key的先后
+    顺序与OSS列举结果一致。
+    """
+    try:
+        entries = list(os.scandir(root))
+    except FileNotFoundError:
+        return
+
+    keyed = []
+    for entry in entries:
+        if entry.is_dir():
+            keyed.append((entry.name + '/', entry))
+        else:
+            keyed.append((entry.name, entry))
+    keyed.sort(key=lambda item: item[0])
+
+    for name, entry in keyed:
+        if entry.is_dir():
+            yield from walk_sorted(entry.path, prefix + name)
+        else:
+            yield prefix + name
+
+def merge_join(local_keys, remote_objects):
+    """归并连接两个有序流
+
+    local_keys 产出 key，remote_objects 产出 (key, etag, size)；
+    产出 (key, 是否在本地, 远端对象或None)。输入无序时抛出 ValueError。
+    """
+    local_iter = iter(local_keys)
+    remote_iter = iter(remote_objects)
+
+    def next_local(last):
+        key = next(local_iter, None)
+        if key is not None and last is not None and key <= last:
+            raise ValueError(f'本地文件列表未排序: {last} -> {key}')
+        return key
+
+    def next_remote(last):
+        obj = next(remote_iter, None)
+        if obj is not None and last is not None and obj[0] <= last:
+            raise ValueError(f'OSS对象列表未排序: {last} -> {obj[0]}')
+        return obj
+
+    local = next_local(None)
+    remote = next_remote(None)
+    while local is not None or remote is not None:
+        if remote is None or (local is not None and local < remote[0]):
+            yield local, True, None
+            local = next_local(local)
+        elif local is None or remote[0] < local:
+            yield remote[0], False, remote
+            remote = next_remote(remote[0])
+        else:
+            yield local, True, remote
+            local = next_local(local)
+            remote = next_remote(remote[0])
+
+def plan_sync(local_keys, remote_objects, is_changed, full=False, resolve_path=None):
+    """生成同步动作流
+
+    is_changed(path, etag) 判断内容是否变化；本地与远端大小不同时直接视为变化。
+    resolve_path(key) 返回实际上传的本地文件（如预压缩版本），默认即key本身。
+    """
+    for key, in_local, remote in merge_join(local_keys, remote_objects):
+        if not in_local:
+            yield SyncAction('delete', key, None, 'extra')
+            continue
+
+        path = resolve_path(key) if resolve_path else key
+        if remote is None:
+            yield SyncAction('upload', key, path, 'new')
+        elif full:
+            yield SyncAction('upload', key, path, 'forced')
+        elif remote[2] is not None and remote[2] != os.path.getsize(path):
+            yield SyncAction('upload', key, path, 'changed')
+        elif is_changed(path, remote[1]):
+            yield SyncAction('upload', key, path, 'changed')
+        else:
+            yield SyncAction('skip', key, path, 'unchanged')
+
+def save_plan_json(actions, file_path):
+    """边产出动作边写入JSON文件：{"actions": [...], "summary": {...}}"""
+    counts = Counter()
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write('{"actions": [')
+        first = True
+        for action in actions:
+            counts[action.op] += 1
+            f.write(('\n' if first else ',\n') + json.dumps(action._asdict(), ensure_ascii=False))
+            first = False
+            yield action
+        f.write('\n], "summary": ' + json.dumps(dict(counts), ensure_ascii=False) + '}\n')
+
+def print_plan(actions):
+    """打印同步计划（跳过的文件只计数），返回各类动作数量"""
+    counts = Counter()
+    for action in actions:
+        counts[action.op] += 1
+        if action.op == 'upload':
+            print(f"   📤 上传 ({action.reason}): {action.key}")
+        elif action.op == 'delete':
+            print(f"   🗑️  删除: {action.key}")
+    return counts
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+部署运行报告
+
+PhaseTimer 按阶段累计耗时（线程安全，开销为每次调用两次计时），
+build_report 汇总阶段耗时与上传/删除统计（sync_engine.TransferStats），
+write_report 写入JSON：
+
+    {
+      "version": 1, "started": "...", "status": "ok" | "failed", "error": null,
+      "options": {...}, "counts": {"upload": n, "delete": n, "skip": n},
+      "phases": {"precompress": {"seconds": s, "calls": n}, "plan": {...}, ...},
+      "upload": {"objects", "bytes", "retries", "latency_ms": {..., "histogram"}, "slowest": [...]},
+      "delete": {...}
+    }
+
+同步是流式的（边列举边上传），各阶段在时间上重叠：
+plan 为主线程等待下一个同步动作的总耗时，其中包含 plan.local_scan（遍历本地文件）、
+plan.remote_listing（列举OSS对象）和 plan.change_detection（计算MD5比较）；
+backpressure 为在途任务已满时等待上传完成的耗时，plan 占比高说明瓶颈在列举和比较，
+backpressure 占比高说明瓶颈在上传。
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+REPORT_VERSION = 1
+
+class PhaseTimer:
+    """按阶段名累计耗时和调用次数"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.seconds = {}
+        self.calls = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds, calls=1):
+        """累加一个阶段的耗时"""
+        with self._lock:
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+            self.calls[name] = self.calls.get(name, 0) + calls
+
+    @contextmanager
+    def phase(self, name):
+        """with timer.phase(name): 计时代码块"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def wrap_iter(self, name, iterable):
+        """逐个产出 iterable 的元素，累计每次取下一个元素的耗时"""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add(name, time.perf_counter() - start)
+                return
+            self.add(name, time.perf_counter() - start)
+            yield item
+
+    def wrap_func(self, name, func):
+        """返回累计 func 调用耗时的包装函数"""
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(name, time.perf_counter() - start)
+        return wrapper
+
+    def to_dict(self):
+        """{阶段名: {"seconds", "calls"}}，按阶段名排序"""
+        with self._lock:
+            return {
+                name: {'seconds': round(self.seconds[name], 3), 'calls': self.calls[name]}
+                for name in sorted(self.seconds)
+            }
+
+def build_report(timer, options=None, counts=None, upload_stats=None, delete_stats=None, error=None):
+    """汇总一次部署的报告"""
+    return {
+        'version': REPORT_VERSION,
+        'started': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timer.started)),
+        'elapsed_seconds': round(time.time() - timer.started, 3),
+        'status': 'failed' if error or (upload_stats and upload_stats.failed) or (delete_stats and delete_stats.failed) else 'ok',
+        'error': str(error) if error else None,
+        'options': options or {},
+        'counts': counts or {},
+        'phases': timer.to_dict(),
+        'upload': upload_stats.to_dict() if upload_stats else None,
+        'delete': delete_stats.to_dict() if delete_stats else None
+    }
+
+def write_report(report, file_path):
+    """写入JSON报告（先写临时文件再替换）"""
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+    tmp_path = file_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, file_path)
+
+def print_report(report):
+    """打印阶段耗时、耗时分位数和最慢的几个对象"""
+    phases = report['phases']
+    if phases:
+        print("⏱️  阶段耗时:")
+        for name, phase in phases.items():
+            print(f"   - {name}: {phase['seconds']:.1f} 秒 ({phase['calls']} 次)")
+    for op, label in (('upload', '上传'), ('delete', '删除')):
+        stats = report.get(op)
+        if not stats or not stats['latency_ms']['count']:
+            continue
+        latency = stats['latency_ms']
+        print(f"   - {label}耗时: p50 ≤{latency['p50']} ms, p90 ≤{latency['p90']} ms, "
+              f"p99 ≤{latency['p99']} ms, 最大 {latency['max']} ms")
+        for item in stats['slowest'][:3]:
+            print(f"     🐢 {item['key']}: {item['ms']} ms (重试 {item['retries']} 次)")
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+表结构页面解析
+
+resources/ 下的页面由电子表格渲染器导出，结构固定：
+- "基本信息" 区域：标签单元格后紧跟取值单元格（数据库表名、中文名词等）
+- "字段详细信息" 区域：每个字段一行 <tr data-id='序号'>，固定13个单元格
+
+页面有大量空白布局单元格，用正则按单元格扫描比构建完整DOM快一个数量级。
+"""
+
+import os
+import re
+import json
+import html
+from concurrent.futures import ProcessPoolExecutor
+
+# 基本信息标签 -> 字段名
+BASIC_INFO_LABELS = {
+    '数据库表名': 'table_name',
+    '中文名词': 'chinese_name',
+    '所属模块': 'module',
+    '微服务': 'microservice',
+    '所属数据库': 'database',
+    '描述': 'description'
+}
+
+# 字段详细信息区域的起始标记
+DETAIL_MARKER = "<div class='detail-title'>字段详细信息</div>"
+
+# 字段明细行的起始标记
+ROW_MARKER = '<tr data-id'
+
+# 字段明细列（按单元格顺序，导出页面的第0个单元格为空白布局列）
+COLUMN_FIELDS = [
+    'seq',             # 序号
+    'name',            # 数据库列名
+    'chinese_name',    # 中文名称
+    'data_type',       # 数据类型
+    'length',          # 长度
+    'nullable',        # 是否允许空值
+    'foreign_key',     # 是否为外键
+    'auto_increment',  # 是否自增长
+    'default',         # 默认值
+    'primary_key',     # 是否为主键
+    'fk_info',         # 外键信息
+    'description'      # 说明
+]
+
+# 以开关（复选框）呈现的字段
+FLAG_FIELDS = {'nullable', 'foreign_key', 'auto_increment', 'primary_key'}
+
+# 表级字段（table_list.json 记录 + 描述）
+TABLE_FIELDS = [
+    'table_name', 'chinese_name', 'filename', 'module', 'database',
+    'microservice', 'file_id', 'description'
+]
+
+# 解析缓存目录
+CACHE_DIR = '.cache'
+
+TD_RE = re.compile(r'<td\b[^>]*>(.*?)</td>', re.S)
+CHECKED_RE = re.compile(r"<input[^>]*\bchecked\b")
+TAG_RE = re.compile(r'<[^>]+>')
+FILENAME_RE = re.compile(r'^(?P<table_name>[^(]*)\((?P<chinese_name>.*)\)_(?P<file_id>\d+)\.html$')
+
+def cell_text(cell_html):
+    """提取单元格纯文本"""
+    return html.unescape(TAG_RE.sub('', cell_html)).strip()
+
+def parse_filename(filename):
+    """从文件名 表名(中文名)_文件ID.html 中解析出 (表名, 中文名, 文件ID)"""
+    match = FILENAME_RE.match(filename)
+    if not match:
+        return os.path.splitext(filename)[0], '', ''
+    return match.group('table_name'), match.group('chinese_name'), match.group('file_id')
+
+def parse_basic_info(content):
+    """解析页面的基本信息，返回 {字段名: 取值}"""
+    end = content.find(DETAIL_MARKER)
+    head = content if end < 0 else content[:end]
+
+    info = {}
+    cells = TD_RE.findall(head)
+    for i, cell in enumerate(cells[:-1]):
+        field = BASIC_INFO_LABELS.get(cell_text(cell))
+        if field and field not in info:
+            info[field] = cell_text(cells[i + 1])
+    return info
+
+def split_cells(row_html):
+    """按 </td> 切分一行的单元格，返回各单元格内部的HTML"""
+    cells = []
+    for part in row_html.split('</td>')[:-1]:
+        start = part.find('<td')
+        cells.append(part[part.index('>', start) + 1:])
+    return cells
+
+def parse_columns(content):
+    """解析字段详细信息，返回字段列表，每个字段为 {COLUMN_FIELDS中的字段名: 取值}
+
+    开关类字段为 0/1，其余为字符串（序号转为整数）。
+    字段行数量大，这里用字符串切分代替正则，速度快数倍。
+    """
+    start = content.find(DETAIL_MARKER)
+    if start < 0:
+        return []
+
+    columns = []
+    for chunk in content[start:].split(ROW_MARKER)[1:]:
+        row_html = chunk[chunk.index('>') + 1:chunk.find('</tr>')]
+        cells = split_cells(row_html)
+        # 导出页面的首个单元格为空白布局列，render_pages.py 渲染的精简页面没有这一列
+        if len(cells) > len(COLUMN_FIELDS):
+            cells = cells[1:]
+        if len(cells) < len(COLUMN_FIELDS):
+            continue
+        column = {}
+        for field, cell in zip(COLUMN_FIELDS, cells):
+            if field in FLAG_FIELDS:
+                column[field] = 1 if CHECKED_RE.search(cell) else 0
+            else:
+                column[field] = cell_text(cell)
+        column['seq'] = int(column['seq']) if column['seq'].isdigit() else len(columns) + 1
+        columns.append(column)
+    return columns
+
+def read_page(file_path):
+    """读取页面内容"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def table_record(filename, info):
+    """由文件名和基本信息组成表级记录（TABLE_FIELDS），页面缺失的取值用文件名补全"""
+    table_name, chinese_name, file_id = parse_filename(filename)
+    return {
+        'table_name': info.get('table_name') or table_name,
+        'chinese_name': info.get('chinese_name') or chinese_name,
+        'filename': filename,
+        'module': info.get('module', ''),
+        'database': info.get('database', ''),
+        'microservice': info.get('microservice', ''),
+        'file_id': file_id,
+        'description': info.get('description', '')
+    }
+
+def parse_table_entry(file_path):
+    """解析单个页面，生成 table_list.json 中的一条记录（filepath 由调用方补充）"""
+    record = table_record(os.path.basename(file_path), parse_basic_info(read_page(file_path)))
+    del record['description']
+    return record
+
+def parse_table_schema(file_path):
+    """解析单个页面的完整结构：表级记录 + 'columns' 字段列表"""
+    content = read_page(file_path)
+    record = table_record(os.path.basename(file_path), parse_basic_info(content))
+    record['columns'] = parse_columns(content)
+    return record
+
+def list_table_pages(resources_dir='resources'):
+    """按文件名排序列出 resources 目录下的表结构页面"""
+    if not os.path.isdir(resources_dir):
+        return []
+    return sorted(
+        os.path.join(resources_dir, name)
+        for name in os.listdir(resources_dir)
+        if name.endswith('.html')
+    )
+
+def file_signature(file_path):
+    """文件签名：修改时间(纳秒) + 大小"""
+    st = os.stat(file_path)
+    return [st.st_mtime_ns, st.st_size]
+
+def load_parse_cache(cache_file):
+    """读取解析缓存，格式为 {文件路径: {"sig": 签名, "data": 解析结果}}"""
+    if not cache_file or not os.path.exists(cache_file):
+        return {}
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_parse_cache(cache_file, cache):
+    """写入解析缓存"""
+    os.makedirs(os.path.dirname(cache_file) or '.', exist_ok=True)
+    tmp_path = cache_file + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(cache, ensure_ascii=False, separators=(',', ':')))
+    os.replace(tmp_path, cache_file)
+
+def parse_pages_cached(file_paths, parse_func, cache_file=None, workers=None):
+    """多进程解析页面，签名未变化的页面直接复用缓存
+
+    parse_func 必须是模块级函数（可被子进程序列化），接收文件路径返回可JSON序列化的结果。
+    返回 ({文件路径: 解析结果}, 本次实际解析的页面路径列表)。
+    """
+    cache = load_parse_cache(cache_file)
+    results = {}
+    new_cache = {}
+    to_parse = []
+    for file_path in file_paths:
+        sig = file_signature(file_path)
+        cached = cache.get(file_path)
+        if cached and cached.get('sig') == sig:
+            results[file_path] = cached['data']
+            new_cache[file_path] = cached
+        else:
+            to_parse.append((file_path, sig))
+
+    if to_parse:
+        paths = [file_path for file_path, _ in to_parse]
+        if len(paths) == 1 or workers == 1:
+            parsed = [parse_func(file_path) for file_path in paths]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parsed = list(executor.map(parse_func, paths, chunksize=32))
+        for (file_path, sig), data in zip(to_parse, parsed):
+            results[file_path] = data
+            new_cache[file_path] = {'sig': sig, 'data': data}
+
+    # 已删除页面的缓存条目随之丢弃
+    if cache_file and (to_parse or len(new_cache) != len(cache)):
+        save_parse_cache(cache_file, new_cache)
+
+    return results, [file_path for file_path, _ in to_parse]
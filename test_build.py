@@ -0,0 +1,571 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import json
+import shutil
+import tempfile
+
+SAMPLE_PAGE = 'resources/access_data(准入数据表)_896794737769603127.html'
+
+def test_parse_filename():
+    """测试文件名解析"""
+    from table_parser import parse_filename
+    
+    print("🔍 检查文件名解析...")
+    
+    assert parse_filename('access_data(准入数据表)_896794737769603127.html') == \
+        ('access_data', '准入数据表', '896794737769603127')
+    assert parse_filename('account()_100655700000000319.html') == ('account', '', '100655700000000319')
+    assert parse_filename('ID_(id存储表)_100655700000007590.html') == ('ID_', 'id存储表', '100655700000007590')
+    print("✅ 表名、中文名和文件ID解析正确")
+
+def test_parse_basic_info():
+    """测试基本信息解析"""
+    from table_parser import parse_table_entry
+    
+    print("\n🔍 检查基本信息解析...")
+    
+    if not os.path.exists(SAMPLE_PAGE):
+        print(f"⚠️  {SAMPLE_PAGE}: 文件不存在")
+        return
+    
+    entry = parse_table_entry(SAMPLE_PAGE)
+    assert entry['table_name'] == 'access_data'
+    assert entry['chinese_name'] == '准入数据表'
+    assert entry['module'] == 'OpenAPI开放平台'
+    assert entry['microservice'] == 'weaver-access'
+    assert entry['database'] == 'open_api'
+    assert entry['file_id'] == '896794737769603127'
+    print(f"✅ {entry['table_name']} - {entry['chinese_name']} ({entry['module']})")
+
+def test_build_table_list_cache():
+    """测试表索引生成和增量缓存"""
+    from build_table_list import build_table_list
+    
+    print("\n🔍 检查表索引增量生成...")
+    
+    if not os.path.exists(SAMPLE_PAGE):
+        print(f"⚠️  {SAMPLE_PAGE}: 文件不存在")
+        return
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        resources_dir = os.path.join(tmp_dir, 'resources')
+        os.makedirs(resources_dir)
+        shutil.copy(SAMPLE_PAGE, resources_dir)
+        shutil.copy(SAMPLE_PAGE, os.path.join(resources_dir, 'copy_table(副本)_1.html'))
+        cache_file = os.path.join(tmp_dir, 'cache.json')
+        
+        tables, parsed = build_table_list(resources_dir, workers=1, cache_file=cache_file)
+        assert parsed == 2 and len(tables) == 2
+        assert tables[0]['filepath'] == 'resources/' + os.path.basename(SAMPLE_PAGE)
+        
+        tables, parsed = build_table_list(resources_dir, workers=1, cache_file=cache_file)
+        assert parsed == 0 and len(tables) == 2
+        
+        os.remove(os.path.join(resources_dir, 'copy_table(副本)_1.html'))
+        tables, parsed = build_table_list(resources_dir, workers=1, cache_file=cache_file)
+        assert parsed == 0 and len(tables) == 1
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            assert len(json.load(f)) == 1
+    
+    print("✅ 未变化的页面命中缓存，删除的页面从索引中移除")
+
+def test_parse_columns():
+    """测试字段详细信息解析"""
+    from table_parser import parse_table_schema
+    
+    print("\n🔍 检查字段详细信息解析...")
+    
+    if not os.path.exists(SAMPLE_PAGE):
+        print(f"⚠️  {SAMPLE_PAGE}: 文件不存在")
+        return
+    
+    table = parse_table_schema(SAMPLE_PAGE)
+    columns = table['columns']
+    assert [c['name'] for c in columns[:4]] == ['id', 'create_time', 'update_time', 'creator']
+    assert [c['seq'] for c in columns] == list(range(1, len(columns) + 1))
+    assert columns[0]['primary_key'] == 1 and columns[0]['data_type'] == '长整型'
+    assert sum(c['primary_key'] for c in columns) == 1
+    tenant_key = [c for c in columns if c['name'] == 'tenant_key'][0]
+    assert tenant_key['data_type'] == '字符' and tenant_key['length'] == '10'
+    print(f"✅ {table['table_name']}: {len(columns)} 个字段")
+
+def test_column_store():
+    """测试单表记录和列式存储的往返转换"""
+    from table_parser import parse_table_schema
+    from extract_schema import table_to_record, record_to_table, build_column_store, iter_column_store
+    
+    print("\n🔍 检查列式存储...")
+    
+    if not os.path.exists(SAMPLE_PAGE):
+        print(f"⚠️  {SAMPLE_PAGE}: 文件不存在")
+        return
+    
+    table = parse_table_schema(SAMPLE_PAGE)
+    empty = dict(table, file_id='1', columns=[])
+    assert record_to_table(json.loads(json.dumps(table_to_record(table)))) == table
+    
+    store = json.loads(json.dumps(build_column_store([table, empty, table])))
+    assert store['column_count'] == 2 * len(table['columns'])
+    assert list(iter_column_store(store)) == [table, empty, table]
+    print("✅ 单表记录和列式存储可以还原为原始结构")
+
+def test_search_index():
+    """测试搜索倒排索引"""
+    from build_search_index import text_keys, build_search_index, shard_of
+    
+    print("\n🔍 检查搜索索引...")
+    
+    keys = text_keys('kq_item')
+    assert {'k', 'kq', 'i', 'it', 'ite', 'item'} <= keys and 'q' not in keys
+    assert {'考', '勤', '考勤', '勤项', '项目'} <= text_keys('考勤项目')
+    
+    tables = [
+        {'table_name': 'kq_item', 'chinese_name': '考勤项目', 'file_id': '3', 'module': '考勤'},
+        {'table_name': 'hrm_item', 'chinese_name': '人事项目', 'file_id': '1', 'module': '人事'},
+        {'table_name': 'agenda', 'chinese_name': '日程', 'file_id': '2', 'module': ''},
+    ]
+    shards, orders = build_search_index(tables)
+    postings = {}
+    for shard, shard_postings in shards.items():
+        for key, doc_ids in shard_postings.items():
+            assert shard_of(key) == shard
+            postings[key] = doc_ids
+    
+    # 倒排表按表名顺序存放
+    assert postings['item'] == [1, 0]
+    assert postings['项目'] == [1, 0]
+    assert postings['考勤'] == [0]
+    assert orders['name'] == [2, 1, 0]
+    assert orders['id'] == [1, 2, 0]
+    assert orders['module'] == [2, 1, 0]
+    
+    # 拼音串：从每个音节开始的全拼和首字母，排序后按前缀查找
+    from build_search_index import pinyin_keys, prefix_range, text_pinyin_keys, build_pinyin_index, HAS_PINYIN
+    keys = sorted(pinyin_keys(['kao', 'qin', 'xiang', 'mu']))
+    assert {'kaoqinxiangmu', 'xiangmu', 'kqxm', 'xm', 'm'} <= set(keys) and 'kaoqin' not in keys
+    start, end = prefix_range(keys, 'kaoqin')
+    assert keys[start:end] == ['kaoqinxiangmu']
+    start, end = prefix_range(keys, 'x')
+    assert keys[start:end] == ['xiangmu', 'xm']
+    assert prefix_range(keys, 'z')[0] == prefix_range(keys, 'z')[1]
+    pinyin_shards = build_pinyin_index(tables, orders['name'])
+    if HAS_PINYIN:
+        assert {'kaoqinxiangmu', 'kqxm', 'xm'} <= text_pinyin_keys('考勤项目')
+        shard = pinyin_shards['x']
+        assert shard['keys'] == sorted(shard['keys'])
+        # 考勤项目、人事项目都以 xiangmu 结尾，文档号按表名顺序
+        assert shard['docs'][shard['keys'].index('xiangmu')] == [1, 0]
+        assert pinyin_shards['k']['docs'][pinyin_shards['k']['keys'].index('kqxm')] == [0]
+    else:
+        assert pinyin_shards == {} and text_pinyin_keys('考勤项目') == frozenset()
+        print("   ⚠️  未安装 pypinyin，跳过拼音转换检查")
+    print(f"✅ {len(postings)} 个索引词，{len(shards)} 个分片")
+
+def test_catalog():
+    """测试按模块分片的表目录"""
+    from build_catalog import build_catalog, group_modules, write_catalog, load_catalog
+    
+    print("\n🔍 检查分片表目录...")
+    
+    def table(name, module, file_id, **extra):
+        entry = {'table_name': name, 'chinese_name': f'{name}表', 'filename': f'{name}({name}表)_{file_id}.html',
+                 'module': module, 'database': 'db', 'microservice': 'svc', 'file_id': file_id}
+        entry.update(extra)
+        entry.setdefault('filepath', 'resources/' + entry['filename'])
+        return entry
+    
+    tables = [table('a', '考勤', '1'), table('b', '人事', '2'), table('c', '考勤', '3'),
+              table('d', '', '4', filename='d(d／表)_4.html'), table('e', '日程', '5', filepath='other/e.html')]
+    
+    assert group_modules({'a': 5, 'b': 1, 'c': 1, 'd': 1}, min_tables=2) == [['a'], ['b', 'c'], ['d']]
+    
+    manifest, shards = build_catalog(tables, min_tables=2)
+    assert manifest['facets']['module'] == [['', 1], ['人事', 1], ['日程', 1], ['考勤', 2]]
+    assert manifest['shards'][0] == {'file': 'shard-0.json', 'modules': ['考勤'], 'count': 2}
+    assert shards[0]['docs'] == [0, 2] and shards[0]['table_name'] == ['a', 'c']
+    # 模块、数据库、微服务存为字典下标，能推导的 filename、filepath 不单独存放
+    assert shards[0]['database'] == [0, 0] and 'filenames' not in shards[0] and 'paths' not in shards[0]
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        write_catalog(tables, tmp_dir, min_tables=2)
+        assert load_catalog(tmp_dir) == tables
+    print(f"✅ {len(tables)} 张表分为 {len(shards)} 个分片，可以还原为 table_list.json")
+
+def test_render_pages():
+    """测试精简页面渲染：可解析还原、增量渲染"""
+    from table_parser import parse_table_schema
+    from render_pages import render_pages
+    
+    print("\n🔍 检查精简页面渲染...")
+    
+    if not os.path.exists(SAMPLE_PAGE):
+        print(f"⚠️  {SAMPLE_PAGE}: 文件不存在")
+        return
+    
+    table = parse_table_schema(SAMPLE_PAGE)
+    other = dict(table, filename='a<b>(测试&)_1.html', table_name='a<b>', chinese_name='测试&',
+                 file_id='1', description='第一行\n第二行')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output = os.path.join(tmp_dir, 'pages')
+        cache_file = os.path.join(tmp_dir, 'render_cache.json')
+        stats = render_pages([table, other], output, workers=1, cache_file=cache_file)
+        assert stats['rendered'] == 2 and stats['styles_updated'] == 2
+        
+        # 精简页面再次解析得到相同的数据
+        for item in (table, other):
+            assert parse_table_schema(os.path.join(output, item['filename'])) == item
+        compact_size = os.path.getsize(os.path.join(output, table['filename']))
+        assert compact_size * 5 < os.path.getsize(SAMPLE_PAGE)
+        
+        # 未变化的表不重新渲染，变化的表和缺失的页面重新渲染，删除的表清理页面
+        assert render_pages([table, other], output, workers=1, cache_file=cache_file)['rendered'] == 0
+        changed = dict(other, description='已修改')
+        os.remove(os.path.join(output, table['filename']))
+        stats = render_pages([table, changed], output, workers=1, cache_file=cache_file)
+        assert stats['rendered'] == 2 and stats['styles_updated'] == 0
+        stats = render_pages([changed], output, workers=1, cache_file=cache_file)
+        assert stats['rendered'] == 0 and stats['removed'] == 1
+        assert set(os.listdir(output)) == {'css', other['filename']}
+    print(f"✅ {table['table_name']}: {os.path.getsize(SAMPLE_PAGE)} -> {compact_size} 字节")
+
+def test_schema_diff():
+    """测试表结构快照对比"""
+    from schema_diff import build_snapshot, diff_snapshots, snapshot_cache_file, SCHEMA_CACHE_FILE
+    
+    print("\n🔍 检查表结构快照对比...")
+    
+    def make_table(file_id, table_name, columns, **fields):
+        table = {'table_name': table_name, 'chinese_name': '', 'filename': f'{table_name}()_{file_id}.html',
+                 'module': '', 'database': 'db', 'microservice': '', 'file_id': file_id, 'description': ''}
+        table.update(fields)
+        table['columns'] = [
+            {'seq': i + 1, 'name': name, 'chinese_name': '', 'data_type': data_type, 'length': '',
+             'nullable': 0, 'foreign_key': 0, 'auto_increment': 0, 'default': '', 'primary_key': int(name == 'id'),
+             'fk_info': '', 'description': ''}
+            for i, (name, data_type) in enumerate(columns)
+        ]
+        return table
+    
+    old = [
+        make_table('1', 'hrm_user', [('id', '长整型'), ('name', '字符')]),
+        make_table('2', 'agenda', [('id', '长整型')]),
+        make_table('3', 'kq_item', [('id', '长整型'), ('code', '字符')], chinese_name='考勤项目'),
+        make_table('4', 'dropped', [('id', '长整型')]),
+    ]
+    new = [
+        make_table('1', 'hrm_user', [('id', '长整型'), ('name', '长文本'), ('dept_id', '长整型')]),
+        make_table('2', 'agenda', [('id', '长整型')]),
+        # 文件ID变化时按 (数据库, 表名) 匹配
+        make_table('30', 'kq_item', [('code', '字符'), ('id', '长整型')], chinese_name='考勤项'),
+        make_table('5', 'added', [('id', '长整型')]),
+    ]
+    changelog = diff_snapshots(build_snapshot(old, 'old'), build_snapshot(new, 'new'))
+    summary = changelog['summary']
+    assert (summary['tables_added'], summary['tables_dropped'], summary['tables_changed'],
+            summary['tables_unchanged']) == (1, 1, 2, 1)
+    entries = {entry['table']: entry for entry in changelog['tables']}
+    assert entries['db.added']['change'] == 'added' and entries['db.dropped']['change'] == 'dropped'
+    user = entries['db.hrm_user']
+    assert user['columns_added'] == ['dept_id']
+    assert user['columns_changed'] == [{'name': 'name', 'fields': {'data_type': ['字符', '长文本']}}]
+    kq = entries['db.kq_item']
+    assert kq['fields'] == {'chinese_name': ['考勤项目', '考勤项']} and kq['columns_reordered']
+    assert kq['old_filename'] == 'kq_item()_3.html'
+    
+    pages = changelog['pages']
+    assert pages['regenerate'] == ['added()_5.html', 'hrm_user()_1.html', 'kq_item()_30.html']
+    assert pages['remove'] == ['resources/dropped()_4.html', 'resources/kq_item()_3.html']
+    assert pages['reindex'] and 'table_list.json' in pages['redeploy']
+    assert 'data/search/' in pages['redeploy'] and 'data/catalog/' in pages['redeploy']
+    
+    # 只有字段变化时不需要重建索引
+    changelog = diff_snapshots(build_snapshot(old[:1]), build_snapshot(new[:1]))
+    assert not changelog['pages']['reindex']
+    assert changelog['pages']['redeploy'] == ['resources/hrm_user()_1.html']
+    
+    # 两个页面目录各用一个解析缓存，resources/ 与 extract_schema.py 共用
+    assert snapshot_cache_file('resources') == snapshot_cache_file('./resources/') == SCHEMA_CACHE_FILE
+    assert snapshot_cache_file('resources_old') not in (SCHEMA_CACHE_FILE, snapshot_cache_file('resources'))
+    print(f"✅ 新增、删除、变化的表和字段识别正确")
+
+def test_schema_db():
+    """测试 SQLite 导出和查询"""
+    from schema_db import export_database, connect, search, fts_text
+    
+    print("\n🔍 检查 SQLite 导出...")
+    
+    assert fts_text('审批流程 tenant_key') == 'tenant key 审 批 流 程 审批 批流 流程'
+    
+    def column(name, data_type, description='', chinese_name=''):
+        return {'seq': 1, 'name': name, 'chinese_name': chinese_name, 'data_type': data_type, 'length': '10',
+                'nullable': 0, 'foreign_key': 0, 'auto_increment': 0, 'default': '', 'primary_key': 0,
+                'fk_info': '', 'description': description}
+    
+    def table(table_name, database, chinese_name, columns):
+        return {'table_name': table_name, 'chinese_name': chinese_name, 'filename': f'{table_name}.html',
+                'module': '', 'database': database, 'microservice': '', 'file_id': '', 'description': '',
+                'columns': columns}
+    
+    tables = [
+        table('wf_request', 'flow', '流程请求', [column('id', '长整型'), column('tenant_key', '字符'),
+                                                 column('status', '整型', '审批流程状态', '审批状态')]),
+        table('kq_item', 'attend', '考勤项目', [column('id', '长整型'), column('tenant_key', '字符')]),
+        table('hrm_user', 'hrm', '人员', [column('id', '长整型'), column('tenant_key', '固定长度')]),
+    ]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_file = os.path.join(tmp_dir, 'schema.db')
+        assert export_database(tables, db_file, batch_size=2) == (3, 7)
+        conn = connect(db_file)
+        try:
+            result = search(conn, 'columns', filters={'name': 'tenant_key', 'type': 'varchar'})
+            assert result['total'] == 2
+            assert [item['table_name'] for item in result['items']] == ['kq_item', 'wf_request']
+            result = search(conn, 'columns', filters={'name': 'tenant_key', 'type': 'varchar', 'database': 'flow'})
+            assert [item['table_name'] for item in result['items']] == ['wf_request']
+            
+            # 中文按二元组检索，再按子串校验
+            assert [t['table_name'] for t in search(conn, 'tables', '流程')['items']] == ['wf_request']
+            assert search(conn, 'tables', '程请')['total'] == 1
+            assert search(conn, 'tables', '请流')['total'] == 0
+            assert search(conn, 'tables', 'KQ')['items'][0]['table_name'] == 'kq_item'
+            result = search(conn, 'columns', '流程', field='description')
+            assert [item['name'] for item in result['items']] == ['status']
+            assert search(conn, 'columns', '流程', field='name')['total'] == 0
+            
+            from build_search_index import HAS_PINYIN
+            if HAS_PINYIN:
+                # 表和字段的中文名按拼音前缀检索
+                assert [t['table_name'] for t in search(conn, 'tables', 'kqxm')['items']] == ['kq_item']
+                assert search(conn, 'tables', 'kaoqin')['total'] == 1
+                assert [c['name'] for c in search(conn, 'columns', 'spzt')['items']] == ['status']
+                assert [c['name'] for c in search(conn, 'columns', 'shenpi', field='chinese_name')['items']] == ['status']
+                # 拼音只属于中文名字段，说明不做拼音索引
+                assert search(conn, 'columns', 'spzt', field='name')['total'] == 0
+                assert search(conn, 'columns', 'splc', field='description')['total'] == 0
+                assert search(conn, 'tables', 'kqxm', field='name')['total'] == 0
+            
+            result = search(conn, 'tables', limit=1, offset=1)
+            assert result['total'] == 3 and result['items'][0]['table_name'] == 'kq_item'
+            try:
+                search(conn, 'tables', filters={'type': '字符'})
+                assert False, '表搜索不支持 type 筛选'
+            except ValueError:
+                pass
+        finally:
+            conn.close()
+    print("✅ 字段筛选、中文全文检索、分页正确")
+
+def test_fk_graph():
+    """测试外键关系图：引用推断、反向查询、最短路径"""
+    from fk_graph import build_graph, ForeignKeyGraph
+    
+    print("\n🔍 检查外键关系图...")
+    
+    def table(table_name, database, columns, foreign_keys=()):
+        return {'table_name': table_name, 'database': database, 'filename': f'{table_name}.html',
+                'columns': [{'name': name, 'foreign_key': int(name in foreign_keys), 'fk_info': ''}
+                            for name in ['id'] + columns]}
+    
+    tables = [
+        table('employee', 'eteams', ['department_id']),
+        table('department', 'eteams', ['parent_id', 'creator']),
+        table('hrm_bt_department', 'eteams', []),
+        table('wf_request', 'flow', ['creator', 'workflowid', 'target_id'], foreign_keys=['workflowid']),
+        table('wf_workflow', 'flow', ['app_id']),
+        table('kq_item', 'attend', ['creator', 'item_group_id']),
+        table('kq_item_group', 'attend', []),
+        table('target', 'other', []),
+        table('island', 'other', ['name']),
+    ]
+    graph = ForeignKeyGraph(build_graph(tables))
+    
+    edges = {(e['from'], e['from_column']): e['to'] for e in graph.neighbors('*')['references']}
+    # 表名完全相同的优先于前缀相同的表，单个词不按后缀匹配其他前缀的表
+    assert edges[('eteams.employee', 'department_id')] == 'eteams.department'
+    assert edges[('eteams.department', 'parent_id')] == 'eteams.department'
+    assert edges[('flow.wf_request', 'workflowid')] == 'flow.wf_workflow'
+    assert edges[('attend.kq_item', 'item_group_id')] == 'attend.kq_item_group'
+    assert edges[('attend.kq_item', 'creator')] == 'eteams.employee'
+    assert ('flow.wf_workflow', 'app_id') not in edges
+    assert edges[('flow.wf_request', 'target_id')] == 'other.target'
+    
+    refs = graph.references('eteams.employee')
+    assert refs['total'] == 3
+    assert {e['from'] for e in refs['items']} == {'eteams.department', 'flow.wf_request', 'attend.kq_item'}
+    assert graph.references('hrm_*')['total'] == 0
+    assert graph.references('*depart*', limit=1)['total'] == 2
+    
+    path = graph.join_path('wf_workflow', 'kq_item_group')
+    assert path['length'] == 4 and path['from'] == 'flow.wf_workflow' and path['to'] == 'attend.kq_item_group'
+    assert [step['from_column'] for step in path['steps']] == ['workflowid', 'creator', 'creator', 'item_group_id']
+    assert graph.join_path('wf_workflow', 'kq_item_group', max_depth=3) is None
+    assert graph.join_path('island', 'employee') is None
+    assert graph.join_path('kq_item', 'kq_item')['length'] == 0
+    
+    declared = ForeignKeyGraph(build_graph(tables), declared_only=True)
+    assert declared.edge_count == 1 and declared.references('wf_workflow')['items'][0]['kind'] == 'declared'
+    print(f"✅ {graph.edge_count} 条引用关系，路径查询正确")
+
+def test_benchmark_helpers():
+    """测试基准测试：合成语料生成、结果对比"""
+    from table_parser import list_table_pages, parse_filename
+    from benchmark import make_synthetic_corpus, compare_results
+    
+    print("\n🔍 检查基准测试...")
+    
+    if not os.path.exists(SAMPLE_PAGE):
+        print(f"⚠️  {SAMPLE_PAGE}: 文件不存在")
+        return
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        resources = os.path.join(tmp_dir, 'resources')
+        os.makedirs(resources)
+        shutil.copy(SAMPLE_PAGE, resources)
+        corpus = make_synthetic_corpus(resources, 3, tmp_dir)
+        pages = list_table_pages(corpus)
+        # 文件名各不相同且可解析出文件ID，再次生成时复用
+        file_ids = {parse_filename(os.path.basename(page))[2] for page in pages}
+        assert len(pages) == 3 and len(file_ids) == 3 and '' not in file_ids
+        assert make_synthetic_corpus(resources, 3, tmp_dir) == corpus
+        assert len(list_table_pages(make_synthetic_corpus(resources, 2, tmp_dir))) == 2
+    
+    old = {'results': {'real': {'extract': {'pages_per_sec': 100}, 'search': {'p99_ms': 1.0}}}}
+    new = {'results': {'real': {'extract': {'pages_per_sec': 80}, 'search': {'p99_ms': 1.05}}}}
+    assert compare_results(old, new) == 1
+    print("✅ 合成语料和结果对比正确")
+
+def test_build_assets():
+    """测试哈希文件：引用改写、增量生成、清理旧文件"""
+    from build_assets import build_assets, is_hashed_key
+    from build_catalog import write_catalog, decode_shard
+    
+    print("\n🔍 检查哈希文件生成...")
+    
+    def write(path, content):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+    
+    def read(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = lambda *parts: os.path.join(tmp_dir, *parts)
+        write(path('resources', 'a(表a)_1.html'), '<link href="./css/s.css" rel="stylesheet"><script src=\'./js/x.js\'></script>a')
+        write(path('resources', 'css', 's.css'), 'td{}')
+        write(path('resources', 'js', 'x.js'), '1;')
+        table = {'table_name': 'a', 'chinese_name': '表a', 'filename': 'a(表a)_1.html', 'module': '',
+                 'database': '', 'microservice': '', 'file_id': '1', 'filepath': 'resources/a(表a)_1.html'}
+        write(path('table_list.json'), json.dumps([table]))
+        write_catalog([table], path('catalog'))
+        write(path('search', 'manifest.json'), '{"doc_count": 1}')
+        write(path('search', 'shard-a.json'), '{}')
+        write(path('index.html'), "fetch('table_list.json'); fetch(\"data/search/manifest.json\"); fetch('api/tables'); "
+                                  "fetch('data/catalog/manifest.json')")
+        
+        def build():
+            return build_assets(path('resources'), path('assets'), path('manifest.json'), path('table_list.json'),
+                                path('search'), path('index.html'), cache_file=path('cache.json'),
+                                catalog_dir=path('catalog'))
+        
+        stats = build()
+        with open(path('manifest.json'), encoding='utf-8') as f:
+            files = json.load(f)['files']
+        assert stats == {'files': 8, 'written': 1, 'removed': 0}
+        assert all(is_hashed_key(key) for key in files.values())
+        page = read(path('assets', *files['resources/a(表a)_1.html'].split('/')))
+        css, js = files['resources/css/s.css'][len('resources/'):], files['resources/js/x.js'][len('resources/'):]
+        assert page == f'<link href="./{css}" rel="stylesheet"><script src=\'./{js}\'></script>a'
+        tables = json.loads(read(path('assets', files['table_list.json'])))
+        assert tables[0]['filepath'] == files['resources/a(表a)_1.html']
+        search_manifest = json.loads(read(path('assets', *files['data/search/manifest.json'].split('/'))))
+        assert search_manifest['files'] == {'shard-a.json': os.path.basename(files['data/search/shard-a.json'])}
+        index = read(path('assets', 'index.html'))
+        assert f"fetch('{files['table_list.json']}')" in index and f'fetch("{files["data/search/manifest.json"]}")' in index
+        assert "fetch('api/tables')" in index
+        # 表目录分片记录页面哈希，解码后 filepath 指向哈希页面
+        catalog_manifest = json.loads(read(path('assets', *files['data/catalog/manifest.json'].split('/'))))
+        assert f"fetch('{files['data/catalog/manifest.json']}')" in index
+        shard = json.loads(read(path('assets', *files['data/catalog/shard-0.json'].split('/'))))
+        assert catalog_manifest['files'] == {'shard-0.json': os.path.basename(files['data/catalog/shard-0.json'])}
+        assert decode_shard(shard, catalog_manifest['dicts'])[0][1]['filepath'] == files['resources/a(表a)_1.html']
+        
+        # 未变化的页面不重新生成；样式变化时页面引用随之变化，旧文件被清理
+        assert build()['written'] == 0
+        write(path('resources', 'css', 's.css'), 'td{color:red}')
+        stats = build()
+        assert stats['written'] == 1 and stats['removed'] == 5
+    print("✅ 哈希文件引用改写正确")
+
+def test_page_pack():
+    """测试页面归档：偏移表、压缩、还原"""
+    from page_pack import build_pack, PagePack, extract_pack, verify_pack, is_packed_key
+    
+    print("\n🔍 检查页面归档...")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        resources = os.path.join(tmp_dir, 'resources')
+        os.makedirs(resources)
+        pages = {'a(表a)_1.html': '<td>字段</td>' * 200, 'b(表b)_2.html': '<p>b</p>'}
+        for name, content in pages.items():
+            with open(os.path.join(resources, name), 'w', encoding='utf-8') as f:
+                f.write(content)
+        
+        output = os.path.join(tmp_dir, 'pack')
+        index = build_pack(resources, output, cache_dir=os.path.join(tmp_dir, 'cache'))
+        assert index['names'] == ['resources/a(表a)_1.html', 'resources/b(表b)_2.html']
+        # 较大的页面gzip压缩存放，太小的页面原样存放
+        assert index['encodings'] == ['gzip', ''] and index['lengths'][0] < index['sizes'][0]
+        assert 'md5s' not in index
+        assert all(is_packed_key(name) for name in index['names']) and not is_packed_key('resources/css/a.html')
+        
+        pack = PagePack.open(output)
+        try:
+            assert pack.read('resources/a(表a)_1.html') == pages['a(表a)_1.html'].encode('utf-8')
+            assert bytes(pack.raw(pack.get('resources/b(表b)_2.html'))) == b'<p>b</p>'
+            assert pack.read('resources/c.html') is None
+            assert verify_pack(pack) == []
+            
+            # 还原后与原页面一致
+            restored = os.path.join(tmp_dir, 'restored')
+            assert extract_pack(pack, restored) == 2
+            for name, content in pages.items():
+                with open(os.path.join(restored, 'resources', name), encoding='utf-8') as f:
+                    assert f.read() == content
+        finally:
+            pack.close()
+        
+        # 内容不变时归档文件名不变，内容变化时旧归档被删除
+        assert build_pack(resources, output, cache_dir=os.path.join(tmp_dir, 'cache'))['pack'] == index['pack']
+        with open(os.path.join(resources, 'b(表b)_2.html'), 'w', encoding='utf-8') as f:
+            f.write('<p>b2</p>')
+        new_index = build_pack(resources, output, cache_dir=os.path.join(tmp_dir, 'cache'))
+        assert new_index['pack'] != index['pack']
+        assert sorted(os.listdir(output)) == ['index.json', new_index['pack']]
+    print(f"✅ {len(pages)} 个页面写入归档并还原")
+
+def main():
+    """主函数"""
+    print("🚀 数据生成测试")
+    print("=" * 50)
+    
+    test_parse_filename()
+    test_parse_basic_info()
+    test_build_table_list_cache()
+    test_parse_columns()
+    test_column_store()
+    test_search_index()
+    test_catalog()
+    test_render_pages()
+    test_schema_diff()
+    test_schema_db()
+    test_fk_graph()
+    test_benchmark_helpers()
+    test_build_assets()
+    test_page_pack()
+
+if __name__ == "__main__":
+    main()
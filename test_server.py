@@ -0,0 +1,587 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import gzip
+import json
+import shutil
+import time
+import socket
+import tempfile
+import threading
+import http.client
+from urllib.parse import quote
+
+from server import create_server, ResponseCache, choose_encoding
+from catalog import TableCatalog
+
+SAMPLE_PAGE = 'resources/access_data(准入数据表)_896794737769603127.html'
+
+def start_test_server(workers=4, **kwargs):
+    """在后台线程启动服务器（随机端口），返回 (服务器, 端口, 线程)"""
+    httpd = create_server(0, '127.0.0.1', workers=workers, quiet=True, **kwargs)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    return httpd, httpd.server_address[1], thread
+
+def stop_test_server(httpd, thread):
+    httpd.shutdown()
+    thread.join()
+    return httpd.graceful_shutdown(timeout=5)
+
+def test_keep_alive():
+    """测试HTTP/1.1持久连接和UTF-8类型"""
+    print("🔍 检查持久连接...")
+    httpd, port, thread = start_test_server()
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        conn.request('GET', '/' + quote(SAMPLE_PAGE))
+        response = conn.getresponse()
+        body = response.read()
+        sock = conn.sock
+        assert response.status == 200 and response.version == 11
+        assert b'access_data' in body
+        assert 'charset=utf-8' in response.getheader('Content-Type')
+        assert not response.will_close
+
+        # 同一连接继续请求
+        conn.request('GET', '/README.md')
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 200 and conn.sock is sock
+
+        conn.request('GET', '/not_exists.html')
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 404
+        conn.close()
+        print("✅ 同一连接完成3个请求")
+    finally:
+        stop_test_server(httpd, thread)
+
+def test_concurrent_and_shutdown():
+    """测试空闲连接不阻塞其他客户端，关闭时断开空闲连接"""
+    print("\n🔍 检查并发与优雅关闭...")
+    httpd, port, thread = start_test_server(workers=2)
+
+    # 一个只连接不发请求的客户端
+    idle = socket.create_connection(('127.0.0.1', port))
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        conn.request('GET', '/README.md')
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 200
+        print("✅ 空闲连接不影响其他请求")
+
+        assert stop_test_server(httpd, thread) == 0
+        # 服务器关闭后，空闲连接读到EOF
+        idle.settimeout(5)
+        assert idle.recv(1) == b''
+        conn.close()
+        print("✅ 关闭时空闲连接已断开")
+    finally:
+        idle.close()
+
+def test_response_cache():
+    """测试LRU缓存和编码协商"""
+    print("\n🔍 检查响应缓存...")
+    cache = ResponseCache(max_bytes=10, max_entry_bytes=6)
+    cache.put('a', b'aaaa')
+    cache.put('b', b'bbbb')
+    assert cache.get('a') == b'aaaa'
+    # 超出容量时淘汰最久未使用的 b
+    cache.put('c', b'cccc')
+    assert cache.get('b') is None and cache.get('a') == b'aaaa'
+    # 超过单条上限的不缓存
+    cache.put('d', b'ddddddd')
+    assert cache.get('d') is None
+    stats = cache.stats()
+    assert stats['bytes'] == 8 and stats['evictions'] == 1
+    assert stats['hits'] == 2 and stats['misses'] == 2
+
+    assert choose_encoding('gzip, deflate, br', ['br', 'gzip']) == 'br'
+    assert choose_encoding('br;q=0, gzip;q=0.5', ['br', 'gzip']) == 'gzip'
+    assert choose_encoding('identity', ['br', 'gzip']) is None
+    assert choose_encoding(None, ['gzip']) is None
+    print("✅ 缓存淘汰与编码协商正确")
+
+def test_compression_and_validators():
+    """测试即时压缩、缓存命中和304"""
+    print("\n🔍 检查压缩与条件请求...")
+    httpd, port, thread = start_test_server()
+    try:
+        url = '/' + quote(SAMPLE_PAGE)
+        with open(SAMPLE_PAGE, 'rb') as f:
+            original = f.read()
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+
+        def get(headers):
+            conn.request('GET', url, headers=headers)
+            response = conn.getresponse()
+            return response, response.read()
+
+        response, body = get({'Accept-Encoding': 'gzip'})
+        assert response.status == 200
+        assert response.getheader('Content-Encoding') == 'gzip'
+        assert response.getheader('Vary') == 'Accept-Encoding'
+        assert gzip.decompress(body) == original
+        etag = response.getheader('ETag')
+        last_modified = response.getheader('Last-Modified')
+
+        response, body = get({'Accept-Encoding': 'gzip'})
+        assert response.getheader('ETag') == etag and gzip.decompress(body) == original
+        cache = httpd.cache.stats()
+        assert cache['hits'] == 1 and cache['misses'] == 1
+
+        response, body = get({'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        assert response.status == 304 and body == b''
+        # 未压缩版本的ETag不同
+        response, body = get({'If-None-Match': etag})
+        assert response.status == 200 and body == original
+        assert response.getheader('Content-Encoding') is None
+        response, body = get({'If-Modified-Since': last_modified})
+        assert response.status == 304
+
+        conn.request('GET', '/api/stats')
+        response = conn.getresponse()
+        assert json.loads(response.read())['counters']['not_modified'] == 2
+        conn.close()
+        print("✅ 压缩、ETag、304 正常")
+    finally:
+        stop_test_server(httpd, thread)
+
+def test_sidecar_and_sendfile():
+    """测试预压缩旁路文件和sendfile发送"""
+    print("\n🔍 检查旁路文件...")
+    from precompress import compress_file, write_sidecars
+
+    temp_dir = tempfile.mkdtemp(dir='.')
+    httpd, port, thread = start_test_server()
+    try:
+        page = os.path.join(temp_dir, 'page.html')
+        shutil.copyfile(SAMPLE_PAGE, page)
+        with open(page, 'rb') as f:
+            original = f.read()
+        url = '/' + quote(os.path.relpath(page).replace(os.sep, '/'))
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+
+        def get(headers):
+            conn.request('GET', url, headers=headers)
+            response = conn.getresponse()
+            return response, response.read()
+
+        # 没有旁路文件：即时压缩
+        response, body = get({'Accept-Encoding': 'gzip'})
+        online_etag = response.getheader('ETag')
+        assert response.getheader('Content-Encoding') == 'gzip'
+        assert httpd.counters['sidecar'] == 0
+
+        variants, _ = compress_file(page, ('gzip',), os.path.join(temp_dir, 'cache'))
+        assert write_sidecars({page: variants}) == 1
+        assert write_sidecars({page: variants}) == 0
+
+        response, body = get({'Accept-Encoding': 'br;q=0.9, gzip'})
+        assert response.getheader('Content-Encoding') == 'gzip'
+        assert response.getheader('Vary') == 'Accept-Encoding'
+        assert response.getheader('ETag') != online_etag
+        assert gzip.decompress(body) == original
+        assert body == open(page + '.gz', 'rb').read()
+        assert httpd.counters['sidecar'] == 1
+
+        response, body = get({'Accept-Encoding': 'gzip', 'If-None-Match': response.getheader('ETag')})
+        assert response.status == 304
+
+        # 不接受压缩时发送原文件
+        sent = httpd.counters['sendfile']
+        response, body = get({})
+        assert body == original and response.getheader('Content-Encoding') is None
+        assert httpd.counters['sendfile'] == sent + 1
+
+        # 源文件比旁路文件新时忽略旁路文件
+        st = os.stat(page + '.gz')
+        os.utime(page, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        response, body = get({'Accept-Encoding': 'gzip'})
+        assert gzip.decompress(body) == original
+        assert httpd.counters['sidecar'] == 1
+        conn.close()
+        print("✅ 旁路文件与sendfile正常")
+    finally:
+        stop_test_server(httpd, thread)
+        shutil.rmtree(temp_dir)
+
+SAMPLE_TABLES = [
+    {'table_name': 'kq_item', 'chinese_name': '考勤项目', 'filename': 'kq_item(考勤项目)_3.html',
+     'module': '考勤', 'database': 'attend', 'microservice': 'weaver-attend', 'file_id': '3'},
+    {'table_name': 'kq_group', 'chinese_name': '考勤组', 'filename': 'kq_group(考勤组)_1.html',
+     'module': '考勤', 'database': 'attend', 'microservice': 'weaver-attend', 'file_id': '1'},
+    {'table_name': 'hrm_item', 'chinese_name': '人事项目', 'filename': 'hrm_item(人事项目)_2.html',
+     'module': '人事', 'database': 'hrm', 'microservice': 'weaver-hrm', 'file_id': '2'},
+    {'table_name': 'ai_log', 'chinese_name': '', 'filename': 'ai_log()_4.html',
+     'module': '', 'database': 'hrm', 'microservice': '', 'file_id': '4'},
+]
+
+def test_catalog_search():
+    """测试表目录的搜索、筛选、排序、分页和分面"""
+    print("\n🔍 检查表目录搜索...")
+    catalog = TableCatalog(SAMPLE_TABLES)
+
+    result = catalog.search()
+    assert result['total'] == 4 and result['catalog_size'] == 4
+    assert [t['table_name'] for t in result['items']] == ['ai_log', 'hrm_item', 'kq_group', 'kq_item']
+    assert result['facets']['module'] == [('人事', 1), ('考勤', 2)]
+
+    result = catalog.search('item', sort='id')
+    assert [t['file_id'] for t in result['items']] == ['2', '3']
+    result = catalog.search('考勤 kq')
+    assert result['total'] == 2
+    assert catalog.search('勤项')['total'] == 1
+    assert catalog.search('nothing')['total'] == 0
+
+    # 分面按"除本字段外的筛选条件"统计
+    result = catalog.search('', {'module': '考勤', 'database': 'attend'}, facets=['module', 'database'])
+    assert result['total'] == 2
+    assert result['facets']['module'] == [('考勤', 2)]
+    assert result['facets']['database'] == [('attend', 2)]
+    result = catalog.search('item', {'database': 'hrm'}, facets=['module', 'database'])
+    assert result['total'] == 1
+    assert result['facets']['module'] == [('人事', 1)]
+    assert result['facets']['database'] == [('attend', 1), ('hrm', 1)]
+
+    result = catalog.search(offset=1, limit=2, facets=['table_name'], facet_max=3)
+    assert [t['table_name'] for t in result['items']] == ['hrm_item', 'kq_group']
+    assert result['facets']['table_name'] is None
+
+    for kwargs in ({'sort': 'size'}, {'filters': {'filepath': 'x'}}, {'facets': ['description']}):
+        try:
+            catalog.search(**kwargs)
+            assert False, kwargs
+        except ValueError:
+            pass
+    print("✅ 搜索、筛选、分面正确")
+
+def test_catalog_update():
+    """测试表目录增量更新：结果与重新构建一致，原目录不变"""
+    print("\n🔍 检查表目录增量更新...")
+    catalog = TableCatalog(SAMPLE_TABLES)
+    renamed = dict(SAMPLE_TABLES[0], table_name='att_item', module='人事')
+    added = {'table_name': 'kq_rule', 'chinese_name': '考勤规则', 'filename': 'kq_rule(考勤规则)_5.html',
+             'module': '考勤', 'database': 'attend', 'microservice': 'weaver-attend', 'file_id': '5'}
+    updated = catalog.updated([renamed, added, dict(SAMPLE_TABLES[1])], [SAMPLE_TABLES[2]['filename']])
+    expected = TableCatalog([renamed, SAMPLE_TABLES[1], SAMPLE_TABLES[3], added])
+    assert len(updated) == 4 and updated.tables[2] is None
+    for query in ('', 'kq', '考勤', 'item', 'att'):
+        for sort in ('name', 'id', 'module'):
+            assert updated.search(query, sort=sort) == expected.search(query, sort=sort), (query, sort)
+    assert catalog.search('item')['total'] == 2 and len(catalog) == 4
+    # 没有变化时返回原目录
+    assert catalog.updated([dict(SAMPLE_TABLES[0])]) is catalog
+
+    # 拼音串：字母查询词同时按拼音前缀查找，结果仍按表名排序（拼音串通常由 pypinyin 生成，这里直接指定）
+    catalog.pinyin_postings = {'kaoqinxiangmu': [0], 'kqxm': [0], 'renshixiangmu': [2], 'rsxm': [2],
+                               'xiangmu': [2, 0], 'xm': [2, 0]}
+    catalog.pinyin_keys = sorted(catalog.pinyin_postings)
+    assert [t['table_name'] for t in catalog.search('kqxm')['items']] == ['kq_item']
+    assert [t['table_name'] for t in catalog.search('xiangmu')['items']] == ['hrm_item', 'kq_item']
+    # 表名前缀和拼音的结果合并：kq_group 来自表名，kq_item 来自表名和拼音
+    assert [t['table_name'] for t in catalog.search('kq')['items']] == ['kq_group', 'kq_item']
+    assert [t['table_name'] for t in catalog.search('xm 考勤')['items']] == ['kq_item']
+    # 含分隔符的查询词仍按子串校验
+    assert catalog.search('kqxm_')['total'] == 0
+    print("✅ 增量更新与重新构建的结果一致")
+
+def test_api_tables():
+    """测试 /api/tables、/api/search 接口"""
+    print("\n🔍 检查搜索接口...")
+    httpd, port, thread = start_test_server(catalog=TableCatalog(SAMPLE_TABLES))
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+
+        def get(path):
+            conn.request('GET', path)
+            response = conn.getresponse()
+            return response, response.read()
+
+        response, body = get('/api/tables?limit=2&sort=id')
+        data = json.loads(body)
+        assert response.status == 200
+        assert data['total'] == 4 and [t['file_id'] for t in data['items']] == ['1', '2']
+        assert set(data['facets']) == {'module', 'database', 'microservice'}
+
+        response, body = get('/api/search?' + 'q=%E8%80%83%E5%8B%A4&facets=table_name&module=%E8%80%83%E5%8B%A4')
+        data = json.loads(body)
+        assert data['total'] == 2 and data['facets'] == {'table_name': [['kq_group', 1], ['kq_item', 1]]}
+
+        response, body = get('/api/tables?sort=size')
+        assert response.status == 400 and 'error' in json.loads(body)
+        response, body = get('/api/tables?limit=abc')
+        assert response.status == 400
+        conn.close()
+    finally:
+        stop_test_server(httpd, thread)
+
+    # 未加载表目录时接口不可用，静态文件不受影响
+    httpd, port, thread = start_test_server()
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        conn.request('GET', '/api/tables')
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 503
+        conn.close()
+    finally:
+        stop_test_server(httpd, thread)
+    print("✅ 搜索接口正常")
+
+def test_compact_pages():
+    """测试 --pages：/resources/ 下的页面优先使用精简页面"""
+    print("\n🔍 检查精简页面目录...")
+    temp_dir = tempfile.mkdtemp(dir='.')
+    with open(os.path.join(temp_dir, os.path.basename(SAMPLE_PAGE)), 'wb') as f:
+        f.write(b'<p>compact</p>')
+    httpd, port, thread = start_test_server(pages_dir=os.path.abspath(temp_dir))
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        conn.request('GET', '/' + quote(SAMPLE_PAGE))
+        response = conn.getresponse()
+        assert response.status == 200 and response.read() == b'<p>compact</p>'
+        # 精简目录中没有的文件仍从 resources/ 读取
+        conn.request('GET', '/resources/css/889749337939845157.css')
+        response = conn.getresponse()
+        assert response.status == 200 and len(response.read()) > 1000
+        conn.close()
+    finally:
+        stop_test_server(httpd, thread)
+        shutil.rmtree(temp_dir)
+    print("✅ 精简页面优先，缺失时回退到原页面")
+
+def test_page_pack():
+    """测试 --pack：/resources/ 下的页面从归档（mmap）发送"""
+    from page_pack import build_pack, PagePack
+    print("\n🔍 检查页面归档...")
+    temp_dir = tempfile.mkdtemp(dir='.')
+    resources = os.path.join(temp_dir, 'resources')
+    os.makedirs(resources)
+    name = os.path.basename(SAMPLE_PAGE)
+    shutil.copyfile(SAMPLE_PAGE, os.path.join(resources, name))
+    with open(os.path.join(resources, 'small(小)_1.html'), 'wb') as f:
+        f.write(b'<p>small</p>')
+    build_pack(resources, os.path.join(temp_dir, 'pack'), cache_dir=os.path.join(temp_dir, 'cache'))
+    pack = PagePack.open(os.path.join(temp_dir, 'pack'))
+    with open(SAMPLE_PAGE, 'rb') as f:
+        original = f.read()
+    httpd, port, thread = start_test_server(pack=pack)
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        # 接受gzip时直接发送归档中的压缩内容
+        conn.request('GET', '/' + quote(SAMPLE_PAGE), headers={'Accept-Encoding': 'gzip'})
+        response = conn.getresponse()
+        body = response.read()
+        assert response.status == 200 and response.getheader('Content-Encoding') == 'gzip'
+        assert gzip.decompress(body) == original
+        etag = response.getheader('ETag')
+        conn.request('GET', '/' + quote(SAMPLE_PAGE), headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 304
+        # 不接受压缩时解压后发送
+        conn.request('GET', '/' + quote(SAMPLE_PAGE), headers={'Accept-Encoding': 'identity'})
+        response = conn.getresponse()
+        assert response.status == 200 and response.getheader('Content-Encoding') is None
+        assert response.read() == original and response.getheader('ETag') != etag
+        conn.request('HEAD', '/' + quote('resources/small(小)_1.html'))
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 200 and response.getheader('Content-Length') == '12'
+        # 归档中没有的文件仍从磁盘读取
+        conn.request('GET', '/resources/css/889749337939845157.css')
+        response = conn.getresponse()
+        assert response.status == 200 and len(response.read()) > 1000
+        conn.close()
+        assert httpd.stats()['counters']['pack'] == 2
+    finally:
+        stop_test_server(httpd, thread)
+        pack.close()
+        shutil.rmtree(temp_dir)
+    print("✅ 归档中的页面按原URL发送，接受gzip时不解压")
+
+def test_watch():
+    """测试 --watch：页面新增、修改、删除后表目录热替换，变化的页面不再从归档发送"""
+    from server import watch_pages
+    from page_pack import build_pack, PagePack
+    print("\n🔍 检查页面变化监视...")
+    temp_dir = tempfile.mkdtemp(dir='.')
+    resources = os.path.join(temp_dir, 'resources')
+    os.makedirs(resources)
+
+    def write_page(name, module=''):
+        with open(os.path.join(resources, name), 'w', encoding='utf-8') as f:
+            f.write(f'<table><tr><td>所属模块</td><td>{module}</td></tr></table>')
+
+    write_page('kq_item(考勤项目)_3.html', '考勤')
+    write_page('hrm_item(人事项目)_2.html', '人事')
+    build_pack(resources, os.path.join(temp_dir, 'pack'), cache_dir=os.path.join(temp_dir, 'cache'))
+    pack = PagePack.open(os.path.join(temp_dir, 'pack'))
+    table_list = os.path.join(temp_dir, 'table_list.json')
+    httpd, port, thread = start_test_server(pack=pack)
+    watcher = None
+
+    def api_tables(query=''):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        conn.request('GET', '/api/tables?q=' + quote(query))
+        result = json.loads(conn.getresponse().read())
+        conn.close()
+        return result
+
+    def wait_for(condition):
+        deadline = time.time() + 5
+        while not condition():
+            assert time.time() < deadline, '等待页面变化超时'
+            time.sleep(0.05)
+
+    try:
+        watcher = watch_pages(httpd, resources, table_list, interval=0.05, cache_file=None)
+        # 启动时以页面目录为准建立表目录
+        assert api_tables()['total'] == 2
+        with open(table_list, 'r', encoding='utf-8') as f:
+            assert len(json.load(f)) == 2
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        conn.request('GET', '/' + quote('resources/hrm_item(人事项目)_2.html'))
+        response = conn.getresponse()
+        assert response.status == 200 and '人事' in response.read().decode('utf-8')
+
+        old_catalog = httpd.catalog
+        write_page('kq_group(考勤组)_1.html', '考勤')
+        os.remove(os.path.join(resources, 'hrm_item(人事项目)_2.html'))
+        write_page('kq_item(考勤项目)_3.html', '考勤管理')
+        wait_for(lambda: httpd.catalog is not old_catalog)
+        result = api_tables('kq')
+        assert result['total'] == 2 and result['catalog_size'] == 2
+        assert {t['module'] for t in result['items']} == {'考勤', '考勤管理'}
+        assert api_tables('人事')['total'] == 0
+        # 原目录未被修改
+        assert len(old_catalog) == 2 and old_catalog.search('人事')['total'] == 1
+        with open(table_list, 'r', encoding='utf-8') as f:
+            assert [t['filepath'] for t in json.load(f)] == ['resources/kq_group(考勤组)_1.html',
+                                                            'resources/kq_item(考勤项目)_3.html']
+
+        # 变化的页面不再从归档发送（删除的页面返回404）
+        conn.request('GET', '/' + quote('resources/hrm_item(人事项目)_2.html'))
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 404
+        assert 'resources/kq_item(考勤项目)_3.html' in httpd.stale_pages
+        assert httpd.stats()['counters']['catalog_reloads'] >= 1
+        conn.close()
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        stop_test_server(httpd, thread)
+        pack.close()
+        shutil.rmtree(temp_dir)
+    print("✅ 页面变化后表目录增量更新并热替换")
+
+def test_api_search_db():
+    """测试 --db：/api/search 由 SQLite 响应"""
+    from schema_db import export_database, SchemaDatabase
+    print("\n🔍 检查数据库搜索接口...")
+    tables = [dict(table, description='', columns=[
+        {'seq': 1, 'name': 'id', 'chinese_name': 'ID', 'data_type': '长整型', 'length': '', 'nullable': 0,
+         'foreign_key': 0, 'auto_increment': 0, 'default': '', 'primary_key': 1, 'fk_info': '', 'description': ''},
+        {'seq': 2, 'name': 'tenant_key', 'chinese_name': '租户', 'data_type': '字符', 'length': '10', 'nullable': 1,
+         'foreign_key': 0, 'auto_increment': 0, 'default': '', 'primary_key': 0, 'fk_info': '', 'description': ''},
+    ]) for table in SAMPLE_TABLES]
+    temp_dir = tempfile.mkdtemp()
+    db_file = os.path.join(temp_dir, 'schema.db')
+    export_database(tables, db_file)
+    httpd, port, thread = start_test_server(catalog=TableCatalog(SAMPLE_TABLES), schema_db=SchemaDatabase(db_file))
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+
+        def get(path):
+            conn.request('GET', path)
+            response = conn.getresponse()
+            return response, json.loads(response.read())
+
+        response, data = get('/api/search?scope=columns&name=tenant_key&type=varchar&database=attend')
+        assert response.status == 200 and data['total'] == 2
+        assert {item['table_name'] for item in data['items']} == {'kq_item', 'kq_group'}
+        response, data = get('/api/search?q=' + quote('考勤') + '&limit=1')
+        assert data['total'] == 2 and len(data['items']) == 1
+        response, data = get('/api/search?scope=views')
+        assert response.status == 400
+        # /api/tables 仍由内存中的表目录响应
+        response, data = get('/api/tables')
+        assert data['catalog_size'] == 4
+        assert httpd.counters['api_db_search'] == 2
+        conn.close()
+    finally:
+        stop_test_server(httpd, thread)
+        shutil.rmtree(temp_dir)
+    print("✅ 数据库搜索接口正确")
+
+def test_api_fk():
+    """测试 /api/fk/ 外键关系接口"""
+    from fk_graph import build_graph, ForeignKeyGraph
+    print("\n🔍 检查外键关系接口...")
+    tables = [
+        {'table_name': 'employee', 'database': 'eteams', 'filename': 'employee.html',
+         'columns': [{'name': 'id'}, {'name': 'department_id'}]},
+        {'table_name': 'department', 'database': 'eteams', 'filename': 'department.html',
+         'columns': [{'name': 'id'}]},
+        {'table_name': 'kq_item', 'database': 'attend', 'filename': 'kq_item.html',
+         'columns': [{'name': 'id'}, {'name': 'creator'}]},
+    ]
+    httpd, port, thread = start_test_server(fk_graph=ForeignKeyGraph(build_graph(tables)))
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+
+        def get(path):
+            conn.request('GET', path)
+            response = conn.getresponse()
+            return response.status, json.loads(response.read())
+
+        status, data = get('/api/fk/refs?table=emp*')
+        assert status == 200 and data['total'] == 1 and data['items'][0]['from'] == 'attend.kq_item'
+        status, data = get('/api/fk/path?from=kq_item&to=department')
+        assert status == 200 and data['length'] == 2
+        status, data = get('/api/fk/table?table=employee')
+        assert len(data['references']) == 1 and len(data['referenced_by']) == 1
+        assert get('/api/fk/path?from=kq_item&to=nothing')[0] == 404
+        assert get('/api/fk/refs')[0] == 400
+        conn.close()
+    finally:
+        stop_test_server(httpd, thread)
+
+    httpd, port, thread = start_test_server()
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+        conn.request('GET', '/api/fk/refs?table=employee')
+        assert conn.getresponse().status == 503
+        conn.close()
+    finally:
+        stop_test_server(httpd, thread)
+    print("✅ 外键关系接口正确")
+
+def main():
+    """主测试函数"""
+    print("🧪 HTTP服务器测试")
+    print("=" * 50)
+    test_keep_alive()
+    test_concurrent_and_shutdown()
+    test_response_cache()
+    test_compression_and_validators()
+    test_sidecar_and_sendfile()
+    test_catalog_search()
+    test_catalog_update()
+    test_api_tables()
+    test_compact_pages()
+    test_page_pack()
+    test_watch()
+    test_api_search_db()
+    test_api_fk()
+    print("\n" + "=" * 50)
+    print("✅ 测试完成！")
+
+if __name__ == "__main__":
+    main()
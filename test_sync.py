@@ -2,7 +2,10 @@
 # -*- coding: utf-8 -*-
 
 import os
+import json
 import fnmatch
+import hashlib
+import tempfile
 from pathlib import Path
 
 def get_local_files():
@@ -172,5 +175,527 @@ def test_sync_functionality():
     print(f"   - ✅ 支持删除OSS上多余的文件")
     print(f"   - ✅ 确保OSS与GitHub版本完全一致")
 
+def test_change_detection():
+    """测试基于MD5/ETag的变化检测"""
+    from deploy import get_file_md5, is_file_changed
+    
+    print("🧪 测试变化检测")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, 'table.html')
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write('<td>数据库表名</td>')
+        
+        md5 = get_file_md5(file_path)
+        with open(file_path, 'rb') as f:
+            assert md5 == hashlib.md5(f.read()).hexdigest().upper()
+        
+        # OSS返回的ETag带引号，且可能是小写
+        assert not is_file_changed(file_path, f'"{md5}"')
+        assert not is_file_changed(file_path, md5.lower())
+        assert is_file_changed(file_path, '0' * 32)
+        assert is_file_changed(file_path, None)
+        # 分片上传的ETag无法比较
+        assert is_file_changed(file_path, f'{md5}-2')
+    
+    print("   ✅ 未变化的文件会被跳过，变化的文件会被上传")
+
+def test_sync_engine():
+    """测试并发上传、批量删除和失败重试"""
+    from sync_engine import LocalBucket, upload_files, delete_files
+    
+    print("🧪 测试同步执行引擎")
+    
+    class FlakyBucket(LocalBucket):
+        """每个key第一次上传都会失败的存储桶"""
+        def __init__(self, root):
+            super().__init__(root)
+            self.attempts = {}
+        
+        def upload_file(self, key, file_path, headers=None):
+            self.attempts[key] = self.attempts.get(key, 0) + 1
+            if self.attempts[key] == 1:
+                raise IOError('模拟网络错误')
+            super().upload_file(key, file_path, headers=headers)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        files = []
+        for i in range(30):
+            file_path = os.path.join(tmp_dir, f'table_{i}.html')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(f'表{i}')
+            files.append((f'resources/table_{i}.html', file_path))
+        
+        bucket = FlakyBucket(os.path.join(tmp_dir, 'bucket'))
+        stats = upload_files(bucket, files, get_content_type_and_headers,
+                             workers=4, backoff=0, verbose=False)
+        assert stats.objects == 30 and not stats.failed
+        assert stats.retries == 30
+        report = stats.to_dict()
+        assert report['latency_ms']['count'] == 30 and sum(report['latency_ms']['histogram'].values()) == 30
+        assert len(report['slowest']) == 10 and all(item['retries'] == 1 for item in report['slowest'])
+        assert report['slowest'][0]['ms'] >= report['slowest'][-1]['ms']
+        assert len(list(bucket.list_objects())) == 30
+        assert bucket.headers['resources/table_0.html']['Content-Type'] == 'text/html; charset=utf-8'
+        print(f"   ✅ 上传30个文件（每个重试1次）: {stats.rate_summary()}")
+        
+        stats = delete_files(bucket, [key for key, _ in files], batch_size=7, verbose=False)
+        assert stats.objects == 30 and not stats.failed
+        assert list(bucket.list_objects()) == []
+        print("   ✅ 按批删除30个文件")
+
+def test_sync_plan():
+    """测试有序归并生成的同步计划"""
+    from sync_plan import walk_sorted, plan_sync
+    
+    print("🧪 测试同步计划")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        names = ['css/a.css', 'css(x).html', 'css.html', 'b.html', 'js/c.js', '中文(表)_1.html']
+        for name in names:
+            file_path = os.path.join(tmp_dir, *name.split('/'))
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write(name)
+        
+        # 遍历顺序必须与OSS列举顺序（key字典序）一致
+        keys = list(walk_sorted(tmp_dir))
+        assert keys == sorted(names)
+        
+        remote = [
+            ('a_deleted.html', 'X', 1),
+            ('b.html', 'X', 6),           # 大小相同，内容不同
+            ('css.html', 'SAME', 8),
+            ('css/a.css', 'X', 99),       # 大小不同
+        ]
+        cwd = os.getcwd()
+        os.chdir(tmp_dir)
+        try:
+            actions = list(plan_sync(keys, remote, lambda path, etag: etag != 'SAME'))
+        finally:
+            os.chdir(cwd)
+        
+        plan = {action.key: (action.op, action.reason) for action in actions}
+        assert plan['a_deleted.html'] == ('delete', 'extra')
+        assert plan['b.html'] == ('upload', 'changed')
+        assert plan['css/a.css'] == ('upload', 'changed')
+        assert plan['css.html'] == ('skip', 'unchanged')
+        assert plan['js/c.js'] == ('upload', 'new')
+        assert [action.key for action in actions] == sorted(plan)
+    
+    print("   ✅ 归并计划正确区分上传、删除和跳过")
+
+def test_precompress():
+    """测试预压缩与内容哈希缓存"""
+    import gzip
+    from precompress import compress_file
+    
+    print("🧪 测试预压缩")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, 'table.html')
+        content = "<td class='cell_Sheet1_0_0'><span style='white-space: pre-line;'> </span></td>" * 200
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        
+        cache_dir = os.path.join(tmp_dir, 'cache')
+        variants, compressed_count = compress_file(file_path, ('gzip',), cache_dir)
+        assert compressed_count == 1
+        with open(variants['gzip'], 'rb') as f:
+            data = f.read()
+        assert gzip.decompress(data).decode('utf-8') == content
+        assert len(data) * 10 < len(content)
+        
+        # 相同内容命中缓存，且压缩结果确定（ETag不变）
+        again, compressed_count = compress_file(file_path, ('gzip',), cache_dir)
+        assert compressed_count == 0 and again == variants
+        assert gzip.compress(content.encode('utf-8'), compresslevel=9, mtime=0) == data
+        
+        # 压缩后不变小的内容记下 .skip 标记，再次部署时不重新压缩
+        random_path = os.path.join(tmp_dir, 'random.js')
+        with open(random_path, 'wb') as f:
+            f.write(os.urandom(4096))
+        variants, compressed_count = compress_file(random_path, ('gzip',), cache_dir)
+        assert variants == {} and compressed_count == 1
+        variants, compressed_count = compress_file(random_path, ('gzip',), cache_dir)
+        assert variants == {} and compressed_count == 0
+    
+    print("   ✅ 压缩结果可复用，内容一致，无收益的文件不重复压缩")
+
+def test_sync_report():
+    """测试部署运行报告：阶段计时、失败状态"""
+    from sync_engine import LocalBucket, execute_plan
+    from sync_plan import plan_sync
+    from sync_report import PhaseTimer, build_report, write_report
+    import json
+    
+    print("🧪 测试部署运行报告")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = os.path.join(tmp_dir, 'a.html')
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write('表')
+        bucket = LocalBucket(os.path.join(tmp_dir, 'bucket'))
+        bucket.upload_file('old.html', source)
+        
+        timer = PhaseTimer()
+        actions = plan_sync(timer.wrap_iter('plan.local_scan', ['resources/a.html']),
+                            timer.wrap_iter('plan.remote_listing', bucket.list_objects()),
+                            lambda path, etag: True, resolve_path=lambda key: source)
+        upload_stats, delete_stats, skipped = execute_plan(bucket, actions, get_content_type_and_headers,
+                                                           verbose=False, timer=timer)
+        report = build_report(timer, {'workers': 16}, {'upload': 1, 'delete': 1, 'skip': skipped},
+                              upload_stats, delete_stats)
+        # 列举流取完时也计一次（结束判断）
+        assert report['phases']['plan.local_scan']['calls'] == 2
+        assert report['phases']['plan.remote_listing']['calls'] == 2
+        assert {'plan', 'drain'} <= set(report['phases'])
+        assert report['status'] == 'ok' and report['upload']['bytes'] == len('表'.encode('utf-8'))
+        assert report['delete']['latency_ms']['count'] == 1
+        
+        report_file = os.path.join(tmp_dir, 'report.json')
+        write_report(build_report(timer, error=IOError('列举失败')), report_file)
+        with open(report_file, 'r', encoding='utf-8') as f:
+            failed = json.load(f)
+        assert failed['status'] == 'failed' and failed['error'] == '列举失败' and failed['upload'] is None
+    
+    print("   ✅ 阶段耗时和统计写入报告")
+
+def test_resumable_deploy():
+    """测试断点续传：分片上传检查点、部署日志"""
+    import json
+    from sync_engine import LocalBucket, multipart_etag
+    from sync_plan import SyncAction
+    from sync_journal import DeployJournal, MultipartEtags
+    from deploy import is_file_changed, get_file_md5
+    
+    print("🧪 测试断点续传")
+    
+    class InterruptedBucket(LocalBucket):
+        """第一次上传到第3个分片时中断的存储桶"""
+        def __init__(self, root, **kwargs):
+            super().__init__(root, **kwargs)
+            self.parts = []
+        
+        def upload_part(self, out, number, data):
+            if number == 2 and 2 not in self.parts:
+                self.parts.append(2)
+                raise IOError('模拟中断')
+            self.parts.append(number)
+            super().upload_part(out, number, data)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        source = os.path.join(tmp_dir, 'pack.bin')
+        content = bytes(range(18))
+        with open(source, 'wb') as f:
+            f.write(content)
+        root = os.path.join(tmp_dir, 'bucket')
+        bucket = InterruptedBucket(root, multipart_threshold=10, part_size=4)
+        try:
+            bucket.upload_file('pack.bin', source)
+            assert False, '应当中断'
+        except IOError:
+            pass
+        # 已完成的分片不重新上传
+        etag = bucket.upload_file('pack.bin', source)
+        assert bucket.parts == [0, 1, 2, 2, 3, 4]
+        assert etag == multipart_etag([hashlib.md5(content[i:i + 4]).hexdigest() for i in range(0, 18, 4)])
+        assert etag.endswith('-5')
+        with open(os.path.join(root, 'pack.bin'), 'rb') as f:
+            assert f.read() == content
+        assert list(LocalBucket(root).list_objects()) == [('pack.bin', etag, 18)]
+        print("   ✅ 分片上传从中断的分片继续")
+        
+        # 分片ETag按记录的内容MD5判断是否变化
+        etags = MultipartEtags(os.path.join(tmp_dir, 'etags.json'))
+        assert is_file_changed(source, etag, etags)
+        etags.add(etag, get_file_md5(source))
+        assert not is_file_changed(source, etag, MultipartEtags(os.path.join(tmp_dir, 'etags.json')))
+        
+        # 部署日志：重跑时跳过内容未变的已上传文件
+        journal_file = os.path.join(tmp_dir, 'journal.jsonl')
+        journal = DeployJournal(journal_file, 'plan-a')
+        journal.record('pack.bin', get_file_md5(source))
+        journal.record('changed.bin', 'OLD')
+        journal.close()
+        with open(journal_file, 'a', encoding='utf-8') as f:
+            f.write('{"key": "trunc')
+        
+        journal = DeployJournal(journal_file, 'plan-a')
+        assert set(journal.completed) == {'pack.bin', 'changed.bin'}
+        actions = [SyncAction('upload', 'pack.bin', source, 'forced'),
+                   SyncAction('upload', 'changed.bin', source, 'forced'),
+                   SyncAction('delete', 'old.bin', None, 'extra')]
+        result = list(journal.filter(actions, get_file_md5))
+        assert [(a.op, a.reason) for a in result] == [('skip', 'journal'), ('upload', 'forced'), ('delete', 'extra')]
+        journal.record('new.bin', 'X')
+        journal.close()
+        assert 'new.bin' in DeployJournal(journal_file, 'plan-a').completed
+        
+        # 部署选项不同或不续传时重新开始，全部成功后删除日志
+        assert DeployJournal(journal_file, 'plan-b').completed == {}
+        journal = DeployJournal(journal_file, 'plan-b', resume=False)
+        assert journal.completed == {}
+        journal.close(finished=True)
+        assert not os.path.exists(journal_file)
+    
+    print("   ✅ 部署日志跳过已完成的上传")
+
+def test_git_range_deploy():
+    """测试按提交范围增量部署：部署记录、变更和删除、退回完整比对"""
+    import subprocess
+    import deploy
+    from sync_plan import walk_sorted
+    
+    print("🧪 测试按提交范围增量部署")
+    
+    def git(*args):
+        subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com'] + list(args),
+                       check=True, capture_output=True)
+    
+    def write(path, content):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+    
+    def bucket_files(root):
+        return {key: open(os.path.join(root, key), encoding='utf-8').read()
+                for key in walk_sorted(root) if not key.startswith('.deploy/')}
+    
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        repo = os.path.join(tmp_dir, 'repo')
+        root = os.path.join(tmp_dir, 'bucket')
+        os.makedirs(repo)
+        os.chdir(repo)
+        try:
+            git('init', '-q')
+            write('.gitignore', 'table_list.json\n/data/\n.cache/\n')
+            write('index.html', '首页')
+            for name in ('a', 'b', 'c'):
+                write(f'resources/{name}(表{name})_1.html', name)
+            write('notes.txt', '不部署')
+            write('table_list.json', '[]')
+            write('data/search/manifest.json', '{}')
+            git('add', '-A')
+            git('commit', '-q', '-m', 'init')
+            
+            def sync(**kwargs):
+                deploy.sync_to_oss(local_bucket=root, compress=False, quiet=True, **kwargs)
+                return deploy.load_deploy_state(deploy.LocalBucket(root))
+            
+            # 第一次部署完整比对，记录提交
+            state = sync()
+            assert state['commit'] == deploy.git_head()
+            assert state['options'] == {'compress': False, 'compact_pages': False, 'hashed_assets': False, 'pack': False}
+            expected = {'index.html': '首页', 'table_list.json': '[]', 'data/search/manifest.json': '{}',
+                        'resources/a(表a)_1.html': 'a', 'resources/b(表b)_1.html': 'b', 'resources/c(表c)_1.html': 'c'}
+            assert bucket_files(root) == expected
+            
+            # 修改、删除、新增页面，生成文件变化：只处理变更和生成文件，不列举整个存储桶
+            write('resources/a(表a)_1.html', 'a2')
+            os.remove('resources/b(表b)_1.html')
+            write('resources/d(表d)_1.html', 'd')
+            write('notes.txt', '仍不部署')
+            git('add', '-A')
+            git('commit', '-q', '-m', 'change')
+            write('table_list.json', '[1]')
+            os.remove('data/search/manifest.json')
+            write('data/search/shard-0.json', '[]')
+            
+            listed = []
+            list_objects = deploy.LocalBucket.list_objects
+            deploy.LocalBucket.list_objects = lambda self, prefix='': listed.append(prefix) or list_objects(self, prefix)
+            try:
+                state = sync()
+            finally:
+                deploy.LocalBucket.list_objects = list_objects
+            assert '' not in listed and 'data/search/' in listed
+            assert state['commit'] == deploy.git_head()
+            expected.update({'resources/a(表a)_1.html': 'a2', 'resources/d(表d)_1.html': 'd',
+                             'table_list.json': '[1]', 'data/search/shard-0.json': '[]'})
+            del expected['resources/b(表b)_1.html'], expected['data/search/manifest.json']
+            assert bucket_files(root) == expected
+            print("   ✅ 只部署提交范围内的变更和生成文件")
+            
+            # 部署选项不同、工作区有修改、上次部署的提交不存在时完整比对
+            changes, reason = deploy.git_range_changes(state, dict(state['options'], compress=True),
+                                                       deploy.git_head(), [])
+            assert changes is None and '选项' in reason
+            write('resources/e(表e)_1.html', 'e')
+            state = sync()
+            assert state['commit'] is None and bucket_files(root)['resources/e(表e)_1.html'] == 'e'
+            changes, reason = deploy.git_range_changes(dict(state, commit='0' * 40), state['options'],
+                                                       deploy.git_head(), [])
+            assert changes is None and '浅克隆' in reason
+            changes, reason = deploy.git_range_changes(dict(state, commit=deploy.git_head(), reconciled=0),
+                                                       state['options'], deploy.git_head(), [])
+            assert changes is None and '完整比对' in reason
+            
+            # 部署脚本本身有修改时完整比对
+            git('add', '-A')
+            git('commit', '-q', '-m', 'add e')
+            state = sync()
+            assert state['commit'] == deploy.git_head()
+            for script in ('deploy.py', 'sync_engine.py'):
+                write(script, '# 部署脚本')
+                git('add', '-A')
+                git('commit', '-q', '-m', f'change {script}')
+                changes, reason = deploy.git_range_changes(state, state['options'], deploy.git_head(), [])
+                assert changes is None and reason == f'{script} 有修改'
+                state = sync()
+                assert state['commit'] == deploy.git_head()
+        finally:
+            os.chdir(cwd)
+    
+    print("   ✅ 无法增量部署时退回完整比对")
+
+def test_hashed_assets_deploy():
+    """测试哈希文件部署：强缓存头、增量部署新哈希文件、旧文件保留后删除"""
+    import subprocess
+    import deploy
+    from build_assets import build_assets, load_manifest, IMMUTABLE_CACHE_CONTROL
+    
+    print("🧪 测试哈希文件部署")
+    
+    def git(*args):
+        subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com'] + list(args),
+                       check=True, capture_output=True)
+    
+    def write(path, content):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+    
+    assert deploy.get_content_type_and_headers('resources/a.0123456789.html')['Cache-Control'] == IMMUTABLE_CACHE_CONTROL
+    assert deploy.get_content_type_and_headers('table_list.abcdef0123.json')['Cache-Control'] == IMMUTABLE_CACHE_CONTROL
+    assert deploy.get_content_type_and_headers('index.html')['Cache-Control'] == 'no-cache'
+    
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        repo = os.path.join(tmp_dir, 'repo')
+        root = os.path.join(tmp_dir, 'bucket')
+        os.makedirs(repo)
+        os.chdir(repo)
+        try:
+            git('init', '-q')
+            write('.gitignore', 'table_list.json\n/data/\n.cache/\n')
+            write('index.html', "fetch('table_list.json')")
+            write('resources/a(表a)_1.html', '<link href="./css/s.css">a')
+            write('resources/css/s.css', 'td{}')
+            write('table_list.json', json.dumps([{'filepath': 'resources/a(表a)_1.html'}]))
+            git('add', '-A')
+            git('commit', '-q', '-m', 'init')
+            
+            def sync(**kwargs):
+                build_assets()
+                deploy.sync_to_oss(local_bucket=root, compress=False, quiet=True, hashed_assets=True, **kwargs)
+                return load_manifest(), deploy.load_deploy_state(deploy.LocalBucket(root), deploy.DEPLOY_ASSETS_KEY)
+            
+            files, assets_state = sync()
+            old_page = files['resources/a(表a)_1.html']
+            assert os.path.exists(os.path.join(root, *old_page.split('/')))
+            with open(os.path.join(root, 'index.html'), encoding='utf-8') as f:
+                assert f.read() == f"fetch('{files['table_list.json']}')"
+            
+            # 页面修改后按提交范围部署：上传新的哈希页面和引用它的 table_list、index.html，旧页面保留
+            write('resources/a(表a)_1.html', '<link href="./css/s.css">a2')
+            git('commit', '-q', '-am', 'change')
+            files, assets_state = sync()
+            new_page = files['resources/a(表a)_1.html']
+            assert new_page != old_page and os.path.exists(os.path.join(root, *new_page.split('/')))
+            assert os.path.exists(os.path.join(root, *old_page.split('/')))
+            assert old_page in assets_state['stale']
+            with open(os.path.join(root, 'index.html'), encoding='utf-8') as f:
+                assert f.read() == f"fetch('{files['table_list.json']}')"
+            
+            # 保留期过后删除旧文件（完整比对同样适用）
+            files, assets_state = sync(asset_retention_days=0)
+            assert not os.path.exists(os.path.join(root, *old_page.split('/')))
+            assert assets_state['stale'] == {}
+            assert os.path.exists(os.path.join(root, *new_page.split('/')))
+            files, assets_state = sync(reconcile=True, asset_retention_days=0)
+            assert os.path.exists(os.path.join(root, *new_page.split('/')))
+        finally:
+            os.chdir(cwd)
+    
+    print("   ✅ 哈希文件强缓存，旧文件保留期后删除")
+
+def test_pack_deploy():
+    """测试页面归档部署：页面不再逐个上传，页面修改后只上传新的归档，旧归档保留"""
+    import subprocess
+    import deploy
+    from page_pack import build_pack, PACK_DIR
+    
+    print("🧪 测试页面归档部署")
+    
+    def git(*args):
+        subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com'] + list(args),
+                       check=True, capture_output=True)
+    
+    def write(path, content):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+    
+    def bucket_keys(root):
+        return {os.path.relpath(os.path.join(dir_path, name), root).replace(os.sep, '/')
+                for dir_path, _, names in os.walk(root) for name in names}
+    
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        repo = os.path.join(tmp_dir, 'repo')
+        root = os.path.join(tmp_dir, 'bucket')
+        os.makedirs(repo)
+        os.chdir(repo)
+        try:
+            git('init', '-q')
+            write('.gitignore', '/data/\n.cache/\n')
+            write('index.html', '首页')
+            write('resources/a(表a)_1.html', '<td>a</td>' * 200)
+            write('resources/b(表b)_2.html', 'b')
+            write('resources/css/s.css', 'td{}')
+            git('add', '-A')
+            git('commit', '-q', '-m', 'init')
+            
+            # 先按页面部署，改为归档后完整比对，删除原有的页面对象
+            deploy.sync_to_oss(local_bucket=root, compress=False, quiet=True)
+            assert 'resources/a(表a)_1.html' in bucket_keys(root)
+            old_pack = build_pack()['pack']
+            deploy.sync_to_oss(local_bucket=root, compress=False, quiet=True, pack=True)
+            keys = bucket_keys(root)
+            assert {'index.html', 'resources/css/s.css', 'data/pack/index.json', f'data/pack/{old_pack}'} <= keys
+            assert not any(key.endswith('(表a)_1.html') or key.endswith('(表b)_2.html') for key in keys)
+            assert deploy.load_deploy_state(deploy.LocalBucket(root))['options']['pack'] is True
+            
+            # 页面修改后按提交范围部署：上传新的归档和偏移表，页面本身不上传，旧归档保留
+            write('resources/b(表b)_2.html', 'b2')
+            git('commit', '-q', '-am', 'change')
+            new_pack = build_pack()['pack']
+            deploy.sync_to_oss(local_bucket=root, compress=False, quiet=True, pack=True)
+            keys = bucket_keys(root)
+            assert {f'data/pack/{old_pack}', f'data/pack/{new_pack}'} <= keys
+            assert 'resources/b(表b)_2.html' not in keys
+            with open(os.path.join(root, 'data', 'pack', 'index.json'), encoding='utf-8') as f:
+                assert json.load(f)['pack'] == new_pack
+            assets_state = deploy.load_deploy_state(deploy.LocalBucket(root), deploy.DEPLOY_ASSETS_KEY)
+            assert f'data/pack/{old_pack}' in assets_state['stale']
+            
+            deploy.sync_to_oss(local_bucket=root, compress=False, quiet=True, pack=True, asset_retention_days=0)
+            assert f'data/pack/{old_pack}' not in bucket_keys(root)
+        finally:
+            os.chdir(cwd)
+    
+    print("   ✅ 页面以归档部署，旧归档保留期后删除")
+
 if __name__ == "__main__":
-    test_sync_functionality() 
\ No newline at end of file
+    test_sync_functionality()
+    test_change_detection()
+    test_sync_engine()
+    test_sync_plan()
+    test_precompress()
+    test_sync_report()
+    test_resumable_deploy()
+    test_git_range_deploy()
+    test_hashed_assets_deploy()
+    test_pack_deploy()